@@ -0,0 +1,274 @@
+# --- codecAsync.py --- #
+# asyncio API for the encode / decode jobs, for services that run an event loop
+# CPU work (encrypt / decrypt / frame codecs) runs in a process pool, blocking reads (video capture) in threads,
+# so thousands of awaiting jobs never block the loop ; at most workers + pending jobs are submitted at once
+#   async with codecAsync.AsyncCodec() as codec :
+#       text_path = await codec.encode_image("photo.jpg")
+#       async for index, frame in codec.read_frames("clip.mp4") : ...
+#       async for index, frame in codec.decode_frames("clip_frames") : ...
+#   python codecAsync.py encode a.jpg b.png ... / decode a.txt ... / video clip.mp4 / frames clip_frames
+
+# --- Imports --- #
+import argparse
+import asyncio
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import aclosing
+
+# the job functions live in the img + vid scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "img"), os.path.join(ROOT, "vid")]
+
+import cv2
+
+from indImgE import encrypt_image_to_text
+from indImgD import decrypt_text_to_image, DEFAULT_PROFILE
+from videoToTxt import FrameCodec as FrameEncoder, process_frame, scaled_size
+from txtToVideo import FrameCodec as FrameDecoder, text_to_frame, natural_sort_key
+
+# defaults
+DEFAULT_PENDING = 64 # jobs submitted on top of the running ones, later jobs wait for a slot
+IO_THREADS = 4 # threads for blocking file / capture calls
+
+# per worker process frame codecs, one per frame size (buffers reused across jobs)
+WORKER_CODECS = {}
+
+# --- Job Functions (run inside the worker processes) --- #
+
+def encode_frame_job(frame, frame_index, output_folder) :
+    height, width, _ = frame.shape
+    key = ("encode", width, height)
+    if key not in WORKER_CODECS :
+        WORKER_CODECS[key] = FrameEncoder(width, height)
+    return process_frame(frame, frame_index, output_folder, WORKER_CODECS[key])
+
+def decode_frame_job(text_path, size=None) :
+    # BGR frame of a .txt, size (width, height) from metadata.txt enables the fast headerless path
+    if size is None :
+        return text_to_frame(text_path)
+    key = ("decode",) + tuple(size)
+    if key not in WORKER_CODECS :
+        WORKER_CODECS[key] = FrameDecoder(*size)
+    return WORKER_CODECS[key].decode(text_path) # pickled back to the caller, the buffer is reused here
+
+def warm_up() :
+    # worker initializer : one core per job, the pool spreads the jobs over the cores
+    cv2.setNumThreads(1)
+
+# --- Async API --- #
+
+class AsyncCodec :
+    # process pool + thread pool behind awaitable encode / decode calls
+    # back-pressure : a job waits on a semaphore until fewer than workers + pending jobs are submitted
+    # cancelling an awaiting task drops its job if it has not started (a started job runs to its end)
+
+    def __init__(self, workers=None, pending=DEFAULT_PENDING, io_threads=IO_THREADS) :
+        self.workers = workers or os.cpu_count() or 1
+        self.pending = pending
+        self.io_threads = io_threads
+        self.pool = None
+        self.io = None
+        self.slots = None
+
+    def start(self) :
+        if self.pool is None :
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+            self.io = ThreadPoolExecutor(max_workers=self.io_threads, thread_name_prefix="codec-io")
+            self.slots = asyncio.BoundedSemaphore(self.workers + self.pending)
+        return self
+
+    async def close(self) :
+        # waits for started jobs, drops queued ones
+        if self.pool is None :
+            return
+        pool, io, self.pool, self.io = self.pool, self.io, None, None
+        await asyncio.get_running_loop().run_in_executor(None, lambda : pool.shutdown(cancel_futures=True))
+        io.shutdown(wait=False)
+
+    async def __aenter__(self) :
+        return self.start()
+
+    async def __aexit__(self, *exc) :
+        await self.close()
+
+    async def run(self, func, *args) :
+        # one CPU job in the process pool, once a slot is free
+        self.start()
+        async with self.slots :
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def in_thread(self, func, *args) :
+        # one blocking I/O call on the thread pool
+        self.start()
+        return await asyncio.get_running_loop().run_in_executor(self.io, func, *args)
+
+    # --- images --- #
+
+    async def encode_image(self, image_path, output_text_path=None, max_memory=None) :
+        # encrypt_image_to_text (original removed on success) ; returns the .txt path
+        output_text_path = output_text_path or os.path.splitext(image_path)[0] + ".txt"
+        await self.run(encrypt_image_to_text, image_path, output_text_path, max_memory)
+        return output_text_path
+
+    async def decode_image(self, text_path, output_image_path=None, profile=DEFAULT_PROFILE, max_memory=None) :
+        # decrypt_text_to_image (.txt removed on success) ; returns the image path (extension from the profile)
+        output_image_path = output_image_path or os.path.splitext(text_path)[0] + ".png"
+        return await self.run(decrypt_text_to_image, text_path, output_image_path, profile, max_memory)
+
+    # --- frames --- #
+
+    async def encode_frame(self, frame, frame_index, output_folder) :
+        # one BGR frame -> output_folder/frame_<index>.txt ; returns its path
+        return await self.run(encode_frame_job, frame, frame_index, output_folder)
+
+    async def decode_frame(self, text_path, size=None) :
+        # one frame .txt -> BGR array
+        return await self.run(decode_frame_job, text_path, size)
+
+    async def read_frames(self, video_path, stride=1, target_height=None) :
+        # async for (index, BGR frame) over a video, every 'stride' frame, optionally downscaled
+        # the capture lives on its own thread (reads in order), the next frame is read while the caller works
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="codec-capture")
+        loop = asyncio.get_running_loop()
+        cap = await loop.run_in_executor(reader, cv2.VideoCapture, video_path)
+        try :
+            if not cap.isOpened() :
+                raise ValueError("error opening video file")
+            width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            size = scaled_size(width, height, target_height)
+            stride = max(1, int(stride))
+
+            def read() :
+                # next kept frame, None at the end
+                success, frame = cap.read()
+                if not success :
+                    return None
+                for _ in range(stride - 1) :
+                    if not cap.grab() :
+                        break
+                if size != (width, height) :
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                return frame
+
+            index = 0
+            upcoming = loop.run_in_executor(reader, read)
+            while True :
+                frame = await upcoming
+                if frame is None :
+                    break
+                upcoming = loop.run_in_executor(reader, read) # read ahead
+                yield index, frame
+                index += 1
+        finally :
+            reader.submit(cap.release) # after any read still running on that thread
+            reader.shutdown(wait=False)
+
+    async def encode_video(self, video_path, output_folder, stride=1, target_height=None) :
+        # video -> output_folder of frame .txt + metadata.txt (same layout as videoToTxt.py) ; returns the frame count
+        # frames are encoded in the pool while the next ones are read, at most workers + pending in flight
+        # open the capture first : a bad path raises before any folder / file exists
+        cap = await self.in_thread(cv2.VideoCapture, video_path)
+        try :
+            if not cap.isOpened() :
+                raise ValueError("error opening video file")
+            width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+        finally :
+            await self.in_thread(cap.release)
+
+        out_width, out_height = scaled_size(width, height, target_height)
+        out_fps = fps / max(1, int(stride))
+        await self.in_thread(lambda : os.makedirs(output_folder, exist_ok=True))
+
+        running = set()
+        count = 0
+        try :
+            async with aclosing(self.read_frames(video_path, stride, target_height)) as frames :
+                async for index, frame in frames :
+                    if len(running) >= self.workers + self.pending :
+                        done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done :
+                            task.result() # raises the first failure
+                    running.add(asyncio.ensure_future(self.encode_frame(frame, index, output_folder)))
+                    count += 1
+            if running :
+                await asyncio.gather(*running)
+        finally :
+            for task in running :
+                task.cancel()
+
+        # metadata.txt last (temp file + rename) : a folder holding it has all of its frames
+        def write_metadata() :
+            metadata_path = os.path.join(output_folder, "metadata.txt")
+            with open(metadata_path + ".tmp", 'w') as f :
+                f.write(f"{out_width},{out_height},{out_fps}")
+            os.replace(metadata_path + ".tmp", metadata_path)
+        await self.in_thread(write_metadata)
+
+        return count
+
+    async def decode_frames(self, input_folder) :
+        # async for (index, BGR frame) over a _frames folder, in order, decoded ahead in the pool
+        def list_frames() :
+            with open(os.path.join(input_folder, "metadata.txt"), 'r') as f :
+                width, height = (int(value) for value in f.read().strip().split(',')[:2])
+            names = [f for f in os.listdir(input_folder) if f.endswith('.txt') and f != 'metadata.txt']
+            return (width, height), sorted(names, key=natural_sort_key)
+
+        size, names = await self.in_thread(list_frames)
+        ahead = deque()
+        try :
+            for index, name in enumerate(names) :
+                ahead.append(asyncio.ensure_future(self.decode_frame(os.path.join(input_folder, name), size)))
+                if len(ahead) >= self.workers + self.pending :
+                    yield index - len(ahead) + 1, await ahead.popleft()
+            while ahead :
+                yield len(names) - len(ahead), await ahead.popleft()
+        finally :
+            for task in ahead :
+                task.cancel()
+
+# --- Main Entry Point --- #
+
+async def main(args) :
+    async with AsyncCodec(args.workers, args.pending) as codec :
+        if args.command == "encode" :
+            jobs = [codec.encode_image(path) for path in args.paths]
+        elif args.command == "decode" :
+            jobs = [codec.decode_image(path, profile=args.profile) for path in args.paths]
+        elif args.command == "video" :
+            jobs = [codec.encode_video(path, os.path.splitext(path)[0] + "_frames", args.stride) for path in args.paths]
+        else :
+            async def count_frames(folder) :
+                count = 0
+                async for _ in codec.decode_frames(folder) :
+                    count += 1
+                return count
+            jobs = [count_frames(path) for path in args.paths]
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+
+    failed = 0
+    for path, result in zip(args.paths, results) :
+        if isinstance(result, Exception) :
+            failed += 1
+            print(f"Failed : {path} ({type(result).__name__}: {result})")
+        else :
+            print(f"{path} -> {result}")
+    return failed
+
+if __name__ == "__main__" :
+
+    parser = argparse.ArgumentParser(description="asyncio encode / decode of many files at once")
+    parser.add_argument("command", choices=["encode", "decode", "video", "frames"],
+                        help="image -> .txt / .txt -> image / video -> _frames / check-decode _frames folders")
+    parser.add_argument("paths", nargs='+')
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="decode output profile")
+    parser.add_argument("--stride", type=int, default=1, help="video : keep 1 frame in N")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--pending", type=int, default=DEFAULT_PENDING, help="jobs submitted ahead of the workers")
+    args = parser.parse_args()
+
+    exit(1 if asyncio.run(main(args)) else 0)
@@ -0,0 +1,100 @@
+# --- codecClient.py --- #
+# thin client for codecDaemon.py : sends one job and prints the result
+# only imports the standard library so each call starts in milliseconds
+#   python codecClient.py encode photo.jpg
+#   python codecClient.py decode photo.txt --profile bmp
+#   python codecClient.py video clip.mp4 --stride 30
+#   python codecClient.py frames clip_frames --backend ffv1
+#   python codecClient.py status
+
+# --- Imports --- #
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+
+DEFAULT_PORT = 8765
+TOKEN_DIR = os.path.join(os.path.expanduser("~"), ".cache", "imgProcessing") # same as codecDaemon.py
+TOKEN_HEADER = "X-Codec-Token"
+
+# --- Helper Functions --- #
+
+class UnixHTTPConnection(http.client.HTTPConnection) :
+    # http over a unix socket (codecDaemon.py --socket)
+
+    def __init__(self, socket_path) :
+        super().__init__("localhost")
+        self.socket_path = socket_path
+
+    def connect(self) :
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+def token_path(port=DEFAULT_PORT, socket_path=None) :
+    # token file of the daemon on this port / socket (same rule in codecDaemon.py)
+    if socket_path :
+        return os.path.abspath(socket_path) + ".token"
+    return os.path.join(TOKEN_DIR, f"codecDaemon-{port}.token")
+
+def send(method, path, body=None, port=DEFAULT_PORT, socket_path=None) :
+    # one request to the daemon ; returns (http status, json reply)
+    with open(token_path(port, socket_path), 'r') as f : # FileNotFoundError : no daemon running
+        token = f.read().strip()
+
+    if socket_path :
+        conn = UnixHTTPConnection(socket_path)
+    else :
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+
+    try :
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        conn.request(method, path, body=data, headers={"Content-Type": "application/json", TOKEN_HEADER: token})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally :
+        conn.close()
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    parser = argparse.ArgumentParser(description="send a job to codecDaemon.py")
+    parser.add_argument("type", choices=["encode", "decode", "video", "frames", "status"])
+    parser.add_argument("path", nargs="?", help="input image / .txt / video / _frames folder")
+    parser.add_argument("output", nargs="?", help="output path (default next to the input)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="daemon unix socket path")
+    parser.add_argument("--profile", help="decode output profile (png, bmp, webp ...)")
+    parser.add_argument("--stride", type=int, help="video : keep 1 frame every N")
+    parser.add_argument("--start-time", type=float, help="video : start in seconds")
+    parser.add_argument("--end-time", type=float, help="video : end in seconds")
+    parser.add_argument("--target-height", type=int, help="video : proxy height")
+    parser.add_argument("--backend", help="frames : video writer backend")
+    parser.add_argument("--threads", type=int, help="frames : ffv1 encoder threads")
+    args = parser.parse_args()
+
+    try :
+        if args.type == "status" :
+            status, reply = send("GET", "/status", port=args.port, socket_path=args.socket)
+        else :
+            if not args.path :
+                parser.error("path is required for jobs")
+
+            # daemon runs elsewhere -> absolute paths
+            job = {"type": args.type, "path": os.path.abspath(args.path)}
+            if args.output :
+                job["output"] = os.path.abspath(args.output)
+            for key in ("profile", "stride", "start_time", "end_time", "target_height", "backend", "threads") :
+                if getattr(args, key) is not None :
+                    job[key] = getattr(args, key)
+
+            status, reply = send("POST", "/jobs", job, port=args.port, socket_path=args.socket)
+
+    except (ConnectionError, FileNotFoundError) as e :
+        print(f"ERROR: codec daemon not reachable ({e}). Start codecDaemon.py first.")
+        sys.exit(2)
+
+    print(json.dumps(reply, indent=2))
+    sys.exit(0 if status == 200 else 1)
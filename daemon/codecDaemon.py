@@ -0,0 +1,249 @@
+# --- codecDaemon.py --- #
+# long running encode / decode / video job server (codec stays imported + warm between jobs)
+# listens on localhost HTTP (default) or a unix socket, send jobs with codecClient.py
+# every request must carry the per-run token the daemon writes to its token file (readable by this user only),
+# POST bodies must be application/json and the Host must be this daemon : web pages (CSRF / DNS rebinding) are refused
+
+# --- Imports --- #
+import argparse
+import hmac
+import json
+import os
+import secrets
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# the job functions live in the img + vid scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "img"), os.path.join(ROOT, "vid")]
+
+from indImgE import encrypt_image_to_text
+from indImgD import decrypt_text_to_image, DEFAULT_PROFILE
+from videoToTxt import video_to_frames
+from txtToVideo import frames_to_video, resolve_writer_backend, WRITER_BACKENDS
+
+# defaults
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE = 64 # jobs waiting on top of the running ones before new jobs are refused
+TOKEN_DIR = os.path.join(os.path.expanduser("~"), ".cache", "imgProcessing") # per-run token files
+TOKEN_HEADER = "X-Codec-Token"
+
+# --- Job Functions (run inside the worker processes) --- #
+
+def encode_job(job) :
+    output = job.get("output") or os.path.splitext(job["path"])[0] + ".txt"
+    encrypt_image_to_text(job["path"], output)
+    return {"output": output}
+
+def decode_job(job) :
+    output = job.get("output") or os.path.splitext(job["path"])[0] + ".png"
+    output = decrypt_text_to_image(job["path"], output, job.get("profile", DEFAULT_PROFILE))
+    return {"output": output}
+
+def video_job(job) :
+    output = job.get("output") or os.path.splitext(job["path"])[0] + "_frames"
+    frames = video_to_frames(job["path"], output, job.get("stride", 1), job.get("start_time"),
+                             job.get("end_time"), job.get("target_height"))
+    return {"output": output, "frames": frames}
+
+def frames_job(job) :
+    backend = resolve_writer_backend(job.get("backend", "auto")) # probed once per worker
+    folder = job["path"].rstrip("/\\")
+    output = job.get("output") or folder.replace('_frames', '') + "_reconstructed"
+    output = os.path.splitext(output)[0] + WRITER_BACKENDS[backend]["ext"]
+    frames = frames_to_video(folder, output, backend, job.get("threads"))
+    return {"output": output, "frames": frames}
+
+JOB_TYPES = {
+    "encode": encode_job, # image -> .txt
+    "decode": decode_job, # .txt -> image
+    "video": video_job, # video -> <name>_frames
+    "frames": frames_job, # <name>_frames -> video
+}
+
+def run_job(job) :
+    # entry point in the worker process
+    return JOB_TYPES[job["type"]](job)
+
+def warm_up() :
+    # worker initializer : modules are imported once per worker, probe the video writers up front
+    resolve_writer_backend("auto")
+
+# --- Server --- #
+
+def token_path(port=DEFAULT_PORT, socket_path=None) :
+    # where the daemon on this port / socket keeps its token (same rule in codecClient.py)
+    if socket_path :
+        return os.path.abspath(socket_path) + ".token"
+    return os.path.join(TOKEN_DIR, f"codecDaemon-{port}.token")
+
+def write_token(path) :
+    # new random token for this run, file readable + writable by the owner only
+    token = secrets.token_hex(32)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path) :
+        os.remove(path) # stale file from a previous run (its permissions are not trusted)
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    with os.fdopen(fd, 'w') as f :
+        f.write(token)
+    return token
+
+class JobServer :
+    # worker pool + bounded admission (running + queued jobs)
+
+    def __init__(self, workers, queue_size) :
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.stats = {"workers": workers, "queue": queue_size, "active": 0, "done": 0, "failed": 0, "refused": 0}
+
+    def submit(self, job) :
+        # runs a job, blocking the calling request thread ; returns (http status, reply)
+        if job.get("type") not in JOB_TYPES or "path" not in job :
+            return 400, {"ok": False, "error": f"job needs 'path' and a type from {sorted(JOB_TYPES)}"}
+
+        if not self.slots.acquire(blocking=False) :
+            with self.lock :
+                self.stats["refused"] += 1
+            return 503, {"ok": False, "error": "job queue is full, retry later"}
+
+        with self.lock :
+            self.stats["active"] += 1
+        try :
+            result = self.pool.submit(run_job, job).result()
+            status, reply = 200, {"ok": True, **result}
+        except (ValueError, FileNotFoundError, RuntimeError) as e :
+            status, reply = 400, {"ok": False, "error": str(e)}
+        except Exception as e :
+            status, reply = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally :
+            self.slots.release()
+
+        with self.lock :
+            self.stats["active"] -= 1
+            self.stats["done" if reply["ok"] else "failed"] += 1
+        return status, reply
+
+    def status(self) :
+        with self.lock :
+            return dict(self.stats)
+
+class JobHandler(BaseHTTPRequestHandler) :
+    # POST /jobs with a json job, GET /status
+    server_version = "codecDaemon/1.0"
+
+    def reply(self, status, body) :
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def allowed(self) :
+        # per-run token + this daemon's Host (tcp) ; replies 403 and returns False otherwise
+        token = self.headers.get(TOKEN_HEADER, "")
+        if not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')) :
+            self.reply(403, {"ok": False, "error": f"missing or wrong {TOKEN_HEADER} (see the daemon's token file)"})
+            return False
+        if self.server.hosts is not None and self.headers.get("Host") not in self.server.hosts :
+            self.reply(403, {"ok": False, "error": "unexpected Host header"})
+            return False
+        return True
+
+    def do_GET(self) :
+        if not self.allowed() :
+            return
+        if self.path == "/status" :
+            self.reply(200, self.server.jobs.status())
+        else :
+            self.reply(404, {"ok": False, "error": "unknown path"})
+
+    def do_POST(self) :
+        if not self.allowed() :
+            return
+        if self.path != "/jobs" :
+            self.reply(404, {"ok": False, "error": "unknown path"})
+            return
+        if self.headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json" :
+            self.reply(415, {"ok": False, "error": "body must be sent as application/json"})
+            return
+
+        try :
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not isinstance(job, dict) :
+                raise ValueError
+        except ValueError :
+            self.reply(400, {"ok": False, "error": "body must be a json object"})
+            return
+
+        self.reply(*self.server.jobs.submit(job))
+
+    def address_string(self) :
+        # unix socket clients have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer) :
+    daemon_threads = True
+
+    def get_request(self) :
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+def stop_on_signal(signum, frame) :
+    # SIGTERM (service managers) shuts down like Ctrl+C
+    raise KeyboardInterrupt
+
+def make_server(jobs, token, port=DEFAULT_PORT, socket_path=None) :
+    # localhost http server, or http over a unix socket when socket_path is given
+    # requests must send 'token' ; over tcp the Host must name this port
+    if socket_path :
+        if not hasattr(socket, "AF_UNIX") :
+            raise RuntimeError("unix sockets are not available on this platform, use --port")
+        if os.path.exists(socket_path) :
+            os.remove(socket_path) # stale socket from a previous run
+        server = UnixHTTPServer(socket_path, JobHandler)
+        server.hosts = None # only local processes that can open the socket
+    else :
+        server = ThreadingHTTPServer(("127.0.0.1", port), JobHandler)
+        server.daemon_threads = True
+        server.hosts = {f"127.0.0.1:{port}", f"localhost:{port}"}
+
+    server.jobs = jobs
+    server.token = token
+    return server
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    parser = argparse.ArgumentParser(description="encode / decode / video job daemon")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="localhost http port")
+    parser.add_argument("--socket", help="serve on this unix socket path instead of a port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE, help="max waiting jobs")
+    args = parser.parse_args()
+
+    jobs = JobServer(max(1, args.workers), max(0, args.queue))
+    token_file = token_path(args.port, args.socket)
+    server = make_server(jobs, write_token(token_file), args.port, args.socket)
+
+    signal.signal(signal.SIGTERM, stop_on_signal)
+    where = args.socket or f"http://127.0.0.1:{args.port}"
+    print(f"Codec daemon ready on {where} ({args.workers} workers, queue {args.queue}), token in {token_file}")
+
+    try :
+        server.serve_forever()
+    except KeyboardInterrupt :
+        print("\nShutting down...")
+    finally :
+        server.server_close()
+        os.remove(token_file)
+        jobs.pool.shutdown(cancel_futures=True)
+        if args.socket and os.path.exists(args.socket) :
+            os.remove(args.socket)
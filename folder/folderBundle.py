@@ -0,0 +1,332 @@
+# --- folderBundle.py --- #
+# encrypts a whole folder of images into ONE bundle file (specific format) and decrypts it back
+# a bundle is the encrypted .txt(s) one after the other + an index (name / offset / size / dimensions),
+# written and read sequentially in large blocks : no .txt / .sum per image (slow on FAT / exFAT drives)
+#   '#BUNDLE members=<n> index=<offset>' (fixed width, filled in last)
+#   <member 1 : '#IMG ...' header + rows, same bytes as its .txt> <member 2> ...
+#   '#INDEX' then one line per member : 'offset=.. size=.. width=.. height=.. mode=.. crc=.. sha256=.. name=..'
+
+# --- Imports --- #
+import os
+import time
+import zlib
+
+from folderImgE import VALID_DIRECTORIES, natural_sort_key, GroupCommit
+from folderImgD import OUTPUT_PROFILES, DEFAULT_PROFILE, MODE_CHANNELS, parse_encoded_header
+from folderSchedule import encrypt_bytes, decrypt_bytes, list_inputs
+
+# bundle layout
+BUNDLE_EXT = ".bundle"
+BUNDLE_PREFIX = b"#BUNDLE "
+INDEX_LINE = b"#INDEX\n"
+HEADER_SIZE = len(BUNDLE_PREFIX) + len(b"members=0000000000 index=0000000000000000\n")
+IO_BUFFER = 8 << 20 # bytes per read / write call on the bundle
+
+# --- Helper Functions --- #
+
+def bundle_header(members, index) :
+    # fixed width so it can be rewritten in place once the index offset is known
+    return BUNDLE_PREFIX + f"members={members:010d} index={index:016d}\n".encode('ascii')
+
+def format_entry(entry) :
+    # index line, name last (it may contain spaces)
+    fields = " ".join(f"{key}={entry[key]}" for key in ("offset", "size", "width", "height", "mode", "crc", "sha256"))
+    return f"{fields} name={entry['name']}\n".encode('utf-8')
+
+def parse_entry(line) :
+    fields, name = line.decode('utf-8').rstrip('\r\n').split(" name=", 1)
+    entry = dict(field.split('=', 1) for field in fields.split())
+    for key in ("offset", "size", "width", "height") :
+        entry[key] = int(entry[key])
+    entry["name"] = name
+    return entry
+
+def bundle_images(folder_path, bundle_path, names=None, remove=False) :
+    # encrypts images of folder_path (all of them, or 'names') into bundle_path
+    # the bundle is written under a temporary name and renamed once complete (no half bundle on a crash)
+    # remove : originals are removed once the bundle is synced to disk and their member read back intact
+    # returns (index entries, {name: error})
+    if names is None :
+        names = [os.path.basename(path) for path in list_inputs(folder_path, "encrypt")]
+
+    entries, failed = [], {}
+    tmp_path = bundle_path + ".tmp"
+    with open(tmp_path, 'wb', buffering=IO_BUFFER) as f :
+        f.write(bundle_header(0, 0)) # placeholder
+        for name in names :
+            try :
+                with open(os.path.join(folder_path, name), 'rb') as src :
+                    data, _, sums = encrypt_bytes(src.read(), os.path.splitext(name)[1].lower())
+            except Exception as e : # unreadable / not an image, left out of the bundle
+                failed[name] = f"{type(e).__name__}: {e}"
+                print(f"Skipped : {name} ({failed[name]})")
+                continue
+
+            fields, offset = parse_encoded_header(data)
+            first_row = data[offset:data.index(b'\n', offset)]
+            entries.append({
+                "offset": f.tell(), "size": len(data),
+                "width": len(first_row) // (MODE_CHANNELS[fields["mode"]] * 2 + 1),
+                "height": data.count(b'\n') - (1 if offset else 0),
+                "mode": fields["mode"], "crc": f"{zlib.crc32(data):08x}", "sha256": sums["sha256"], "name": name,
+            })
+            f.write(data)
+            print(f"Bundled : {name}")
+
+        index = f.tell()
+        f.write(INDEX_LINE)
+        f.write(b"".join(format_entry(entry) for entry in entries))
+        f.seek(0)
+        f.write(bundle_header(len(entries), index))
+
+    os.replace(tmp_path, bundle_path)
+
+    if remove :
+        commit = GroupCommit()
+        commit.sync([bundle_path])
+        verified = verify_bundle(bundle_path, entries)
+        for entry in entries :
+            if entry["name"] not in verified :
+                failed[entry["name"]] = "bundled member did not read back intact, original kept"
+                print(f"Kept : {entry['name']} ({failed[entry['name']]})")
+        with commit : # originals of verified members go
+            commit.add([bundle_path], [os.path.join(folder_path, name) for name in verified])
+
+    return entries, failed
+
+def read_index(bundle_path) :
+    # index entries of a bundle, in member order
+    with open(bundle_path, 'rb') as f :
+        header = f.read(HEADER_SIZE)
+        if not header.startswith(BUNDLE_PREFIX) :
+            raise ValueError(f"{os.path.basename(bundle_path)} : not a bundle")
+        fields = dict(field.split(b'=', 1) for field in header[len(BUNDLE_PREFIX):].split())
+        members, index = int(fields[b"members"]), int(fields[b"index"])
+
+        f.seek(index)
+        if f.readline() != INDEX_LINE :
+            raise ValueError(f"{os.path.basename(bundle_path)} : index missing (unfinished bundle?)")
+        entries = [parse_entry(line) for line in f.read().splitlines() if line]
+
+    if len(entries) != members :
+        raise ValueError(f"{os.path.basename(bundle_path)} : index lists {len(entries)} of {members} member(s)")
+    return entries
+
+def read_members(bundle_path, entries) :
+    # yields (entry, encrypted bytes) in file order : one forward pass, reads of IO_BUFFER bytes
+    with open(bundle_path, 'rb', buffering=IO_BUFFER) as f :
+        for entry in sorted(entries, key=lambda entry : entry["offset"]) :
+            if f.tell() != entry["offset"] :
+                f.seek(entry["offset"])
+            yield entry, f.read(entry["size"])
+
+def verify_bundle(bundle_path, entries) :
+    # names whose member reads back from the bundle with the size + CRC32 it was written with
+    written = {entry["name"]: (entry["size"], entry["crc"]) for entry in entries}
+    try :
+        members = read_members(bundle_path, read_index(bundle_path))
+        return {entry["name"] for entry, data in members
+                if written.get(entry["name"]) == (len(data), entry["crc"]) == (entry["size"], f"{zlib.crc32(data):08x}")}
+    except (OSError, ValueError, KeyError) : # unreadable / index damaged -> nothing verified
+        return set()
+
+def shared_stems(entries) :
+    # stems used by more than one member ('a.jpg' + 'a.png'), compared case-insensitively (FAT / exFAT / NTFS)
+    counts = {}
+    for entry in entries :
+        stem = os.path.splitext(entry["name"])[0].lower()
+        counts[stem] = counts.get(stem, 0) + 1
+    return {stem for stem, count in counts.items() if count > 1}
+
+def output_name(name, ext, shared, used) :
+    # file name of a decrypted member : '<stem><ext>', '<stem>_<source ext><ext>' when the stem is shared,
+    # a counter on top if that is taken by an earlier member of this run too
+    stem, source_ext = os.path.splitext(name)
+    if stem.lower() in shared :
+        stem = f"{stem}_{source_ext.lstrip('.')}"
+    candidate, count = stem + ext, 2
+    while candidate.lower() in used :
+        candidate, count = f"{stem}_{count}{ext}", count + 1
+    used.add(candidate.lower())
+    return candidate
+
+def unbundle_images(bundle_path, output_folder, names=None, profile=DEFAULT_PROFILE, remove=False) :
+    # decrypts the members of a bundle (all of them, or 'names') into output_folder
+    # remove : the bundle is removed once every member was decrypted and the images are synced
+    # returns ({name: output path}, {name: error})
+    entries = read_index(bundle_path)
+    if names is not None :
+        wanted = set(names)
+        entries = [entry for entry in entries if entry["name"] in wanted]
+        missing = wanted - {entry["name"] for entry in entries}
+        if missing :
+            raise ValueError(f"not in the bundle : {', '.join(sorted(missing))}")
+
+    outputs, failed = {}, {}
+    shared, used = shared_stems(entries), set()
+    for entry, data in read_members(bundle_path, entries) :
+        name = entry["name"]
+        try :
+            if f"{zlib.crc32(data):08x}" != entry["crc"] :
+                raise ValueError(f"{name} : member differs from the one bundled (crc)")
+            image, ext, _ = decrypt_bytes(data, name, profile, {"sha256": entry["sha256"]})
+        except ValueError as e :
+            failed[name] = str(e)
+            print(f"Skipped : {name} ({failed[name]})")
+            continue
+
+        output_path = os.path.join(output_folder, output_name(name, ext, shared, used))
+        with open(output_path, 'wb') as f :
+            f.write(image)
+        outputs[name] = output_path
+        print(f"Unbundled : {name} -> {os.path.basename(output_path)}")
+
+    if remove and names is None and not failed :
+        with GroupCommit() as commit :
+            commit.add(list(outputs.values()), [bundle_path])
+
+    return outputs, failed
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # --- 1. Operation Selection --- #
+
+    print("\n1. Bundle folder images -> one .bundle")
+    print("2. Unbundle all members -> images")
+    print("3. Unbundle selected members -> images")
+    try :
+        operation = int(input("\nSelect operation: "))
+        if operation not in (1, 2, 3) :
+            raise ValueError
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    # --- 2. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+
+        base_dir = existing_dirs[dir_choice]
+
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 3. Folder Selection --- #
+
+    # set of folders to ignore
+    IGNORE = {"System Volume Information"}
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.') # skip .*
+               and f not in IGNORE] # skip predefined
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("Available folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input("\nEnter folder number: ")) - 1
+
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+    start = time.perf_counter()
+
+    # --- 4. Bundle (written inside the folder as <folder>.bundle) --- #
+
+    if operation == 1 :
+        bundle_path = os.path.join(folder_path, folders[selection] + BUNDLE_EXT)
+        if os.path.exists(bundle_path) :
+            print(f"{os.path.basename(bundle_path)} already exists, unbundle or move it first.")
+            exit()
+
+        remove = input("Remove original images once bundled? (y/N): ").strip().lower() == 'y'
+        entries, failed = bundle_images(folder_path, bundle_path, remove=remove)
+        print(f"\n{len(entries)} image(s) bundled into {os.path.basename(bundle_path)}, {len(failed)} skipped "
+              f"in {time.perf_counter() - start:.1f}s")
+        exit()
+
+    # --- 5. Unbundle --- #
+
+    bundles = sorted((f for f in os.listdir(folder_path) if f.lower().endswith(BUNDLE_EXT)), key=natural_sort_key)
+    if not bundles :
+        print("No .bundle files found in folder.")
+        exit()
+
+    print("\nAvailable bundles:")
+    for i, filename in enumerate(bundles) :
+        print(f"{i+1}. {filename}")
+
+    try :
+        selection = int(input("\nEnter bundle number: ")) - 1
+        if selection < 0 or selection >= len(bundles) :
+            raise ValueError
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    bundle_path = os.path.join(folder_path, bundles[selection])
+    try :
+        entries = read_index(bundle_path)
+    except ValueError as e :
+        print(f"Nothing was unbundled.\n{e}")
+        exit()
+
+    names = None
+    if operation == 3 :
+        print("\nMembers:")
+        for i, entry in enumerate(entries) :
+            print(f"{i+1}. {entry['name']} ({entry['width']}x{entry['height']} {entry['mode']})")
+        try :
+            picks = [int(part) - 1 for part in input("\nMember numbers (e.g. 1,4,7): ").replace(' ', '').split(',')]
+            if not picks or any(pick < 0 or pick >= len(entries) for pick in picks) :
+                raise ValueError
+        except ValueError :
+            print("Invalid selection.")
+            exit()
+        names = [entries[pick]["name"] for pick in picks]
+
+    profile = DEFAULT_PROFILE
+    choice = input(f"Output profile {list(OUTPUT_PROFILES)} (enter for {DEFAULT_PROFILE}): ").strip()
+    if choice in OUTPUT_PROFILES :
+        profile = choice
+    elif choice :
+        print(f"Invalid profile. Defaulting to {DEFAULT_PROFILE}.")
+
+    remove = names is None and input("Remove the bundle once every member is decrypted? (y/N): ").strip().lower() == 'y'
+
+    try :
+        outputs, failed = unbundle_images(bundle_path, folder_path, names, profile, remove)
+    except ValueError as e :
+        print(f"Nothing was unbundled.\n{e}")
+        exit()
+
+    print(f"\n{len(outputs)} image(s) unbundled, {len(failed)} skipped in {time.perf_counter() - start:.1f}s")
@@ -4,10 +4,28 @@
 # notes : I want to clean up comments + prints + format
 
 # --- Imports --- #
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
 import os
 import re
+import sys
+import threading
+import zlib
 from PIL import Image
 
+# shared helpers live in img/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "img"))
+from imgChecksum import STRIP_ROWS, checksum_path, write_checksums, find_bad_strips, format_bad_strips # .sum sidecars
+from imgMemory import memory_budget, format_memory, report_peak_memory # --max-memory helpers
+
+try :
+    import numpy as np # mapped BMP / PPM fast path (Pillow path without it)
+except ImportError :
+    np = None
+from indImgE import MAPPED_EXTENSIONS, encrypt_mapped # mapped BMP / PPM path, one copy in img/indImgE.py
+
 # Hardcoded variables
 VALID_DIRECTORIES = [
     "D:\\", # Windows
@@ -17,6 +35,19 @@ VALID_DIRECTORIES = [
     "C:\\Users\\davis\\OneDrive\\Desktop\\everything\\games\\DolphinEmulator\\etc\\" # personal local custom
 ]
 
+# encoded format
+HEADER_PREFIX = "#IMG " # 1st line : '#IMG mode=L ...' (no header -> RGB)
+KEPT_MODES = ("L", "LA", "RGB", "RGBA", "P") # stored as-is, anything else is converted
+MODE_FALLBACK = {"1": "L", "La": "LA", "PA": "RGBA", "RGBa": "RGBA"}
+
+# memory budget (--max-memory on the command line), estimates are rough on purpose
+PROCESS_MEMORY = 64 << 20 # one python process with Pillow loaded
+PIXEL_MEMORY = {"1": 1, "L": 1, "P": 1, "LA": 4, "RGB": 4, "RGBA": 4} # bytes per pixel of a Pillow image
+
+# durable commit (--commit-group / --commit-seconds) : outputs are synced in groups before their sources are removed
+COMMIT_GROUP = 64 # outputs per sync
+COMMIT_SECONDS = 5.0 # longest time a finished output waits for its group (timer, no new output needed)
+
 # --- Helper Functions --- #
 
 def natural_sort_key(s) :
@@ -37,45 +68,231 @@ def value_to_encrypted_string(value) :
 
     return encrypted_str
 
-def rgb_to_encrypted_string(r, g, b) :
-    # convert each channel to the encrypted string format
-    red_str = value_to_encrypted_string(r)
-    green_str = value_to_encrypted_string(g)
-    blue_str = value_to_encrypted_string(b)
+def pixel_to_encrypted_string(pixel) :
+    # convert any number of channels (int for L / P, tuple otherwise)
+    if isinstance(pixel, int) :
+        pixel = (pixel,)
 
-    # combine into final encrypted string
-    encrypted_str = f"{red_str}{green_str}{blue_str}"
+    return "".join(value_to_encrypted_string(value) for value in pixel)
 
-    return encrypted_str # alt : return f"{red_str}{green_str}{blue_str}"
+def storage_mode(img) :
+    # mode the image is encoded in (source mode whenever possible)
+    if img.mode in KEPT_MODES :
+        return img.mode
 
-def encrypt_image_to_text(image_path, output_text_path) :
-    # open the image
-    img = Image.open(image_path)
-    img = img.convert('RGB')
-    width, height = img.size
+    return MODE_FALLBACK.get(img.mode, 'RGB')
+
+def encode_header(img, mode, ext) :
+    # build the '#IMG ...' header line (mode + source extension + palette / transparency if any)
+    fields = [f"mode={mode}", f"ext={ext}"]
 
-    # open the output text file
-    with open(output_text_path, 'w') as f :
-        for y in range(height) :
-            for x in range(width) :
-                # get the RGB value of the pixel
-                r, g, b = img.getpixel((x, y))
+    if mode == "P" :
+        fields.append(f"palette={bytes(img.getpalette()).hex()}")
 
-                # convert RGB to encrypted string
-                encrypted_pixel = rgb_to_encrypted_string(r, g, b)
+    transparency = img.info.get("transparency")
+    if mode in ("L", "P") and isinstance(transparency, int) :
+        fields.append(f"transparency={transparency}")
+    elif mode == "P" and isinstance(transparency, bytes) :
+        fields.append(f"alpha={transparency.hex()}")
 
-                # write the encrypted pixel to the file
-                f.write(encrypted_pixel + ' ')
+    return HEADER_PREFIX + " ".join(fields)
 
-            f.write("\n") # new line after each row of pixels
+def write_encrypted_image(img, ext, f) :
+    # writes the header + encrypted pixel rows of an opened image into text stream f
+    # (kept in its own mode, L / LA / RGB / RGBA / P)
+    # returns the checksums {"sha256": source pixel digest, "crcs": CRC32 per STRIP_ROWS lines}
+    mode = storage_mode(img)
+    header = encode_header(img, mode, ext)
+
+    if img.mode != mode :
+        img = img.convert(mode)
+    width, height = img.size
 
-    os.remove(image_path) # remove original image after encryption
+    f.write(header + "\n")
+    crcs = []
+    crc = zlib.crc32((header + "\n").encode('ascii'))
+    lines = 1
+
+    for y in range(height) :
+        # convert each pixel of the row to its encrypted string
+        row = "".join(pixel_to_encrypted_string(img.getpixel((x, y))) + ' ' for x in range(width)) + "\n"
+
+        # write the row (new line after each row of pixels)
+        f.write(row)
+
+        # CRC32 of the row, a new strip every STRIP_ROWS lines
+        if lines == STRIP_ROWS :
+            crcs.append(crc)
+            crc, lines = 0, 0
+        crc = zlib.crc32(row.encode('ascii'), crc)
+        lines += 1
+
+    crcs.append(crc)
+    return {"sha256": hashlib.sha256(img.tobytes()).hexdigest(), "crcs": crcs}
+
+def image_memory(img) :
+    # rough bytes needed to encode an opened (not yet decoded) image : pixels, mode conversion, digest copy
+    mode = storage_mode(img)
+    pixels = img.width * img.height
+    converted = pixels * PIXEL_MEMORY.get(mode, 4) if img.mode != mode else 0
+    return pixels * PIXEL_MEMORY.get(img.mode, 4) + converted + pixels * len(mode) # len(mode) = channels
+
+def open_syncfs() :
+    # syncfs(fd) from libc (linux) : flushes one filesystem in a single call, None elsewhere (-> fsync per file)
+    if not sys.platform.startswith("linux") :
+        return None
+    try :
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        return libc.syncfs
+    except (OSError, AttributeError) :
+        return None
+
+def fsync_path(path) :
+    # fsync of a file / directory (directories cannot be opened on windows, their entries are synced with the file)
+    try :
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    except (IsADirectoryError, PermissionError) :
+        return
+    try :
+        os.fsync(fd)
+    finally :
+        os.close(fd)
+
+class GroupCommit :
+    # removes sources only once their outputs are on disk : outputs are synced in groups (one syncfs per
+    # filesystem, or fsync of every output + its directory), then the group's sources are removed
+    # a group is committed at 'group' outputs or 'seconds' after its 1st output (timer thread), whichever is first
+    # a crash can leave both copies of a file, never neither ; use as 'with GroupCommit() as commit :'
+
+    def __init__(self, group=COMMIT_GROUP, seconds=COMMIT_SECONDS) :
+        self.group = group
+        self.seconds = seconds
+        self.pending = [] # (outputs, sources) not synced yet
+        self.timer = None # commits the pending group once it waited 'seconds'
+        self.error = None # failure of a timed commit, raised by the next flush
+        self.lock = threading.RLock() # add / flush from several threads + the timer
+        self.syncfs = open_syncfs()
+
+    def add(self, outputs, sources) :
+        # outputs are complete (closed), sources are removed once the outputs are durable
+        with self.lock :
+            self.pending.append((outputs, sources))
+            if len(self.pending) >= self.group or self.seconds <= 0 :
+                self.flush()
+            elif self.timer is None and self.seconds != float('inf') :
+                self.timer = threading.Timer(self.seconds, self.expire)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def expire(self) :
+        # timer thread : commits a group that waited 'seconds' (unless a flush got to it first)
+        with self.lock :
+            if self.timer is not threading.current_thread() :
+                return
+            try :
+                self.flush()
+            except OSError as e :
+                self.error = e
+
+    def sync(self, outputs) :
+        if self.syncfs is not None :
+            devices = {} # st_dev -> one output on it
+            for path in outputs :
+                devices.setdefault(os.stat(path).st_dev, path)
+            for path in devices.values() :
+                fd = os.open(path, os.O_RDONLY)
+                try :
+                    if self.syncfs(fd) == 0 :
+                        continue
+                finally :
+                    os.close(fd)
+                self.syncfs = None # refused (old kernel / filesystem), fsync from now on
+                break
+            else :
+                return
+
+        for path in outputs :
+            fsync_path(path)
+        for directory in {os.path.dirname(os.path.abspath(path)) for path in outputs} :
+            fsync_path(directory) # new directory entries
+
+    def flush(self) :
+        # syncs + removes the pending group ; a failed sync / removal drops the group (its sources stay)
+        with self.lock :
+            if self.timer is not None :
+                self.timer.cancel()
+                self.timer = None
+            error, self.error = self.error, None
+            pending, self.pending = self.pending, []
+
+            if pending :
+                self.sync([path for outputs, _ in pending for path in outputs])
+                for _, sources in pending :
+                    for path in sources :
+                        try :
+                            os.remove(path)
+                        except OSError as e : # the other sources of the group are still removed
+                            error = error or e
+            if error is not None :
+                raise error
+
+    def __enter__(self) :
+        return self
+
+    def __exit__(self, *exc) :
+        self.flush() # outputs finished before an error are still committed
+
+def encrypt_image_to_text(image_path, output_text_path, max_memory=None, commit=None) :
+    # max_memory (bytes) : images that would not fit once decoded are refused before any decode
+    # (uncompressed BMP / PPM are mapped + encoded in chunks, they always fit)
+    # commit (GroupCommit) : the original is removed once the .txt is synced, right away without one
+    sums = None
+    if np is not None and image_path.lower().endswith(MAPPED_EXTENSIONS) :
+        sums = encrypt_mapped(image_path, output_text_path)
+
+    if sums is None :
+        # open the image (lazy, only the header is read)
+        img = Image.open(image_path)
+
+        if max_memory and PROCESS_MEMORY + image_memory(img) > max_memory :
+            raise ValueError(f"{os.path.basename(image_path)} : needs ~{format_memory(PROCESS_MEMORY + image_memory(img))}, "
+                             f"over the {format_memory(max_memory)} memory budget, original kept")
+
+        # open the output text file
+        with open(output_text_path, 'w', newline='\n') as f : # '\n' rows on every OS, as checksummed
+            sums = write_encrypted_image(img, os.path.splitext(image_path)[1].lower(), f)
+    write_checksums(checksum_path(output_text_path), sums)
+
+    # read the written file back, the original is only removed when every strip matches
+    with open(output_text_path, 'rb') as f :
+        bad = find_bad_strips(f, sums["crcs"])
+    if bad :
+        raise ValueError(f"{output_text_path} : checksum mismatch after writing ({format_bad_strips(bad)}), original kept")
+
+    if commit is not None :
+        commit.add([output_text_path, checksum_path(output_text_path)], [image_path])
+    else :
+        os.remove(image_path) # remove original image after encryption
     print(f"Image E&^S to : {output_text_path}")
 
+def commit_options(argv) :
+    # --commit-group N / --commit-seconds S from the command line
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--commit-group", type=int, default=COMMIT_GROUP)
+    parser.add_argument("--commit-seconds", type=float, default=COMMIT_SECONDS)
+    args = parser.parse_known_args(argv)[0]
+    return max(1, args.commit_group), max(0.0, args.commit_seconds)
+
 # --- Main Entry Point --- #
 
 if __name__ == "__main__" :
 
+    # optional memory budget : python folderImgE.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
+    # durable commit settings : python folderImgE.py --commit-group 64 --commit-seconds 5
+    commit_group, commit_seconds = commit_options(sys.argv[1:])
+
     # --- 1. Directory Selection --- #
 
     # filter for existing directories
@@ -142,7 +359,7 @@ if __name__ == "__main__" :
     image_files = [
         f for f in os.listdir(folder_path)
         if not f.startswith('.')
-           and f.lower().endswith(('.jpg', '.png', '.bmp'))
+           and f.lower().endswith(('.jpg', '.png', '.bmp', '.ppm', '.pgm'))
     ]
 
     image_files.sort(key=natural_sort_key) # (natural) sort files
@@ -151,12 +368,26 @@ if __name__ == "__main__" :
         print("No images found in selected folder.")
         exit()
 
-    # Process each image
-    for img_file in image_files :
-        img_path = os.path.join(folder_path, img_file)
-        out = os.path.splitext(img_file)[0] + ".txt"
-
-        encrypt_image_to_text(img_path, os.path.join(folder_path, out))
-        # print(f"Encrypted and removed: {img_file} -> {output_filename}")
+    # Process each image (over budget / failed checksum images are skipped and left in place,
+    # originals are removed in synced groups)
+    skipped = []
+    with GroupCommit(commit_group, commit_seconds) as commit :
+        for img_file in image_files :
+            img_path = os.path.join(folder_path, img_file)
+            out = os.path.splitext(img_file)[0] + ".txt"
+
+            try :
+                encrypt_image_to_text(img_path, os.path.join(folder_path, out), max_memory, commit)
+            except ValueError as e : # over the memory budget / written .txt failed its checksum, original kept
+                print(f"Skipped : {e}")
+                skipped.append(img_file)
+            # print(f"Encrypted and removed: {img_file} -> {output_filename}")
     
-    print("\nAll images within folder encrypted")
+    if skipped :
+        print(f"\n{len(image_files) - len(skipped)} image(s) encrypted, "
+              f"{len(skipped)} skipped : {', '.join(skipped)}")
+    else :
+        print("\nAll images within folder encrypted")
+
+    if max_memory :
+        report_peak_memory(max_memory)
@@ -0,0 +1,367 @@
+# --- folderLease.py --- #
+# encrypts / decrypts ONE shared folder from several processes / machines at once (e.g. on a network share)
+# every input is claimed with a lease file beside it ('<name>.lease', created exclusively) before any work,
+# the owner renews it while working (heartbeat), leases not renewed for LEASE_SECONDS are taken over
+# outputs are written under hidden temporary names and renamed in place only while the lease is confirmed
+# run the script on every machine (or pick several local worker processes) on the same folder
+
+# --- Imports --- #
+import glob
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from folderImgE import VALID_DIRECTORIES, natural_sort_key, encrypt_image_to_text, GroupCommit
+from folderImgD import (OUTPUT_PROFILES, DEFAULT_PROFILE, decrypt_text_to_image,
+                        memory_budget, format_memory, report_peak_memory)
+from folderSchedule import list_inputs
+
+# lease settings (machines sharing a folder should use the same values)
+LEASE_EXT = ".lease"
+LEASE_PREFIX = "#LEASE "
+LEASE_SECONDS = 60.0 # a lease whose file was not renewed this long is expired (keep well above clock skew)
+RENEWALS_PER_LEASE = 6 # heartbeats per LEASE_SECONDS
+POLL_SECONDS = 5.0 # wait before rescanning when every remaining input is leased by someone else
+
+# --- Helper Functions --- #
+
+def make_owner() :
+    # unique worker id : host + pid + random part (pids repeat across machines)
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def read_lease(lease_path) :
+    # lease file content, None when there is no lease
+    try :
+        with open(lease_path, 'r') as f :
+            return f.read()
+    except FileNotFoundError :
+        return None
+
+def lease_owner(content) :
+    fields = dict(field.split('=', 1) for field in content[len(LEASE_PREFIX):].split() if '=' in field)
+    return fields.get("owner")
+
+class Lease :
+    # claim on one input file : '<input>.lease' created exclusively, renewed by a heartbeat thread while held
+    # use : if lease.acquire() : with lease : <work>
+
+    def __init__(self, input_path, owner, ttl=LEASE_SECONDS) :
+        self.path = input_path + LEASE_EXT
+        self.owner = owner
+        self.ttl = ttl
+        self.renewals = 0
+        self.lost = False # set when someone else took the lease over (we were too slow to renew)
+        self.lock = threading.Lock() # renew (heartbeat) vs confirm / release (worker)
+        self.renewed = threading.Condition(self.lock) # notified on every renewal + when the lease is lost
+        self.wake = threading.Event() # asks the heartbeat for a renewal right away
+        self.stop = threading.Event()
+        self.heartbeat = None
+
+    def content(self) :
+        # the claim time tells two claims of the same owner apart
+        return f"{LEASE_PREFIX}owner={self.owner} claimed={time.time():.6f}\n"
+
+    def owned(self) :
+        content = read_lease(self.path)
+        return content is not None and lease_owner(content) == self.owner
+
+    def create(self) :
+        # atomic claim : exclusive create fails if any other worker holds a lease
+        try :
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError :
+            return False
+        with os.fdopen(fd, 'w') as f :
+            f.write(self.content())
+        return True
+
+    def expired(self) :
+        # (expired, content read) from the lease file's age
+        content = read_lease(self.path)
+        try :
+            age = time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError :
+            return False, None
+        return content is not None and age > self.ttl, content
+
+    def take_over(self, stale) :
+        # moves an expired lease out of the way : only one worker's rename succeeds,
+        # if the lease changed since it was judged expired (renewed = fresh mtime / replaced) it is put back
+        tomb = f"{self.path}.{uuid.uuid4().hex[:8]}.stale"
+        try :
+            os.rename(self.path, tomb)
+        except FileNotFoundError :
+            return False
+
+        if read_lease(tomb) != stale or time.time() - os.stat(tomb).st_mtime <= self.ttl :
+            try :
+                os.link(tomb, self.path) # back in place, unless a new lease exists already
+            except OSError :
+                pass
+            os.remove(tomb)
+            return False
+
+        os.remove(tomb)
+        return self.create()
+
+    def acquire(self) :
+        # claims the input ; False when a live lease is held by another worker
+        if self.create() :
+            return True
+        expired, content = self.expired()
+        if content is None : # released meanwhile
+            return self.create()
+        if expired :
+            print(f"Taking over expired lease of {lease_owner(content)} : {os.path.basename(self.path)}")
+            return self.take_over(content)
+        return False
+
+    def renew(self) :
+        # bumps the lease's mtime if we still own it ; False (+ lost) once it is not ours
+        # the content is never rewritten, so a lease another worker took over is never replaced : at worst its
+        # mtime is bumped once, the owner check after the bump then reports it lost
+        with self.lock :
+            if not self.lost :
+                try :
+                    self.lost = not self.owned()
+                    if not self.lost :
+                        os.utime(self.path)
+                        self.lost = not self.owned()
+                except FileNotFoundError : # moved aside by a worker taking it over
+                    self.lost = True
+            if not self.lost :
+                self.renewals += 1
+            self.renewed.notify_all()
+            return not self.lost
+
+    def confirm(self) :
+        # waits for a heartbeat renewal started after this call : True while the lease is ours for another ttl
+        # (the worker never renews itself, the heartbeat is the only writer of the lease)
+        with self.lock :
+            target = self.renewals + 1
+            self.wake.set()
+            self.renewed.wait_for(lambda : self.lost or self.renewals >= target, self.ttl)
+            return not self.lost and self.renewals >= target
+
+    def beat(self) :
+        # heartbeat thread : renews every ttl / RENEWALS_PER_LEASE, or right away when confirm asks
+        while True :
+            self.wake.wait(self.ttl / RENEWALS_PER_LEASE)
+            self.wake.clear()
+            if self.stop.is_set() :
+                return
+            if not self.renew() :
+                print(f"Lease lost : {os.path.basename(self.path)}")
+                return
+
+    def __enter__(self) :
+        self.heartbeat = threading.Thread(target=self.beat, daemon=True)
+        self.heartbeat.start()
+        return self
+
+    def __exit__(self, *exc) :
+        self.stop.set()
+        self.wake.set()
+        self.heartbeat.join()
+        with self.lock :
+            if not self.lost and self.owned() :
+                os.remove(self.path)
+
+class StagedCommit :
+    # stands in for GroupCommit while one input is processed : keeps what encrypt / decrypt hand over
+    # (outputs under their temporary names, sources to remove) until process_input publishes them
+
+    def __init__(self) :
+        self.outputs = []
+        self.sources = []
+
+    def add(self, outputs, sources) :
+        self.outputs.extend(outputs)
+        self.sources.extend(sources)
+
+def process_input(path, operation, profile, max_memory, lease) :
+    # same work (and output names) as folderImgE.py / folderImgD.py, written under hidden temporary names
+    # ('.<name>.<id>.tmp.txt', skipped by every listing) : once the heartbeat confirms the lease the outputs are
+    # renamed in place, synced, then the source is removed ; returns False and keeps the source when the lease
+    # was lost (a worker that lost its lease never replaces the outputs of the one that took it over)
+    folder, name = os.path.split(path)
+    root = os.path.splitext(path)[0]
+    staged_root = os.path.join(folder, f".{os.path.splitext(name)[0]}.{uuid.uuid4().hex[:8]}.tmp")
+    staged = StagedCommit()
+    try :
+        if operation == "encrypt" :
+            encrypt_image_to_text(path, staged_root + ".txt", max_memory, staged)
+        else :
+            decrypt_text_to_image(path, staged_root + ".png", profile, max_memory, staged)
+
+        if not lease.confirm() :
+            return False
+        outputs = [root + output[len(staged_root):] for output in staged.outputs]
+        for output, final in zip(staged.outputs, outputs) :
+            os.replace(output, final)
+        with GroupCommit(seconds=float('inf')) as commit :
+            commit.add(outputs, staged.sources)
+        return True
+    finally :
+        for output in glob.glob(glob.escape(staged_root) + ".*") : # not published (lost lease / error)
+            os.remove(output)
+
+def run_worker(folder_path, operation="encrypt", profile=DEFAULT_PROFILE, ttl=LEASE_SECONDS, max_memory=None,
+               owner=None) :
+    # claims + processes inputs until none are left (apart from ones that failed here)
+    # returns (owner, files done, {path: error}, paths whose lease was lost while working)
+    owner = owner or make_owner()
+    done, failed, lost = 0, {}, []
+
+    while True :
+        inputs = [path for path in list_inputs(folder_path, operation) if path not in failed]
+        if not inputs :
+            break
+
+        # start at an owner dependent file so workers spread out instead of all racing for the 1st one
+        start = zlib.crc32(owner.encode('utf-8')) % len(inputs)
+        claimed = False
+        for path in inputs[start:] + inputs[:start] :
+            lease = Lease(path, owner, ttl)
+            if not lease.acquire() :
+                continue
+            claimed = True
+
+            with lease :
+                if not os.path.exists(path) : # finished by another worker before our claim
+                    continue
+                try :
+                    if process_input(path, operation, profile, max_memory, lease) :
+                        done += 1
+                    else :
+                        print(f"Lease lost before removing {os.path.basename(path)}, source kept")
+                except Exception as e :
+                    failed[path] = f"{type(e).__name__}: {e}"
+                    print(f"Skipped : {os.path.basename(path)} ({failed[path]})")
+            if lease.lost :
+                lost.append(path)
+
+        if not claimed : # everything left is leased by live workers, wait for them to finish / expire
+            time.sleep(POLL_SECONDS)
+
+    return owner, done, failed, lost
+
+def run_local_workers(folder_path, workers, operation="encrypt", profile=DEFAULT_PROFILE, ttl=LEASE_SECONDS,
+                      max_memory=None) :
+    # runs 'workers' independent worker processes on this machine (same protocol as separate machines)
+    with ProcessPoolExecutor(max_workers=workers) as pool :
+        futures = [pool.submit(run_worker, folder_path, operation, profile, ttl, max_memory) for _ in range(workers)]
+        return [future.result() for future in futures]
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # optional memory budget (per machine, split between its workers) : python folderLease.py --max-memory 2G
+    max_memory = memory_budget(sys.argv[1:])
+
+    # --- 1. Operation Selection --- #
+
+    print("\n1. Encrypt images -> .txt")
+    print("2. Decrypt .txt -> images")
+    try :
+        operation = {1: "encrypt", 2: "decrypt"}[int(input("\nSelect operation: "))]
+    except (ValueError, KeyError) :
+        print("Invalid selection.")
+        exit()
+
+    profile = DEFAULT_PROFILE
+    if operation == "decrypt" :
+        choice = input(f"Output profile {list(OUTPUT_PROFILES)} (enter for {DEFAULT_PROFILE}): ").strip()
+        if choice in OUTPUT_PROFILES :
+            profile = choice
+        elif choice :
+            print(f"Invalid profile. Defaulting to {DEFAULT_PROFILE}.")
+
+    # --- 2. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+
+        base_dir = existing_dirs[dir_choice]
+
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 3. Folder Selection --- #
+
+    # set of folders to ignore
+    IGNORE = {"System Volume Information"}
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.') # skip .*
+               and f not in IGNORE] # skip predefined
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("Available folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input(f"\nEnter folder number to {operation}: ")) - 1
+
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+
+    # --- 4. Local Workers --- #
+
+    try :
+        workers = int(input("\nWorker processes on this machine (enter for 1): ").strip() or 1)
+        if workers < 1 :
+            raise ValueError
+    except ValueError :
+        print("Invalid number. Using 1.")
+        workers = 1
+
+    share = max_memory // workers if max_memory else None
+    if max_memory :
+        print(f"Memory budget {format_memory(max_memory)} : {format_memory(share)} per worker")
+
+    # --- 5. Run --- #
+
+    start = time.perf_counter()
+    results = run_local_workers(folder_path, workers, operation, profile, max_memory=share)
+
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
+    for owner, done, failed, lost in results :
+        print(f"{owner} : {done} done, {len(failed)} failed, {len(lost)} lease(s) lost")
+        for path, error in failed.items() :
+            print(f"  Failed : {os.path.basename(path)} ({error})")
+
+    if max_memory :
+        report_peak_memory(max_memory)
@@ -0,0 +1,279 @@
+# --- folderPlan.py --- #
+# dry run for folderImgE.py / folderImgD.py : sizes, free space + runtime estimate, nothing is written
+# only image headers (lazy Image.open, no pixel decode) or the 1st row of each .txt are read
+
+# --- Imports --- #
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from folderImgE import (VALID_DIRECTORIES, HEADER_PREFIX, STRIP_ROWS, COMMIT_GROUP, natural_sort_key, storage_mode,
+                        encode_header, write_encrypted_image, commit_options)
+from folderImgD import (MODE_CHANNELS, OUTPUT_PROFILES, DEFAULT_PROFILE, parse_encoded_header,
+                        resolve_output_format, decrypt_text_to_image, checksum_path)
+from imgChecksum import CHECKSUM_PREFIX # img/ is on the path once folderImgE is imported
+
+# recorded throughput (pixels / second) per operation, see run_benchmark
+BENCH_PATH = os.path.join(os.path.expanduser("~"), ".cache", "imgProcessing", "bench.json") # next to the array cache
+BENCH_SIZE = (256, 256) # synthetic image used for the benchmark
+PALETTE_FIELD = len(" palette=") + 768 * 2 # upper bound, a palette is at most 256 rgb entries
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.bmp', '.ppm', '.pgm')
+
+# --- Helper Functions --- #
+
+def header_size(img, mode, ext) :
+    # length of the '#IMG ...' line written for an opened image (newline excluded)
+    # the palette is only read on decode, a P image gets its upper bound instead
+    if mode != "P" :
+        return len(encode_header(img, mode, ext))
+
+    size = len(f"{HEADER_PREFIX}mode={mode} ext={ext}") + PALETTE_FIELD
+    transparency = img.info.get("transparency")
+    if isinstance(transparency, int) :
+        size += len(f" transparency={transparency}")
+    elif isinstance(transparency, bytes) :
+        size += len(f" alpha={transparency.hex()}")
+    return size
+
+def encoded_size(width, height, mode, header) :
+    # .txt size written by encrypt_image_to_text : header line + rows, each ending in '\n'
+    # exact, except for P images (header_size counts their palette at its upper bound)
+    row = width * (MODE_CHANNELS[mode] * 2 + 1) + 1
+    return header + 1 + height * row
+
+def checksum_size(height) :
+    # .sum sidecar written next to a .txt of 'height' rows : header line + one CRC32 line per strip
+    header = len(f"{CHECKSUM_PREFIX}sha256={'0' * 64} strip={STRIP_ROWS}\n")
+    return header + 9 * -(-(height + 1) // STRIP_ROWS)
+
+def plan_encrypt(path) :
+    # (pixels, output bytes : .txt + .sum sidecar) of an image from its header only
+    with Image.open(path) as img : # lazy : size / mode / transparency come from the header
+        width, height = img.size
+        mode = storage_mode(img)
+        header = header_size(img, mode, os.path.splitext(path)[1].lower())
+    return width * height, encoded_size(width, height, mode, header) + checksum_size(height)
+
+def plan_decrypt(path, profile) :
+    # (pixels, output bytes) of a .txt from its header + 1st row + file size
+    # compressed profiles (png / webp / jpg) are given their uncompressed size as an upper bound
+    with open(path, 'rb') as f :
+        first = f.readline()
+        fields, offset = parse_encoded_header(first)
+        row = f.readline() if offset else first
+
+    mode = fields.get("mode", "RGB")
+    channels = MODE_CHANNELS.get(mode, 3)
+    stride = len(row)
+    row_bytes = len(row.rstrip(b'\r\n'))
+    width = row_bytes // (channels * 2 + 1)
+    height = (os.path.getsize(path) - (len(first) if offset else 0) + stride - 1) // max(stride, 1)
+
+    ext, _ = resolve_output_format(profile, fields)
+    out_channels = 3 if ext in (".jpg", ".jpeg") else channels
+    header = 1078 if ext == ".bmp" and channels == 1 else 138 # bmp palette / bmp + tiff headers
+    bmp_row = (width * out_channels + 3) // 4 * 4 if ext == ".bmp" else width * out_channels # 4 byte aligned rows
+    return width * height, header + bmp_row * height
+
+def peak_extra_space(sizes, group=COMMIT_GROUP) :
+    # highest extra space held during the run : the sources of a group are only removed once its
+    # 'group' outputs are written + synced (GroupCommit), so up to a whole group of outputs sits next to them
+    held = peak = waiting = count = 0
+    for in_bytes, out_bytes in sizes :
+        held += out_bytes
+        peak = max(peak, held)
+        waiting += in_bytes
+        count += 1
+        if count == group :
+            held -= waiting
+            waiting = count = 0
+    return peak
+
+def load_benchmarks() :
+    try :
+        with open(BENCH_PATH, 'r') as f :
+            return json.load(f)
+    except (OSError, ValueError) :
+        return {}
+
+def run_benchmark(operation) :
+    # times the real code on a synthetic image in memory, records pixels / second
+    pixels = np.random.default_rng(0).integers(0, 256, (*BENCH_SIZE, 3), dtype=np.uint8)
+    img = Image.fromarray(pixels)
+    text = io.StringIO()
+
+    start = time.perf_counter()
+    write_encrypted_image(img, ".png", text)
+    encrypt_seconds = time.perf_counter() - start
+
+    # decrypt through the real function on a temp file (it removes its input)
+    with tempfile.TemporaryDirectory() as tmp_dir :
+        txt_path = os.path.join(tmp_dir, "bench.txt")
+        with open(txt_path, 'w') as f :
+            f.write(text.getvalue())
+
+        start = time.perf_counter()
+        decrypt_text_to_image(txt_path, os.path.join(tmp_dir, "bench.png"))
+        decrypt_seconds = time.perf_counter() - start
+
+    records = load_benchmarks()
+    count = BENCH_SIZE[0] * BENCH_SIZE[1]
+    records["encrypt"] = count / encrypt_seconds
+    records["decrypt"] = count / decrypt_seconds
+    os.makedirs(os.path.dirname(BENCH_PATH), exist_ok=True)
+    with open(BENCH_PATH, 'w') as f :
+        json.dump(records, f, indent=2)
+
+    return records[operation]
+
+def plan_folder(folder_path, operation="encrypt", profile=DEFAULT_PROFILE, commit_group=COMMIT_GROUP) :
+    # returns a dict summary of what a folder run would need, nothing is written / removed
+    if operation == "encrypt" :
+        names = [f for f in os.listdir(folder_path)
+                 if not f.startswith('.') and f.lower().endswith(IMAGE_EXTENSIONS)]
+    else :
+        names = [f for f in os.listdir(folder_path)
+                 if not f.startswith('.') and f.lower().endswith('.txt') and f != "metadata.txt"]
+    names.sort(key=natural_sort_key) # same order as the folder scripts
+
+    sizes = []
+    pixels = 0
+    unreadable = []
+    for name in names :
+        path = os.path.join(folder_path, name)
+        try :
+            count, out_bytes = plan_encrypt(path) if operation == "encrypt" else plan_decrypt(path, profile)
+        except (OSError, ValueError) :
+            unreadable.append(name)
+            continue
+        pixels += count
+        in_bytes = os.path.getsize(path)
+        if operation == "decrypt" and os.path.exists(checksum_path(path)) : # removed with its .txt
+            in_bytes += os.path.getsize(checksum_path(path))
+        sizes.append((in_bytes, out_bytes))
+
+    throughput = load_benchmarks().get(operation) or run_benchmark(operation)
+
+    return {
+        "files": len(sizes),
+        "unreadable": unreadable,
+        "input_bytes": sum(s[0] for s in sizes),
+        "output_bytes": sum(s[1] for s in sizes),
+        "peak_extra_bytes": peak_extra_space(sizes, commit_group),
+        "free_bytes": shutil.disk_usage(folder_path).free,
+        "pixels": pixels,
+        "seconds": pixels / throughput,
+    }
+
+def format_bytes(count) :
+    for unit in ("B", "KB", "MB", "GB") :
+        if abs(count) < 1024 :
+            return f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # same group size as the run being planned : python folderPlan.py --commit-group 64
+    commit_group, _ = commit_options(sys.argv[1:])
+
+    # --- 1. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+
+        base_dir = existing_dirs[dir_choice]
+
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 2. Folder Selection --- #
+
+    # set of folders to ignore
+    IGNORE = {"System Volume Information"}
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.') # skip .*
+               and f not in IGNORE] # skip predefined
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("Available folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input("\nEnter folder number to plan: ")) - 1
+
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+
+    # --- 3. Operation Selection --- #
+
+    print("\n1. Encrypt (folderImgE.py)")
+    print("2. Decrypt (folderImgD.py)")
+    try :
+        operation = {1: "encrypt", 2: "decrypt"}[int(input("\nSelect operation to plan: "))]
+    except (ValueError, KeyError) :
+        print("Invalid selection.")
+        exit()
+
+    profile = DEFAULT_PROFILE
+    if operation == "decrypt" :
+        choice = input(f"Output profile {list(OUTPUT_PROFILES)} (enter for {DEFAULT_PROFILE}): ").strip()
+        profile = choice if choice in OUTPUT_PROFILES else DEFAULT_PROFILE
+
+    # --- 4. Plan --- #
+
+    start = time.perf_counter()
+    plan = plan_folder(folder_path, operation, profile, commit_group)
+
+    print(f"\nPlan for {operation} of {folder_path} ({time.perf_counter() - start:.2f}s to plan)")
+    print(f"Files        : {plan['files']}")
+    print(f"Input        : {format_bytes(plan['input_bytes'])}")
+    print(f"Output       : {format_bytes(plan['output_bytes'])}"
+          + (" (upper bound, compressed format)" if operation == "decrypt" and profile not in ("bmp", "tiff") else ""))
+    print(f"Peak extra   : {format_bytes(plan['peak_extra_bytes'])} (groups of {commit_group} outputs written before their sources are removed)")
+    print(f"Free space   : {format_bytes(plan['free_bytes'])}")
+    print(f"Est. runtime : {plan['seconds']:.0f}s ({plan['pixels']:,} pixels, from {BENCH_PATH})")
+
+    if plan["unreadable"] :
+        print(f"Unreadable   : {', '.join(plan['unreadable'])}")
+
+    if plan["peak_extra_bytes"] > plan["free_bytes"] :
+        print("\nWARNING: not enough free space, the run would fill the drive part way through.")
+    else :
+        print("\nEnough free space for this run.")
@@ -0,0 +1,329 @@
+# --- folderSchedule.py --- #
+# encrypts / decrypts several folders (on several drives) in one run
+# work is grouped per physical device (st_dev) : each device gets its own I/O lane (sequential reads / writes,
+# no random access thrashing a USB stick) while the CPU work of every lane shares one process pool
+
+# --- Imports --- #
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image
+
+from folderImgE import (VALID_DIRECTORIES, COMMIT_GROUP, COMMIT_SECONDS, natural_sort_key, write_encrypted_image,
+                        write_checksums, find_bad_strips, format_bad_strips, GroupCommit, commit_options)
+from folderImgD import (OUTPUT_PROFILES, DEFAULT_PROFILE, PROCESS_MEMORY, find_encoding_defects, format_defects,
+                        encrypted_lines_to_image, prepare_output, saved_image_matches, checksum_path, read_checksums,
+                        memory_budget, format_memory, report_peak_memory)
+from folderPlan import plan_encrypt, plan_decrypt
+
+# scheduling defaults
+IO_WORKERS = 1 # I/O threads per device
+PREFETCH = 4 # files read ahead per device (bounds memory held per lane)
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.bmp', '.ppm', '.pgm')
+JOB_MEMORY_PER_PIXEL = 24 # rough worker bytes per pixel (image + encoded text as str / bytes / lines)
+
+# --- CPU Jobs (run in the shared process pool) --- #
+
+def encrypt_bytes(data, ext) :
+    # image file bytes -> (encrypted .txt bytes, output extension, checksums for the sidecar)
+    text = io.StringIO()
+    sums = write_encrypted_image(Image.open(io.BytesIO(data)), ext, text)
+    return text.getvalue().encode('ascii'), ".txt", sums
+
+def decrypt_bytes(data, name, profile, sums=None) :
+    # encrypted .txt bytes -> (image file bytes, output extension, None)
+    defect_count, defects, _ = find_encoding_defects(data)
+    if defect_count :
+        raise ValueError(format_defects(name, defect_count, defects))
+
+    img, fields = encrypted_lines_to_image(data.decode('ascii').splitlines())
+    if sums and hashlib.sha256(img.tobytes()).hexdigest() != sums["sha256"] :
+        raise ValueError(f"{name} : decoded pixels differ from the source image")
+    img, ext, options = prepare_output(img, fields, profile)
+
+    out = io.BytesIO()
+    img.save(out, format=Image.registered_extensions()[ext], **options)
+    out.seek(0)
+    if not saved_image_matches(out, img, ext) :
+        raise ValueError(f"{name} : saved image differs from the decoded pixels")
+    return out.getvalue(), ext, None
+
+# --- Helper Functions --- #
+
+def list_inputs(folder_path, operation) :
+    # files the operation applies to, naturally sorted
+    if operation == "encrypt" :
+        names = [f for f in os.listdir(folder_path)
+                 if not f.startswith('.') and f.lower().endswith(IMAGE_EXTENSIONS)]
+    else :
+        names = [f for f in os.listdir(folder_path)
+                 if not f.startswith('.') and f.lower().endswith('.txt') and f != "metadata.txt"]
+
+    names.sort(key=natural_sort_key)
+    return [os.path.join(folder_path, name) for name in names]
+
+def group_by_device(folders, operation) :
+    # {st_dev: [input paths]} over all folders
+    lanes = {}
+    for folder_path in folders :
+        device = os.stat(folder_path).st_dev
+        lanes.setdefault(device, []).extend(list_inputs(folder_path, operation))
+    return {device: paths for device, paths in lanes.items() if paths}
+
+def read_file(path, operation) :
+    # (file bytes, checksums of a .txt being decrypted or None)
+    with open(path, 'rb') as f :
+        data = f.read()
+    return data, read_checksums(path) if operation == "decrypt" else None
+
+def write_output(path, ext, data, sums, commit=None) :
+    # writes the output (+ checksum sidecar of a new .txt) next to its source,
+    # then removes the source and its sidecar (same as the folder scripts)
+    # commit (GroupCommit) : removal waits until the output is synced
+    output_path = os.path.splitext(path)[0] + ext
+    with open(output_path, 'wb') as f :
+        f.write(data)
+    outputs = [output_path]
+    if sums :
+        write_checksums(checksum_path(output_path), sums)
+        outputs.append(checksum_path(output_path))
+
+        # read the written .txt back, the source is only removed when every strip matches
+        with open(output_path, 'rb') as f :
+            bad = find_bad_strips(f, sums["crcs"])
+        if bad :
+            raise ValueError(f"{output_path} : checksum mismatch after writing ({format_bad_strips(bad)}), source kept")
+
+    sources = [path]
+    if ext != ".txt" and os.path.exists(checksum_path(path)) :
+        sources.append(checksum_path(path))
+    if commit is not None :
+        commit.add(outputs, sources)
+    else :
+        for source in sources :
+            os.remove(source)
+    return output_path
+
+def file_memory(path, operation, profile) :
+    # rough bytes one file takes while in flight : worker process + job, file + result held by its lane
+    pixels, _ = plan_encrypt(path) if operation == "encrypt" else plan_decrypt(path, profile)
+    return PROCESS_MEMORY + pixels * JOB_MEMORY_PER_PIXEL + os.path.getsize(path) + pixels * 7
+
+def fit_budget(lanes, operation, profile, max_memory, cpu_workers, prefetch, results) :
+    # files that cannot fit alone are reported + dropped from their lane (left in place)
+    # returns (cpu workers, prefetch per lane) keeping every file in flight under max_memory
+    available = max_memory - PROCESS_MEMORY # this process
+    largest = 1
+    for device, paths in lanes.items() :
+        kept = []
+        for path in paths :
+            try :
+                cost = file_memory(path, operation, profile)
+            except (OSError, ValueError) :
+                cost = 0 # unreadable, the job reports it
+            if cost > available :
+                results.append((device, path, None, f"needs ~{format_memory(cost)}, over the "
+                                                    f"{format_memory(max_memory)} memory budget"))
+            else :
+                kept.append(path)
+                largest = max(largest, cost)
+        paths[:] = kept
+
+    for device in [d for d, paths in lanes.items() if not paths] :
+        del lanes[device]
+
+    in_flight = max(1, available // largest)
+    return min(cpu_workers, in_flight), max(1, min(prefetch, in_flight // max(len(lanes), 1)))
+
+def run_lane(device, paths, cpu_pool, operation, profile, io_workers, prefetch, results,
+             commit_group=COMMIT_GROUP, commit_seconds=COMMIT_SECONDS) :
+    # drives one device : reads in order on the device's I/O threads, hands the bytes to the
+    # shared CPU pool, and queues the write back on the same I/O threads
+    # sources are removed in synced groups per device (one sync covers the lane's recent outputs)
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix=f"dev{device}")
+    slots = threading.Semaphore(prefetch)
+    commit = GroupCommit(commit_group, commit_seconds)
+    commit_lock = threading.Lock() # io_workers > 1 write concurrently
+
+    def finish(path, cpu_future) :
+        # CPU done -> write on this device's lane
+        try :
+            data, ext, sums = cpu_future.result()
+        except Exception as e :
+            results.append((device, path, None, f"{type(e).__name__}: {e}"))
+            slots.release()
+            return
+
+        def write() :
+            try :
+                with commit_lock :
+                    output_path = write_output(path, ext, data, sums, commit)
+                results.append((device, path, output_path, None))
+                print(f"[dev {device}] {os.path.basename(path)} -> {os.path.basename(output_path)}")
+            except (OSError, ValueError) as e :
+                results.append((device, path, None, str(e)))
+            finally :
+                slots.release()
+
+        io_pool.submit(write)
+
+    for path in paths :
+        slots.acquire() # at most 'prefetch' files in flight on this device
+        try :
+            data, sums = io_pool.submit(read_file, path, operation).result()
+        except (OSError, ValueError, KeyError) as e :
+            results.append((device, path, None, str(e)))
+            slots.release()
+            continue
+
+        if operation == "encrypt" :
+            cpu_future = cpu_pool.submit(encrypt_bytes, data, os.path.splitext(path)[1].lower())
+        else :
+            cpu_future = cpu_pool.submit(decrypt_bytes, data, os.path.basename(path), profile, sums)
+        cpu_future.add_done_callback(lambda future, path=path : finish(path, future))
+
+    # wait for the last writes of this lane
+    for _ in range(prefetch) :
+        slots.acquire()
+    io_pool.shutdown(wait=True)
+    try :
+        commit.flush()
+    except OSError as e : # outputs are written, sources of the last group may be left in place
+        results.append((device, f"device {device} commit", None, f"{type(e).__name__}: {e}"))
+
+def schedule_folders(folders, operation="encrypt", profile=DEFAULT_PROFILE,
+                     cpu_workers=None, io_workers=IO_WORKERS, prefetch=PREFETCH, max_memory=None,
+                     commit_group=COMMIT_GROUP, commit_seconds=COMMIT_SECONDS) :
+    # processes every folder with one lane per device ; returns [(device, input, output, error)]
+    # max_memory (bytes) lowers workers / prefetch to fit, files too big for it are skipped
+    # commit_group / commit_seconds : sources are removed once up to that many outputs / seconds are synced
+    lanes = group_by_device(folders, operation)
+    results = []
+    cpu_workers = cpu_workers or os.cpu_count() or 1
+
+    if max_memory :
+        cpu_workers, prefetch = fit_budget(lanes, operation, profile, max_memory, cpu_workers, prefetch, results)
+        print(f"Memory budget {format_memory(max_memory)} : {cpu_workers} worker(s), prefetch {prefetch} per device")
+
+    if not lanes :
+        print("Nothing to process.")
+        for _, path, _, error in results :
+            print(f"Failed : {path}\n{error}")
+        return results
+
+    for device, paths in lanes.items() :
+        print(f"Device {device} : {len(paths)} file(s)")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=cpu_workers) as cpu_pool :
+        threads = [threading.Thread(target=run_lane, name=f"lane-{device}",
+                                    args=(device, paths, cpu_pool, operation, profile, io_workers, prefetch, results,
+                                          commit_group, commit_seconds))
+                   for device, paths in lanes.items()]
+        for thread in threads :
+            thread.start()
+        for thread in threads :
+            thread.join()
+
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r[3]]
+    print(f"\n{len(results) - len(failed)} file(s) done on {len(lanes)} device(s) in {elapsed:.1f}s, {len(failed)} failed")
+    for _, path, _, error in failed :
+        print(f"Failed : {path}\n{error}")
+
+    return results
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # optional memory budget : python folderSchedule.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
+    # durable commit settings : python folderSchedule.py --commit-group 64 --commit-seconds 5
+    commit_group, commit_seconds = commit_options(sys.argv[1:])
+
+    # --- 1. Operation Selection --- #
+
+    print("\n1. Encrypt images -> .txt")
+    print("2. Decrypt .txt -> images")
+    try :
+        operation = {1: "encrypt", 2: "decrypt"}[int(input("\nSelect operation: "))]
+    except (ValueError, KeyError) :
+        print("Invalid selection.")
+        exit()
+
+    profile = DEFAULT_PROFILE
+    if operation == "decrypt" :
+        choice = input(f"Output profile {list(OUTPUT_PROFILES)} (enter for {DEFAULT_PROFILE}): ").strip()
+        if choice in OUTPUT_PROFILES :
+            profile = choice
+        elif choice :
+            print(f"Invalid profile. Defaulting to {DEFAULT_PROFILE}.")
+
+    # --- 2. Folder Selection (any number, on any directory) --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    # set of folders to ignore
+    IGNORE = {"System Volume Information"}
+
+    selected = []
+    while True :
+        print("\nAvailable base directories:")
+        for i, directory in enumerate(existing_dirs) :
+            print(f"{i+1}. {directory}")
+
+        choice = input("\nSelect base directory number (enter to start): ").strip()
+        if not choice :
+            break
+
+        try :
+            dir_choice = int(choice) - 1
+            if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+                raise ValueError
+            base_dir = existing_dirs[dir_choice]
+
+            folders = [f for f in os.listdir(base_dir)
+                       if os.path.isdir(os.path.join(base_dir, f))
+                       and not f.startswith('.') # skip .*
+                       and f not in IGNORE] # skip predefined
+            folders.sort(key=natural_sort_key)
+
+            print("Available folders:")
+            for i, foldername in enumerate(folders) :
+                print(f"{i+1}. {foldername}")
+
+            selection = int(input(f"\nEnter folder number to {operation}: ")) - 1
+            if selection < 0 or selection >= len(folders) :
+                raise ValueError
+
+        except ValueError :
+            print("Invalid selection.")
+            continue
+
+        folder_path = os.path.join(base_dir, folders[selection])
+        if folder_path not in selected :
+            selected.append(folder_path)
+        print(f"Queued ({len(selected)}) : {', '.join(selected)}")
+
+    if not selected :
+        print("No folders selected.")
+        exit()
+
+    # --- 3. Run --- #
+
+    schedule_folders(selected, operation, profile, max_memory=max_memory,
+                     commit_group=commit_group, commit_seconds=commit_seconds)
+
+    if max_memory :
+        report_peak_memory(max_memory)
@@ -0,0 +1,147 @@
+# --- folderVerify.py --- #
+# verifies .txt(s) (specific format) within a folder without decrypting / removing anything
+# files with a checksum sidecar (.sum) are checked by CRC32 only (disk read speed), others by format
+
+# --- Imports --- #
+import os
+import sys
+import time
+
+from folderImgD import (VALID_DIRECTORIES, PROCESS_MEMORY, STRIP_OVERHEAD, natural_sort_key,
+                        validate_encoded_text, format_defects, read_checksums, find_bad_strips,
+                        format_bad_strips, memory_budget, report_peak_memory)
+
+# --- Helper Functions --- #
+
+def check_rows(txt_path, max_memory) :
+    # pixel rows per format check strip under max_memory (whole file when there is no budget)
+    if not max_memory :
+        return None
+    with open(txt_path, 'rb') as f :
+        stride = max(len(f.readline()), len(f.readline()), 1) # header / 1st row
+    return max(1, (max_memory - PROCESS_MEMORY) // (stride * STRIP_OVERHEAD)) # 1 row is the least it can do
+
+def verify_folder(folder_path, max_memory=None) :
+    # runs the CRC32 strip check (or the vectorized format check) over every .txt in folder
+    # max_memory (bytes) runs the format check in strips ; the CRC32 check is always line by line
+    # returns list of (filename, defect_count)
+    text_files = [
+        f for f in os.listdir(folder_path)
+        if f.lower().endswith('.txt')
+           and not f.startswith('.')
+           and f != "metadata.txt" # written by videoToTxt.py
+    ]
+    text_files.sort(key=natural_sort_key)
+
+    results = []
+    total_bytes = 0
+    start = time.perf_counter()
+
+    for txt_file in text_files :
+        txt_path = os.path.join(folder_path, txt_file)
+        total_bytes += os.path.getsize(txt_path)
+
+        try :
+            sums = read_checksums(txt_path)
+        except (ValueError, KeyError) :
+            sums = None # unreadable sidecar -> format check
+
+        if sums :
+            with open(txt_path, 'rb') as f :
+                bad = find_bad_strips(f, sums["crcs"], sums["strip"])
+            if bad :
+                print(f"FAILED {txt_file} : checksum mismatch in {format_bad_strips(bad, sums['strip'])}")
+            else :
+                print(f"OK     {txt_file} (checksum)")
+            results.append((txt_file, len(bad)))
+            continue
+
+        defect_count, defects, (width, height) = validate_encoded_text(txt_path, rows=check_rows(txt_path, max_memory))
+        if defect_count :
+            print(f"FAILED {format_defects(txt_path, defect_count, defects)}")
+        else :
+            print(f"OK     {txt_file} ({width}x{height})")
+        results.append((txt_file, defect_count))
+
+    elapsed = time.perf_counter() - start
+    rate = total_bytes / elapsed / 1e6 if elapsed > 0 else 0.0
+    print(f"\nChecked {len(results)} file(s), {total_bytes / 1e6:.1f} MB in {elapsed:.2f}s ({rate:.0f} MB/s)")
+
+    return results
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # optional memory budget : python folderVerify.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
+    # --- 1. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+
+        base_dir = existing_dirs[dir_choice]
+
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 2. Folder Selection --- #
+
+    # set of folders to ignore
+    IGNORE = {"System Volume Information"}
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.') # skip .*
+               and f not in IGNORE] # skip predefined
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("Available folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input("\nEnter folder number to verify: ")) - 1
+
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+
+    # --- 3. Verify --- #
+
+    results = verify_folder(folder_path, max_memory)
+    corrupt = [name for name, count in results if count]
+
+    if not results :
+        print("No text files found in selected folder.")
+    elif corrupt :
+        print(f"{len(corrupt)} corrupt .txt(s) : {', '.join(corrupt)}")
+    else :
+        print("All .txt(s) within folder verified")
+
+    if max_memory :
+        report_peak_memory(max_memory)
@@ -0,0 +1,314 @@
+# --- folderWatch.py --- #
+# watches a folder and encrypts image(s) into .txt files (specific format) as they arrive
+# uses inotify on linux (polling elsewhere), waits for files to stop growing, encodes in batches
+
+# --- Imports --- #
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from folderImgE import (VALID_DIRECTORIES, PROCESS_MEMORY, COMMIT_GROUP, COMMIT_SECONDS, natural_sort_key,
+                        encrypt_image_to_text, GroupCommit, commit_options, memory_budget, format_memory,
+                        report_peak_memory)
+
+# watch settings
+IMAGE_EXTENSIONS = ('.jpg', '.png', '.bmp', '.ppm', '.pgm')
+SETTLE_SECONDS = 2.0 # size + mtime unchanged this long -> file is complete
+BATCH_WINDOW = 1.0 # wait this long after the 1st ready file to group more arrivals
+BATCH_SIZE = 32 # max files per batch handed to a worker
+POLL_INTERVAL = 1.0 # rescan period without inotify / while files are settling
+IDLE_WAIT = 30.0 # inotify wait when nothing is pending
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+# --- Helper Functions --- #
+
+def open_inotify(folder_path) :
+    # inotify fd watching folder, or None when unavailable (-> polling)
+    if not sys.platform.startswith("linux") :
+        return None
+
+    try :
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0 :
+            return None
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(folder_path), mask) < 0 :
+            os.close(fd)
+            return None
+    except (OSError, AttributeError) :
+        return None
+
+    return fd
+
+def wait_for_events(fd, timeout) :
+    # blocks until the folder changes (inotify) or timeout passes
+    if fd is None :
+        time.sleep(timeout)
+        return
+
+    readable, _, _ = select.select([fd], [], [], timeout)
+    if readable :
+        try :
+            while os.read(fd, 65536) : # drain, events are only used as wake ups
+                pass
+        except BlockingIOError :
+            pass
+
+def encode_batch(folder_path, names, max_memory=None, commit_group=COMMIT_GROUP, commit_seconds=COMMIT_SECONDS) :
+    # worker task : encrypts a batch of images, returns [(name, error or None)]
+    # max_memory is this worker's share, bigger images fail (and are left in place)
+    # originals are removed in synced groups, the last group before the batch returns
+    results = []
+    with GroupCommit(commit_group, commit_seconds) as commit :
+        for name in names :
+            img_path = os.path.join(folder_path, name)
+            out = os.path.splitext(name)[0] + ".txt"
+            try :
+                encrypt_image_to_text(img_path, os.path.join(folder_path, out), max_memory, commit)
+                results.append((name, None))
+            except Exception as e :
+                results.append((name, f"{type(e).__name__}: {e}"))
+    return results
+
+class ArrivalTracker :
+    # remembers size / mtime of images to tell when each one has stopped growing
+
+    def __init__(self, folder_path, settle=SETTLE_SECONDS) :
+        self.folder_path = folder_path
+        self.settle = settle
+        self.seen = {} # name -> (size, mtime_ns, time it last changed)
+        self.ignored = {} # name -> (size, mtime_ns) left alone until the file changes (failed / pre-existing)
+
+    def scan(self, busy) :
+        # returns (names ready to encode, whether some files are still settling)
+        now = time.monotonic()
+        ready = []
+        present = set()
+
+        with os.scandir(self.folder_path) as entries :
+            for entry in entries :
+                name = entry.name
+                if name.startswith('.') or not name.lower().endswith(IMAGE_EXTENSIONS) or name in busy :
+                    continue
+                try :
+                    stat = entry.stat()
+                except FileNotFoundError : # removed while scanning
+                    continue
+
+                present.add(name)
+                state = (stat.st_size, stat.st_mtime_ns)
+                if self.ignored.get(name) == state :
+                    continue
+
+                previous = self.seen.get(name)
+                if previous is None or previous[:2] != state :
+                    self.seen[name] = (*state, now)
+                elif stat.st_size > 0 and now - previous[2] >= self.settle :
+                    ready.append(name)
+
+        # forget files that are gone (encoded or moved away)
+        for name in list(self.seen) :
+            if name not in present and name not in busy :
+                del self.seen[name]
+
+        settling = len(self.seen) > len(ready)
+        return sorted(ready, key=natural_sort_key), settling
+
+    def mark_failed(self, name) :
+        # skip the file until it is replaced / changes
+        try :
+            stat = os.stat(os.path.join(self.folder_path, name))
+            self.ignored[name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError :
+            pass
+
+    def mark_started(self, names) :
+        for name in names :
+            self.seen.pop(name, None)
+
+def split_batches(names, workers) :
+    # spreads ready files over the workers, at most BATCH_SIZE per batch
+    size = max(1, min(BATCH_SIZE, -(-len(names) // workers)))
+    return [names[i:i + size] for i in range(0, len(names), size)]
+
+def worker_share(workers, max_memory) :
+    # (workers, memory share of each) : every worker gets at least twice a bare process
+    available = max_memory - PROCESS_MEMORY # the watcher itself
+    workers = max(1, min(workers, available // (2 * PROCESS_MEMORY)))
+    return workers, available // workers
+
+def watch_folder(folder_path, workers, include_existing=False, settle=SETTLE_SECONDS, max_memory=None,
+                 commit_group=COMMIT_GROUP, commit_seconds=COMMIT_SECONDS) :
+    # watches folder until Ctrl+C, encoding images once they stop growing
+    # at most 'workers' batches run at once, the rest wait for a free worker
+    # max_memory (bytes) is split between the workers (fewer workers when it is tight)
+    # commit_group / commit_seconds : originals are removed once that many outputs / seconds are synced
+    share = None
+    if max_memory :
+        workers, share = worker_share(workers, max_memory)
+        print(f"Memory budget {format_memory(max_memory)} : {workers} worker(s), {format_memory(share)} each")
+
+    tracker = ArrivalTracker(folder_path, settle)
+    fd = open_inotify(folder_path)
+    print(f"Watching {folder_path} ({'inotify' if fd is not None else 'polling'}, {workers} worker(s)). Ctrl+C to stop.")
+
+    if not include_existing : # treat current images as already handled
+        tracker.scan(busy=set())
+        for name, (size, mtime_ns, _) in list(tracker.seen.items()) :
+            tracker.ignored[name] = (size, mtime_ns)
+        tracker.seen.clear()
+
+    running = {} # future -> batch names
+    busy = set()
+    first_ready = None
+    encoded = failed = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool :
+        try :
+            while True :
+                # 1. collect finished batches
+                for future in [f for f in running if f.done()] :
+                    for name, error in future.result() :
+                        busy.discard(name)
+                        if error :
+                            print(f"Failed : {name} ({error})")
+                            tracker.mark_failed(name)
+                            failed += 1
+                        else :
+                            encoded += 1
+                    del running[future]
+
+                # 2. find complete arrivals, group them for BATCH_WINDOW
+                ready, settling = tracker.scan(busy)
+                if ready and first_ready is None :
+                    first_ready = time.monotonic()
+
+                window_over = first_ready is not None and time.monotonic() - first_ready >= BATCH_WINDOW
+                if ready and (window_over or len(ready) >= BATCH_SIZE * workers) and len(running) < workers :
+                    for batch in split_batches(ready, workers)[:workers - len(running)] :
+                        tracker.mark_started(batch)
+                        busy.update(batch)
+                        running[pool.submit(encode_batch, folder_path, batch, share,
+                                            commit_group, commit_seconds)] = batch
+                        print(f"Encoding batch of {len(batch)} : {', '.join(batch)}")
+                    first_ready = None
+
+                # 3. sleep until something changes
+                if running :
+                    wait(running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                elif ready or settling or fd is None :
+                    wait_for_events(fd, POLL_INTERVAL)
+                else :
+                    wait_for_events(fd, IDLE_WAIT)
+
+        except KeyboardInterrupt :
+            print("\nStopping, waiting for running batches...")
+            for future in running :
+                try :
+                    for name, error in future.result() :
+                        encoded += error is None
+                        failed += error is not None
+                except Exception : # worker interrupted too
+                    failed += len(running[future])
+        finally :
+            if fd is not None :
+                os.close(fd)
+
+    print(f"\n{encoded} image(s) encrypted, {failed} failed")
+    return encoded, failed
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # optional memory budget : python folderWatch.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
+    # durable commit settings : python folderWatch.py --commit-group 64 --commit-seconds 5
+    commit_group, commit_seconds = commit_options(sys.argv[1:])
+
+    # --- 1. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+
+        base_dir = existing_dirs[dir_choice]
+
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 2. Folder Selection --- #
+
+    # set of folders to ignore
+    IGNORE = {"System Volume Information"}
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.') # skip .*
+               and f not in IGNORE] # skip predefined
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("Available folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input("\nEnter folder number to watch: ")) - 1
+
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+
+    # --- 3. Watch Options --- #
+
+    default_workers = os.cpu_count() or 1
+    try :
+        workers = int(input(f"\nMax concurrent workers (enter for {default_workers}): ").strip() or default_workers)
+        if workers < 1 :
+            raise ValueError
+    except ValueError :
+        print(f"Invalid number. Using {default_workers}.")
+        workers = default_workers
+
+    include_existing = input("Encrypt images already in the folder first? (y/N): ").strip().lower() == 'y'
+
+    # --- 4. Watch --- #
+
+    watch_folder(folder_path, workers, include_existing, max_memory=max_memory,
+                 commit_group=commit_group, commit_seconds=commit_seconds)
+
+    if max_memory :
+        report_peak_memory(max_memory)
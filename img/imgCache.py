@@ -0,0 +1,100 @@
+# --- imgCache.py --- #
+# opt-in cache of decoded .txt (specific format) arrays for repeated reads, e.g. previewing the same images
+# the decoded pixels are saved as .npy in one cache directory, a repeat read is one memory map instead of a parse
+# used by imgPreview.load_encoded + txtToVideo.frames_to_video only : indImgD.py decrypts + removes its .txt,
+# so an entry stored there would never be read again
+# numpy + standard library only (no Pillow / indImgD), the vid scripts import it too
+#   import imgCache
+#   cache = imgCache.ArrayCache()                        # ~/.cache/imgProcessing, 2 GB
+#   array = cache.load("photo.txt")                      # None on a miss, then cache.store("photo.txt", array)
+
+# --- Imports --- #
+import argparse
+import hashlib
+import os
+
+import numpy as np
+
+from imgMemory import parse_memory_size
+
+# decoded array cache (--cache on the command line), shared by every script that reads .txt
+# CACHE_DIR also holds the other per-user state (daemon tokens, writer probes, folderPlan benchmarks)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "imgProcessing")
+CACHE_BYTES = 2 << 30 # total .npy size kept, least recently used entries are removed past it
+NATIVE_LAYOUT = "native" # pixels in the stored mode (L / LA / RGB / RGBA / P), as load_encoded uses them
+BGR_LAYOUT = "bgr" # 3 channel BGR video frames, as txtToVideo.py uses them
+
+# --- Helper Functions --- #
+
+class ArrayCache :
+    # opt-in cache of decoded .txt arrays as .npy files in one directory (sources are never touched)
+    # entries are keyed on layout + path + size + mtime, so an edited / replaced .txt misses and its old entry ages out
+    # (the same .txt decoded for another layout is a separate entry)
+    # a hit is one np.load(mmap_mode='r') instead of a parse ; LRU order is the entry's mtime (touched on every hit)
+
+    def __init__(self, directory=CACHE_DIR, limit=CACHE_BYTES) :
+        self.directory = directory
+        self.limit = limit
+        os.makedirs(directory, exist_ok=True)
+        self.total = self.evict() # bytes in the directory as last counted + stored since
+
+    def entry_path(self, text_path, layout=NATIVE_LAYOUT) :
+        stat = os.stat(text_path)
+        key = f"{layout}\0{os.path.abspath(text_path)}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".npy")
+
+    def contains(self, text_path, layout=NATIVE_LAYOUT) :
+        return os.path.exists(self.entry_path(text_path, layout))
+
+    def load(self, text_path, layout=NATIVE_LAYOUT) :
+        # read only memory mapped array, None on a miss
+        path = self.entry_path(text_path, layout)
+        try :
+            array = np.load(path, mmap_mode='r')
+            os.utime(path) # most recently used
+        except (OSError, ValueError) : # missing / evicted meanwhile by another process / truncated
+            return None
+        return array
+
+    def store(self, text_path, array, layout=NATIVE_LAYOUT) :
+        # saves a decoded array (written under a temporary name, readers never see half an entry)
+        path = self.entry_path(text_path, layout)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f :
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp, path)
+
+        self.total += os.path.getsize(path)
+        if self.total > self.limit :
+            self.total = self.evict()
+
+    def evict(self) :
+        # removes least recently used entries until the directory fits the limit, returns the bytes kept
+        entries = []
+        with os.scandir(self.directory) as it :
+            for entry in it :
+                if entry.name.endswith(".npy") :
+                    try :
+                        stat = entry.stat()
+                    except FileNotFoundError :
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries) :
+            if total <= self.limit :
+                break
+            try :
+                os.remove(path)
+            except OSError : # gone already / still mapped (windows)
+                continue
+            total -= size
+        return total
+
+def cache_options(argv) :
+    # --cache [DIR] (--cache-size 2G) from the command line, None = no cache
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--cache", nargs='?', const=CACHE_DIR)
+    parser.add_argument("--cache-size", type=parse_memory_size, default=CACHE_BYTES)
+    args = parser.parse_known_args(argv)[0]
+    return ArrayCache(args.cache, args.cache_size) if args.cache else None
@@ -0,0 +1,70 @@
+# --- imgChecksum.py --- #
+# .sum sidecars of encoded .txt files, shared by the img + folder scripts
+# a sidecar holds the sha256 of the source pixels + one CRC32 per STRIP_ROWS text lines :
+#   #SUM sha256=<hex> strip=64
+#   1a2b3c4d
+#   ...
+# the strip CRCs check a written / copied .txt at read speed, the sha256 checks the decoded pixels
+
+# --- Imports --- #
+import os
+import zlib
+
+CHECKSUM_PREFIX = "#SUM "
+CHECKSUM_EXT = ".sum"
+STRIP_ROWS = 64 # text lines (header included) covered by each CRC32
+
+# --- Helper Functions --- #
+
+def checksum_path(text_path) :
+    return os.path.splitext(text_path)[0] + CHECKSUM_EXT
+
+def write_checksums(sum_path, sums) :
+    # '#SUM sha256=<hex> strip=<lines>' then one CRC32 (hex) per strip
+    with open(sum_path, 'w') as f :
+        f.write(f"{CHECKSUM_PREFIX}sha256={sums['sha256']} strip={STRIP_ROWS}\n")
+        f.write("".join(f"{crc:08x}\n" for crc in sums["crcs"]))
+
+def read_checksums(text_path) :
+    # sidecar of a .txt -> {"sha256", "strip", "crcs"}, None for files encoded without one
+    try :
+        with open(checksum_path(text_path), 'r') as f :
+            lines = f.read().split()
+    except FileNotFoundError :
+        return None
+
+    if not lines or lines[0] != CHECKSUM_PREFIX.strip() :
+        raise ValueError(f"{os.path.basename(checksum_path(text_path))} : not a checksum file")
+    fields = dict(field.split('=', 1) for field in lines[1:3] if '=' in field)
+
+    return {"sha256": fields["sha256"], "strip": int(fields["strip"]),
+            "crcs": [int(crc, 16) for crc in lines[3:]]}
+
+def find_bad_strips(lines, crcs, strip=STRIP_ROWS) :
+    # indexes of the strips whose CRC32 differs, 'lines' is any iterable of text lines (a file opened 'rb')
+    # runs at read speed with one line in memory : no decode, line endings normalized to \n
+    bad = []
+    crc = count = index = 0
+
+    for line in lines :
+        if line.endswith(b'\r\n') :
+            line = line[:-2] + b'\n'
+        crc = zlib.crc32(line, crc)
+        count += 1
+        if count == strip :
+            if index >= len(crcs) or crc != crcs[index] :
+                bad.append(index)
+            crc = count = 0
+            index += 1
+
+    if count : # last partial strip
+        if index >= len(crcs) or crc != crcs[index] :
+            bad.append(index)
+        index += 1
+
+    bad.extend(range(index, len(crcs))) # file is shorter than when written
+    return bad
+
+def format_bad_strips(bad, strip=STRIP_ROWS) :
+    # 'lines 1-64, 129-192' (1-based text lines, header included)
+    return "lines " + ", ".join(f"{i * strip + 1}-{(i + 1) * strip}" for i in bad)
@@ -0,0 +1,210 @@
+# --- imgCodec.py --- #
+# in-memory version of the .txt (specific format) codec : numpy arrays <-> encoded bytes
+# no files are read / written / removed here, usable from other code :
+#   import imgCodec
+#   data = imgCodec.encode(array)             # bytes
+#   imgCodec.encode_to(stream, array)         # writes into any binary stream
+#   array = imgCodec.decode(data)             # bytes / bytearray / mmap / memoryview
+#   imgCodec.decode_into(data, out)           # fills a preallocated array, no copy of 'data'
+# a caller decoding an mmap passes errors through release_views before the mmap closes
+
+# --- Imports --- #
+import traceback
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from indImgD import (HEADER_PREFIX, MODE_CHANNELS, parse_encoded_header,
+                     find_encoding_defects, format_defects)
+
+# channel count -> mode for arrays encoded without an explicit mode
+CHANNEL_MODES = {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}
+ENCODE_ROWS = 256 # rows encoded per chunk by encode_to
+
+# value (0-255) -> its 2 chars, e.g. 123 -> 'M3'
+TOKEN_TABLE = np.array([[ord('A') + v // 10, ord('0') + v % 10] for v in range(256)], dtype=np.uint8)
+
+# --- Helper Functions --- #
+
+def as_channels(array) :
+    # HxW or HxWxC uint8 array -> HxWxC view
+    array = np.asarray(array)
+    if array.dtype != np.uint8 :
+        raise TypeError(f"expected uint8 pixels, got {array.dtype}")
+    if array.ndim == 2 :
+        return array[:, :, None]
+    if array.ndim != 3 or array.shape[2] not in CHANNEL_MODES :
+        raise ValueError(f"expected HxW or HxWx(1-4) pixels, got shape {array.shape}")
+    return array
+
+def header_line(mode, fields) :
+    # '#IMG mode=... key=value ...' line as bytes
+    items = [f"mode={mode}"] + [f"{key}={value}" for key, value in fields.items()]
+    return HEADER_PREFIX + " ".join(items).encode('ascii') + b"\n"
+
+def encode_rows(pixels) :
+    # vectorized encode of a HxWxC block -> bytes of H rows ('XY..' + ' ' per pixel, '\n' per row)
+    height, width, channels = pixels.shape
+    token_width = channels * 2 + 1
+
+    rows = np.empty((height, width * token_width + 1), dtype=np.uint8)
+    tokens = rows[:, :-1].reshape(height, width, token_width)
+    tokens[:, :, :-1] = TOKEN_TABLE[pixels].reshape(height, width, channels * 2)
+    tokens[:, :, -1] = ord(' ')
+    rows[:, -1] = ord('\n')
+
+    return rows
+
+def encode_to(stream, array, mode=None, rows_per_chunk=ENCODE_ROWS, **fields) :
+    # writes the encoded image into a binary stream in row chunks (bounded memory)
+    # extra fields (palette=..., ext=...) go into the header ; returns bytes written
+    pixels = as_channels(array)
+    mode = mode or CHANNEL_MODES[pixels.shape[2]]
+    if MODE_CHANNELS.get(mode) != pixels.shape[2] :
+        raise ValueError(f"mode {mode} does not match {pixels.shape[2]} channel(s)")
+
+    written = stream.write(header_line(mode, fields))
+    for top in range(0, pixels.shape[0], rows_per_chunk) :
+        written += stream.write(memoryview(encode_rows(pixels[top:top + rows_per_chunk])))
+
+    return written
+
+def encode(array, mode=None, **fields) :
+    # encodes a uint8 array (HxW or HxWxC) and returns the encoded bytes
+    pixels = as_channels(array)
+    mode = mode or CHANNEL_MODES[pixels.shape[2]]
+    if MODE_CHANNELS.get(mode) != pixels.shape[2] :
+        raise ValueError(f"mode {mode} does not match {pixels.shape[2]} channel(s)")
+
+    return header_line(mode, fields) + encode_rows(pixels).tobytes()
+
+def find_newline(buf, start) :
+    # index of the next '\n' in a uint8 view (scans in blocks, no full-size temporaries)
+    step = 1 << 16
+    while start < len(buf) :
+        hits = np.flatnonzero(buf[start:start + step] == ord('\n'))
+        if len(hits) :
+            return start + int(hits[0])
+        start += step
+    return -1
+
+def release_views(error) :
+    # clears the locals of the finished frames an error (+ its context) keeps alive
+    # their numpy views over an mmap would make mmap.close() raise BufferError and hide the error
+    while error is not None :
+        traceback.clear_frames(error.__traceback__)
+        error = error.__context__
+
+def read_layout(data) :
+    # reads the header + 1st row of any buffer without copying the body
+    # returns (buf, fields, offset, (width, height), row stride)
+    buf = np.frombuffer(data, dtype=np.uint8)
+
+    offset = 0
+    fields = {"mode": "RGB"}
+    if bytes(buf[:len(HEADER_PREFIX)]) == HEADER_PREFIX :
+        end = find_newline(buf, 0)
+        if end < 0 :
+            raise ValueError("encoded data has no pixel rows")
+        fields, _ = parse_encoded_header(bytes(buf[:end]).rstrip(b'\r'))
+        offset = end + 1
+
+    if fields["mode"] not in MODE_CHANNELS :
+        raise ValueError(f"unsupported mode {fields['mode']!r} in header")
+
+    end = find_newline(buf, offset)
+    if end < 0 :
+        raise ValueError("encoded data has no complete pixel row")
+
+    eol = 2 if end > offset and buf[end - 1] == ord('\r') else 1 # windows line endings
+    row_bytes = end - offset - (eol - 1)
+    stride = row_bytes + eol
+    token_width = MODE_CHANNELS[fields["mode"]] * 2 + 1
+
+    if row_bytes <= 0 or row_bytes % token_width :
+        raise ValueError(f"row 1 is {row_bytes} bytes, not a multiple of {token_width}")
+
+    # the last row may miss its line ending
+    body = len(buf) - offset
+    height = -(-body // stride)
+    if body % stride not in (0, row_bytes) :
+        raise ValueError("rows have different lengths (run find_encoding_defects for details)")
+
+    return buf, fields, offset, (row_bytes // token_width, height), stride
+
+def read_header(data) :
+    # returns (header fields, (width, height)) of encoded data, e.g. to preallocate for decode_into
+    _, fields, _, size, _ = read_layout(data)
+    return fields, size
+
+def token_view(buf, offset, size, stride, token_width) :
+    # strided (rows, pixels, token) view straight over the buffer
+    width, height = size
+    return as_strided(buf[offset:], shape=(height, width, token_width),
+                      strides=(stride, token_width, 1), writeable=False)
+
+def decode_into(data, out) :
+    # decodes any buffer-protocol object into a preallocated uint8 array (HxW or HxWxC)
+    # 'data' is never copied and no full-size temporaries are made ; returns the header fields
+    buf, fields, offset, (width, height), stride = read_layout(data)
+    channels = MODE_CHANNELS[fields["mode"]]
+    token_width = channels * 2 + 1
+
+    target = out[:, :, None] if out.ndim == 2 else out
+    if out.dtype != np.uint8 or target.shape != (height, width, channels) :
+        raise ValueError(f"out must be uint8 {(height, width, channels)}, got {out.dtype} {out.shape}")
+
+    # every row must end right after its last pixel
+    ends = as_strided(buf[offset + stride - 1:], shape=(height - 1,), strides=(stride,))
+    if height > 1 and not (ends == ord('\n')).all() :
+        raise ValueError("rows have different lengths (run find_encoding_defects for details)")
+
+    tokens = token_view(buf, offset, (width, height), stride, token_width)
+    letters = tokens[:, :, 0:token_width - 1:2]
+    digits = tokens[:, :, 1:token_width - 1:2]
+
+    # value = (letter - 'A') * 10 + (digit - '0'), computed in place (uint8 wraparound cancels out)
+    np.subtract(letters, ord('A'), out=target, casting='unsafe')
+    np.multiply(target, 10, out=target, casting='unsafe')
+    np.add(target, digits, out=target, casting='unsafe')
+    np.subtract(target, ord('0'), out=target, casting='unsafe')
+
+    return fields
+
+def tokens_valid(data, rows=ENCODE_ROWS) :
+    # character set + channel range + separator check over the buffer, 'rows' rows at a time
+    # no copy of 'data', temporaries are the size of one strip
+    buf, fields, offset, size, stride = read_layout(data)
+    if fields["mode"] == "P" and "palette" not in fields :
+        return False
+
+    tokens = token_view(buf, offset, size, stride, MODE_CHANNELS[fields["mode"]] * 2 + 1)
+    for top in range(0, tokens.shape[0], rows) :
+        strip = tokens[top:top + rows]
+        letters = strip[:, :, 0:-1:2]
+        digits = strip[:, :, 1:-1:2]
+        if (((letters < ord('A')) | (letters > ord('Z'))).any() or ((digits < ord('0')) | (digits > ord('9'))).any()
+                or ((letters == ord('Z')) & (digits > ord('5'))).any() # above 'Z5' = 255
+                or (strip[:, :, -1] != ord(' ')).any()) :
+            return False
+    return True
+
+def decode(data, validate=True) :
+    # decodes any buffer-protocol object into a new uint8 array (HxW for L / P, HxWxC otherwise)
+    # validate checks the tokens strip by strip (no copy of 'data') ; only on a defect does the full
+    # format check run, to raise ValueError with row / column details
+    try :
+        fields, (width, height) = read_header(data)
+        channels = MODE_CHANNELS[fields["mode"]]
+        out = np.empty((height, width, channels) if channels > 1 else (height, width), dtype=np.uint8)
+        decode_into(data, out)
+        if validate and not tokens_valid(data) :
+            raise ValueError("encoded data failed validation")
+    except ValueError :
+        if validate :
+            defect_count, defects, _ = find_encoding_defects(data)
+            if defect_count :
+                raise ValueError(format_defects("<buffer>", defect_count, defects)) from None
+        raise
+
+    return out
@@ -0,0 +1,54 @@
+# --- imgMemory.py --- #
+# memory budget (--max-memory) helpers shared by the img, folder and vid scripts
+# standard library only, importing it loads neither Pillow nor numpy
+#   max_memory = imgMemory.memory_budget(sys.argv[1:])   # bytes, None = no budget
+#   ...
+#   imgMemory.report_peak_memory(max_memory)
+
+# --- Imports --- #
+import argparse
+import sys
+import tracemalloc
+
+try :
+    import resource # peak RSS (missing on windows -> tracemalloc)
+except ImportError :
+    resource = None
+
+MEMORY_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+# --- Helper Functions --- #
+
+def parse_memory_size(text) :
+    # '512M' / '2G' / '1048576' -> bytes
+    text = text.strip().upper().rstrip("B")
+    scale = MEMORY_UNITS.get(text[-1:], 1)
+    value = float(text[:-1] if text[-1:] in MEMORY_UNITS else text)
+    if value <= 0 :
+        raise ValueError("memory budget must be positive")
+    return int(value * scale)
+
+def memory_budget(argv) :
+    # --max-memory from the command line (None = no budget)
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--max-memory", type=parse_memory_size)
+    max_memory = parser.parse_known_args(argv)[0].max_memory
+
+    if max_memory and resource is None :
+        tracemalloc.start() # stands in for peak RSS
+    return max_memory
+
+def format_memory(count) :
+    return f"{count / (1 << 20):.0f} MB"
+
+def report_peak_memory(max_memory) :
+    # peak RSS of this process (+ largest finished worker), tracemalloc peak where RSS is not available
+    if resource is None :
+        print(f"Peak memory : {format_memory(tracemalloc.get_traced_memory()[1])} traced (budget {format_memory(max_memory)})")
+        return
+
+    scale = 1 if sys.platform == "darwin" else 1024 # ru_maxrss is in KB on linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    worker = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    print(f"Peak memory : {format_memory(peak)}" + (f", largest worker {format_memory(worker)}" if worker else "")
+          + f" (budget {format_memory(max_memory)})")
@@ -0,0 +1,286 @@
+# --- imgParallel.py --- #
+# encrypts / decrypts ONE very large image with every core (used by indImgE.py / indImgD.py above PARALLEL_PIXELS)
+# rows have a fixed size in the .txt (2 chars per channel + space per pixel, newline per row) so the offset of
+# every row is known up front : row ranges are encoded in separate processes and written in place (os.pwrite)
+# into a preallocated file, decode parses row ranges in parallel straight into a shared memory image
+#   import imgParallel
+#   imgParallel.encrypt_image_parallel("huge.png", "huge.txt")
+#   imgParallel.decrypt_text_parallel("huge.txt", "huge.png", "bmp")
+
+# --- Imports --- #
+import hashlib
+import mmap
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+from imgCodec import ENCODE_ROWS, encode_rows, read_layout, decode_into, release_views
+from indImgE import storage_mode, encode_header, checksum_path, write_checksums, STRIP_ROWS
+from indImgD import (MODE_CHANNELS, MAX_REPORTED_DEFECTS, DEFAULT_PROFILE, PROCESS_MEMORY, PIXEL_MEMORY,
+                     STRIP_OVERHEAD, format_defects, find_encoding_defects, read_checksums, prepare_output,
+                     restore_palette, saved_image_matches, format_memory)
+
+PARALLEL_PIXELS = 16_000_000 # images from this size up are worth the process start up
+TASKS_PER_WORKER = 4 # row ranges per worker (evens out ranges that finish early)
+
+# --- Helper Functions --- #
+
+def worth_parallel(path) :
+    # True for images / .txt(s) of at least PARALLEL_PIXELS (image header or .txt size only, nothing decoded)
+    if path.lower().endswith('.txt') :
+        return os.path.getsize(path) >= PARALLEL_PIXELS * 7 # RGB token + separator per pixel
+    with Image.open(path) as img :
+        return img.width * img.height >= PARALLEL_PIXELS
+
+def split_rows(height, workers) :
+    # row ranges [(top, bottom)], every range but the 1st starts on a checksum strip's 1st line
+    # (row y is text line y + 1, the header is line 0) so each worker owns whole strips
+    rows = -(-height // (workers * TASKS_PER_WORKER))
+    rows = max(STRIP_ROWS, -(-rows // STRIP_ROWS) * STRIP_ROWS)
+    starts = [0] + list(range(rows - 1, height, rows))
+    return list(zip(starts, starts[1:] + [height]))
+
+def budget_workers(workers, max_memory, held, per_worker) :
+    # workers fitting under max_memory next to the 'held' bytes of this process, ValueError when none does
+    if not max_memory :
+        return workers
+    fit = (max_memory - PROCESS_MEMORY - held) // (PROCESS_MEMORY + per_worker)
+    if fit < 1 :
+        raise ValueError(f"needs ~{format_memory(2 * PROCESS_MEMORY + held + per_worker)}, "
+                         f"over the {format_memory(max_memory)} memory budget")
+    return int(min(workers, fit))
+
+def write_at(fd, data, offset) :
+    # positional write : os.pwrite, seek + write where it is missing (windows)
+    view = memoryview(data).cast('B')
+    while len(view) :
+        if hasattr(os, "pwrite") :
+            written = os.pwrite(fd, view, offset)
+        else :
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+def read_at(fd, size, offset) :
+    # positional read, same fallback as write_at
+    if hasattr(os, "pread") :
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+def add_strip_crcs(data, line, stride, crc, crcs) :
+    # folds whole rows of 'data' (1st one is text line 'line') into CRC32 per checksum strip
+    # finished strips are appended to crcs ; returns (next line, crc of the unfinished strip)
+    view = memoryview(data).cast('B')
+    rows = len(view) // stride
+    done = 0
+    while done < rows :
+        take = min(rows - done, STRIP_ROWS - line % STRIP_ROWS)
+        crc = zlib.crc32(view[done * stride:(done + take) * stride], crc)
+        done += take
+        line += take
+        if line % STRIP_ROWS == 0 :
+            crcs.append(crc)
+            crc = 0
+    return line, crc
+
+def encode_range(shm_name, shape, text_path, header, top, bottom) :
+    # worker : encodes rows [top, bottom) of the shared image, writes them at their offset, reads them back
+    # returns (CRC32 per checksum strip of the range, True when the bytes read back match)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    fd = os.open(text_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try :
+        pixels = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        stride = shape[1] * (shape[2] * 2 + 1) + 1
+
+        # 1. encode + write in ENCODE_ROWS chunks (bounded memory per worker)
+        crcs = []
+        line, crc = top + 1, zlib.crc32(header) if top == 0 else 0
+        for chunk_top in range(top, bottom, ENCODE_ROWS) :
+            rows = encode_rows(pixels[chunk_top:min(chunk_top + ENCODE_ROWS, bottom)])
+            write_at(fd, rows, len(header) + chunk_top * stride)
+            line, crc = add_strip_crcs(rows, line, stride, crc, crcs)
+        if line % STRIP_ROWS : # last (partial) strip of the image
+            crcs.append(crc)
+
+        # 2. read the range back from the file
+        check = []
+        line, crc = top + 1, zlib.crc32(header) if top == 0 else 0
+        for chunk_top in range(top, bottom, ENCODE_ROWS) :
+            count = min(ENCODE_ROWS, bottom - chunk_top)
+            data = read_at(fd, count * stride, len(header) + chunk_top * stride)
+            line, crc = add_strip_crcs(data, line, stride, crc, check)
+        if line % STRIP_ROWS :
+            check.append(crc)
+
+        del pixels
+        return crcs, check == crcs
+    finally :
+        os.close(fd)
+        shm.close()
+
+def decode_range(shm_name, shape, text_path, header, offset, stride, top, bottom) :
+    # worker : validates + decodes rows [top, bottom) of the .txt into the shared image
+    # returns (defect_count, defects) with 1-based rows of the whole image
+    shm = shared_memory.SharedMemory(name=shm_name)
+    with open(text_path, 'rb') as f :
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try :
+        out = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        defect_count, defects = 0, []
+
+        for chunk_top in range(top, bottom, ENCODE_ROWS) :
+            chunk_bottom = min(chunk_top + ENCODE_ROWS, bottom)
+            data = header + mm[offset + chunk_top * stride:offset + chunk_bottom * stride]
+
+            count, found, _ = find_encoding_defects(data)
+            if count :
+                defect_count += count
+                defects.extend((row + chunk_top, col, reason) for row, col, reason in found)
+                continue
+            decode_into(data, out[chunk_top:chunk_bottom])
+
+        del out
+        return defect_count, defects[:MAX_REPORTED_DEFECTS]
+    finally :
+        mm.close()
+        shm.close()
+
+def encrypt_image_parallel(image_path, output_text_path, workers=None, max_memory=None) :
+    # same output + checksum sidecar as indImgE.encrypt_image_to_text, row ranges encoded on 'workers' processes
+    # max_memory (bytes) lowers the worker count to fit (ValueError when even one does not)
+    # the original is only removed once every range has been read back and matches
+    with Image.open(image_path) as source :
+        mode = storage_mode(source)
+        header = (encode_header(source, mode, os.path.splitext(image_path)[1].lower()) + "\n").encode('ascii')
+
+        width, height = source.size
+        shape = (height, width, MODE_CHANNELS[mode])
+        size = height * width * shape[2]
+        stride = width * (shape[2] * 2 + 1) + 1
+
+        # decoded image (+ converted copy), its array copy + shared pixels here, one encoded chunk per worker
+        held = height * width * (PIXEL_MEMORY.get(source.mode, 4) + PIXEL_MEMORY[mode] * (source.mode != mode)) + 2 * size
+        workers = budget_workers(workers or os.cpu_count() or 1, max_memory, held, ENCODE_ROWS * stride * 3)
+
+        img = source.convert(mode) if source.mode != mode else source
+
+        # 1. pixels into shared memory (workers attach by name, nothing is pickled)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        pixels = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        pixels[...] = np.asarray(img).reshape(shape)
+        del img
+
+    # source pixel digest for the sidecar, hashed while the workers encode (hashlib releases the GIL)
+    digest = {}
+    hasher = threading.Thread(target=lambda : digest.update(sha256=hashlib.sha256(shm.buf[:size]).hexdigest()))
+    hasher.start()
+
+    try :
+        # 2. preallocated output (disk full shows up now, not half way), header at offset 0
+        with open(output_text_path, 'wb') as f :
+            f.write(header)
+            f.truncate(len(header) + height * stride)
+            if hasattr(os, "posix_fallocate") :
+                os.posix_fallocate(f.fileno(), 0, len(header) + height * stride)
+
+        # 3. every row range in its own process, written in place
+        with ProcessPoolExecutor(max_workers=workers) as pool :
+            futures = [pool.submit(encode_range, shm.name, shape, output_text_path, header, top, bottom)
+                       for top, bottom in split_rows(height, workers)]
+            results = [future.result() for future in futures]
+
+    except BaseException :
+        if os.path.exists(output_text_path) :
+            os.remove(output_text_path) # partial output, the original is untouched
+        raise
+    finally :
+        hasher.join()
+        del pixels
+        shm.close()
+        shm.unlink()
+
+    # 4. checksums (ranges own whole strips -> concatenate in order) + read back result
+    crcs = [crc for range_crcs, _ in results for crc in range_crcs]
+    write_checksums(checksum_path(output_text_path), {"sha256": digest["sha256"], "crcs": crcs})
+
+    bad = [i for i, (_, matches) in enumerate(results) if not matches]
+    if bad :
+        raise ValueError(f"{output_text_path} : {len(bad)} row range(s) read back differently, original kept")
+
+    os.remove(image_path) # remove original image after encryption
+    print(f"Image E&^S to : {output_text_path} ({workers} workers)")
+
+def decrypt_text_parallel(text_path, output_image_path, profile=DEFAULT_PROFILE, workers=None, max_memory=None,
+                          **save_options) :
+    # same result as indImgD.decrypt_text_to_image, row ranges validated + decoded on 'workers' processes
+    # max_memory (bytes) lowers the worker count to fit (ValueError when even one does not)
+    # returns the path actually written
+    with open(text_path, 'rb') as f :
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try :
+        buf, fields, offset, (width, height), stride = read_layout(mm)
+        header = mm[:offset]
+        del buf
+    except ValueError as e :
+        release_views(e) # the ValueError reaches the caller, not a BufferError from close()
+        defect_count, defects, _ = find_encoding_defects(mm) # rows / columns of what is wrong
+        if defect_count :
+            raise ValueError(format_defects(text_path, defect_count, defects)) from None
+        raise
+    finally :
+        mm.close()
+
+    mode = fields["mode"]
+    shape = (height, width, MODE_CHANNELS[mode])
+    size = height * width * shape[2] # shm.buf can be rounded up to whole pages
+
+    # shared pixels + output image here, one checked / decoded chunk per worker
+    held = size + height * width * PIXEL_MEMORY[mode]
+    workers = budget_workers(workers or os.cpu_count() or 1, max_memory, held, ENCODE_ROWS * stride * STRIP_OVERHEAD)
+
+    # 1. every row range decoded by its own process into shared memory
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try :
+        with ProcessPoolExecutor(max_workers=workers) as pool :
+            futures = [pool.submit(decode_range, shm.name, shape, text_path, header, offset, stride, top, bottom)
+                       for top, bottom in split_rows(height, workers)]
+            results = [future.result() for future in futures]
+
+        defect_count = sum(count for count, _ in results)
+        if defect_count :
+            defects = sorted(d for _, found in results for d in found)[:MAX_REPORTED_DEFECTS]
+            raise ValueError(format_defects(text_path, defect_count, defects))
+
+        # 2. confirm the round trip against the source pixels (when encoded with a sidecar)
+        sums = read_checksums(text_path)
+        if sums and hashlib.sha256(shm.buf[:size]).hexdigest() != sums["sha256"] :
+            raise ValueError(f"{os.path.basename(text_path)} : decoded pixels differ from the source image")
+
+        img = Image.frombytes(mode, (width, height), shm.buf[:size])
+    finally :
+        shm.close()
+        shm.unlink()
+
+    restore_palette(img, fields)
+
+    # save the reconstructed image with the selected profile
+    img, ext, options = prepare_output(img, fields, profile, **save_options)
+    output_image_path = os.path.splitext(output_image_path)[0] + ext
+
+    img.save(output_image_path, **options)
+    if not saved_image_matches(output_image_path, img, ext) :
+        os.remove(output_image_path)
+        raise ValueError(f"{output_image_path} : saved image differs from the decoded pixels, .txt kept")
+    os.remove(text_path) # remove original .txt
+    if sums :
+        os.remove(checksum_path(text_path))
+    print(f"Image D&^S to : {output_image_path} ({workers} workers)")
+
+    return output_image_path
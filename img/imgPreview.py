@@ -0,0 +1,134 @@
+# --- imgPreview.py --- #
+# previews encoded .txt (specific format) images without decrypting them, the .txt is never changed / removed
+# decoded pixels are kept in the array cache (imgCache.py), previewing the same image again is one memory map
+#   import imgPreview, imgCache
+#   img = imgPreview.load_encoded("photo.txt", imgCache.ArrayCache())  # PIL image in its stored mode
+
+# --- Imports --- #
+import mmap
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from imgCache import cache_options
+from imgCodec import decode, release_views
+from indImgD import VALID_DIRECTORIES, natural_sort_key, parse_encoded_header, restore_palette
+
+# --- Helper Functions --- #
+
+def load_encoded(text_path, cache=None) :
+    # .txt -> PIL image (stored mode, palette / transparency restored), decoded once per cache entry
+    with open(text_path, 'rb') as f :
+        fields, _ = parse_encoded_header(f.readline()) # header line only, the pixels may come from the cache
+
+    pixels = cache.load(text_path) if cache else None
+    if pixels is None :
+        with open(text_path, 'rb') as f :
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data :
+                try :
+                    pixels = decode(data)
+                except ValueError as e :
+                    release_views(e) # a malformed .txt raises its ValueError, not a BufferError from close()
+                    raise
+        if cache :
+            cache.store(text_path, pixels)
+
+    img = Image.fromarray(np.asarray(pixels), fields["mode"])
+    restore_palette(img, fields)
+    return img
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # cache location + size : python imgPreview.py [--cache DIR] [--cache-size 2G]
+    cache = cache_options(["--cache"] + sys.argv[1:]) # always on here, a later --cache DIR wins
+    print(f"Cache : {cache.directory} ({cache.total / (1 << 20):.0f} of {cache.limit / (1 << 20):.0f} MB used)")
+
+    # --- 1. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+        base_dir = existing_dirs[dir_choice]
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 2. Folder Selection --- #
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.')] # skip .*
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("\nAvailable folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input("\nEnter folder number: ")) - 1
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+
+    text_files = [f for f in os.listdir(folder_path)
+                  if f.lower().endswith('.txt') and not f.startswith('.') and f != "metadata.txt"]
+    text_files.sort(key=natural_sort_key)
+
+    if not text_files :
+        print("No .txt files found in directory.")
+        exit()
+
+    # --- 3. Preview (until enter) --- #
+
+    while True :
+        print("\nAvailable .txt files:")
+        for i, filename in enumerate(text_files) :
+            print(f"{i+1}. {filename}")
+
+        choice = input("\nEnter file number to preview (enter to quit): ").strip()
+        if not choice :
+            break
+        try :
+            selection = int(choice) - 1
+            if selection < 0 or selection >= len(text_files) :
+                raise ValueError
+        except ValueError :
+            print("Invalid selection.")
+            continue
+
+        text_path = os.path.join(folder_path, text_files[selection])
+        hit = cache.contains(text_path)
+        start = time.perf_counter()
+        try :
+            img = load_encoded(text_path, cache)
+        except ValueError as e :
+            print(f"Nothing to preview.\n{e}")
+            continue
+
+        print(f"{text_files[selection]} : {img.size[0]}x{img.size[1]} {img.mode}, "
+              f"{'cached' if hit else 'decoded'} in {time.perf_counter() - start:.3f}s")
+        img.show()
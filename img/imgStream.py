@@ -0,0 +1,111 @@
+# --- imgStream.py --- #
+# pipe versions of indImgE.py / indImgD.py : image on stdin -> .txt (specific format) on stdout and back
+# nothing is written next to a source, so encoded data can go straight into gzip / ssh / another process :
+#   python imgStream.py encode < photo.png | gzip > photo.txt.gz
+#   gunzip -c photo.txt.gz | python imgStream.py decode --profile png > photo.png
+#   python imgStream.py encode < photo.png | ssh host "python imgStream.py decode > photo.bmp"
+
+# --- Imports --- #
+import argparse
+import io
+import sys
+from itertools import islice
+
+import numpy as np
+from PIL import Image
+
+from imgCodec import ENCODE_ROWS, as_channels, encode_rows, decode
+from indImgE import storage_mode, encode_header
+from indImgD import (OUTPUT_PROFILES, DEFAULT_PROFILE, parse_encoded_header,
+                     find_encoding_defects, format_defects, restore_palette, prepare_output)
+
+# source extension recorded in the header for each PIL format (--ext overrides)
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "BMP": ".bmp", "TIFF": ".tiff", "WEBP": ".webp"}
+
+# --- Helper Functions --- #
+
+def encode_stream(src, dst, ext=None) :
+    # image file bytes from src -> header + encrypted rows on dst, written + flushed every ENCODE_ROWS rows
+    # (image formats need the whole input before decoding, the output flows from the 1st chunk)
+    img = Image.open(io.BytesIO(src.read()))
+    ext = ext or FORMAT_EXTENSIONS.get(img.format, f".{(img.format or 'png').lower()}")
+
+    mode = storage_mode(img)
+    header = encode_header(img, mode, ext) # read before the conversion (palette / transparency)
+    if img.mode != mode :
+        img = img.convert(mode)
+    pixels = as_channels(np.asarray(img))
+
+    dst.write((header + "\n").encode('ascii'))
+    for top in range(0, pixels.shape[0], ENCODE_ROWS) :
+        dst.write(encode_rows(pixels[top:top + ENCODE_ROWS]))
+        dst.flush()
+
+    return img.size
+
+def decode_stream(src, dst, profile=DEFAULT_PROFILE, rows=ENCODE_ROWS) :
+    # encrypted .txt from src -> image file (profile's format) on dst
+    # rows are checked + decoded 'rows' at a time as they arrive, the image is saved once the input ends
+    first = src.readline()
+    fields, offset = parse_encoded_header(first)
+    header = first if offset else b""
+    pending = [] if offset else [first]
+
+    strips = []
+    width = height = 0
+    while True :
+        lines = pending + list(islice(src, rows - len(pending)))
+        pending = []
+        if not lines :
+            break
+
+        data = header + b"".join(lines)
+        defect_count, defects, (strip_width, strip_height) = find_encoding_defects(data)
+        if not defect_count and height and strip_width != width :
+            defect_count, defects = 1, [(1, 1, f"row is {strip_width} pixels, expected {width}")]
+        if defect_count :
+            shifted = [(row + height if row else 0, col, reason) for row, col, reason in defects]
+            raise ValueError(format_defects("<stdin>", defect_count, shifted))
+
+        strips.append(decode(data, validate=False).tobytes())
+        width, height = strip_width, height + strip_height
+
+    if not height :
+        raise ValueError("<stdin> : no pixel rows")
+
+    img = Image.frombytes(fields["mode"], (width, height), b"".join(strips))
+    restore_palette(img, fields)
+    img, ext, options = prepare_output(img, fields, profile)
+
+    out = io.BytesIO() # most image formats seek while saving, pipes cannot
+    img.save(out, format=Image.registered_extensions()[ext], **options)
+    dst.write(out.getbuffer())
+    dst.flush()
+
+    return img.size
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    parser = argparse.ArgumentParser(description="stdin / stdout encode + decode of the .txt format")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    encode_parser = commands.add_parser("encode", help="image on stdin -> .txt on stdout")
+    encode_parser.add_argument("--ext", help="source extension to record in the header, e.g. .png")
+
+    decode_parser = commands.add_parser("decode", help=".txt on stdin -> image on stdout")
+    decode_parser.add_argument("--profile", choices=list(OUTPUT_PROFILES), default=DEFAULT_PROFILE,
+                               help="output format profile")
+    args = parser.parse_args()
+
+    try :
+        if args.command == "encode" :
+            size = encode_stream(sys.stdin.buffer, sys.stdout.buffer, args.ext)
+        else :
+            size = decode_stream(sys.stdin.buffer, sys.stdout.buffer, args.profile)
+    except (ValueError, OSError) as e :
+        print(f"Nothing was {args.command}d.\n{e}", file=sys.stderr)
+        exit(1)
+
+    print(f"Image {args.command}d : {size[0]}x{size[1]}", file=sys.stderr) # stdout carries the data
@@ -1,10 +1,12 @@
 # --- imgTemplate.py --- #
 # select an img, pass ratios to crop, process (draw lines), return (overwrite)
+# runs as a session : decoded images + crops stay in an LRU cache, folder listings are cached until they change
 
 # notes : clean up everything + format + comment + readability
 
 # --- Imports --- #
 from PIL import Image, ImageDraw
+from collections import OrderedDict
 import os
 import re
 
@@ -15,6 +17,20 @@ IMG_DIRECTORIES = [
     "/Volumes/Macintosh HD/Users/User/Directory" # personal local custom directory
 ]
 
+CACHE_BYTES = 512 << 20 # decoded images + crops kept between variations (least recently used dropped first)
+
+# line color choices
+COLOR_OPTIONS = {
+    1: "red",
+    2: "blue",
+    3: "green",
+    4: "yellow",
+    5: "white",
+    6: "black",
+    7: "purple",
+    8: "orange"
+}
+
 # --- Helper Functions --- #
 
 def natural_sort_key(s) :
@@ -23,9 +39,8 @@ def natural_sort_key(s) :
     return [int(part) if part.isdigit() else part.lower() 
             for part in re.split('([0-9]+)', s)]
 
-def crop_img(image, ratio="1:1") :
-    width, height = image.size
-
+def crop_box(width, height, ratio="1:1") :
+    # (left, top, right, bottom) of the centered crop, None for an unknown ratio
     if ratio == "1:1" : # square crop (centered)
         side = min(width, height)
 
@@ -52,162 +67,231 @@ def crop_img(image, ratio="1:1") :
             bottom = top + new_height
 
     else :
+        return None
+
+    return left, top, right, bottom
+
+def crop_img(image, ratio="1:1") :
+    box = crop_box(*image.size, ratio)
+
+    if box is None :
         print("Invalid ratio. Defaulting to 1:1.")
         return crop_img(image, "1:1")
 
-    return image.crop((left, top, right, bottom))
+    return image.crop(box)
+
+def grid_lines(width, height) :
+    # (rows, columns) drawn by draw_lines : quarters, then the eighths in between
+    rows = [int(height / 4 * i) for i in range(1, 4)] + [int(height / 8 * i) for i in range(1, 8, 2)]
+    columns = [int(width / 4 * i) for i in range(1, 4)] + [int(width / 8 * i) for i in range(1, 8, 2)]
+    return rows, columns
 
 def draw_lines(image, color) :
     draw = ImageDraw.Draw(image) # create a drawing context
     width, height = image.size
-    
-    # calculate the positions for the lines
-    quarter_width = width / 4
-    quarter_height = height / 4
-
-    # draw three horizontal lines at 1/4, 2/4, and 3/4 of the height
-    for i in range(1, 4):
-        y = int(quarter_height * i)
-        draw.line((0, y, width, y), fill=color, width=1)
-
-    # draw three vertical lines at 1/4, 2/4, and 3/4 of the width
-    for i in range(1, 4):
-        x = int(quarter_width * i)
-        draw.line((x, 0, x, height), fill=color, width=1)
+    rows, columns = grid_lines(width, height)
 
-    # calculate the positions for the yellow lines (midpoints between red lines)
-    eighth_width = width / 8
-    eighth_height = height / 8
-
-    # draw yellow horizontal lines at 1/8, 3/8, 5/8, and 7/8 of the height
-    for i in range(1, 8, 2):
-        y = int(eighth_height * i)
+    # horizontal lines at 1/4, 2/4, 3/4 (+ 1/8, 3/8, 5/8, 7/8) of the height
+    for y in rows :
         draw.line((0, y, width, y), fill=color, width=1)
 
-    # draw yellow vertical lines at 1/8, 3/8, 5/8, and 7/8 of the width
-    for i in range(1, 8, 2):
-        x = int(eighth_width * i)
+    # vertical lines at the same fractions of the width
+    for x in columns :
         draw.line((x, 0, x, height), fill=color, width=1)
     
     return image
 
-# --- Main Entry Point --- #
-if __name__ == "__main__" :
+class ImageCache :
+    # size bounded LRU of decoded images, keyed by (path, mtime, size, ...) so edited files miss
+
+    def __init__(self, max_bytes=CACHE_BYTES) :
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.items = OrderedDict() # key -> (image, bytes)
+
+    def get(self, key) :
+        item = self.items.get(key)
+        if item is None :
+            return None
+        self.items.move_to_end(key) # most recently used
+        return item[0]
+
+    def put(self, key, image) :
+        size = image.width * image.height * len(image.getbands())
+        if size > self.max_bytes : # would evict everything and still not fit
+            return image
+        if key in self.items :
+            self.used -= self.items.pop(key)[1]
+
+        self.items[key] = (image, size)
+        self.used += size
+        while self.used > self.max_bytes :
+            _, (_, dropped) = self.items.popitem(last=False) # least recently used
+            self.used -= dropped
+        return image
+
+def file_key(path) :
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+def load_image(path, cache) :
+    # decoded image from the cache, decoded once on a miss
+    key = file_key(path)
+    image = cache.get(key)
+    if image is None :
+        with Image.open(path) as img :
+            img.load() # pixels stay in memory once the file is closed
+            image = cache.put(key, img)
+    return image
 
-    # 1. Directory Selection
-    existing_dirs = [d for d in IMG_DIRECTORIES if os.path.exists(d)]
+def load_crop(path, ratio, cache) :
+    # crop_img result from the cache (keyed on the source file + ratio)
+    key = file_key(path) + (ratio,)
+    cropped = cache.get(key)
+    if cropped is None :
+        cropped = cache.put(key, crop_img(load_image(path, cache), ratio))
+    return cropped
 
-    if not existing_dirs :
-        print("ERROR: No valid directories found from the hardcoded list.")
-        exit()
+class ListingCache :
+    # directory listings, rescanned only when the directory's mtime changes (a file added / removed / renamed)
 
-    print("\nAvailable base directories:")
-    for i, directory in enumerate(existing_dirs) :
-        print(f"{i+1}. {directory}")
+    def __init__(self) :
+        self.listings = {} # path -> (mtime_ns, names)
 
-    try :
-        dir_choice = int(input("\nSelect base directory number: ")) - 1
-        if dir_choice < 0 or dir_choice >= len(existing_dirs):
-            raise ValueError
-        base_dir = existing_dirs[dir_choice]
-    except ValueError :
-        print("Invalid directory selection.")
-        exit()
+    def listdir(self, path) :
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.listings.get(path)
+        if cached is None or cached[0] != mtime :
+            cached = self.listings[path] = (mtime, os.listdir(path))
+        return cached[1]
 
-    # 2. Folder Selection
-    folders = [f for f in os.listdir(base_dir)
-               if os.path.isdir(os.path.join(base_dir, f))]
-    folders.sort(key=natural_sort_key)
-
-    if not folders :
-        print("No folders found in directory.")
-        exit()
-
-    print("\nAvailable folders:")
-    for i, foldername in enumerate(folders):
-        print(f"{i+1}. {foldername}")
+def select_from(items, prompt) :
+    # prints a numbered list, returns the chosen item or None
+    for i, item in enumerate(items) :
+        print(f"{i+1}. {item}")
 
     try :
-        selection = int(input("\nEnter folder number: ")) - 1
-        if selection < 0 or selection >= len(folders):
+        selection = int(input(prompt)) - 1
+        if selection < 0 or selection >= len(items) :
             raise ValueError
-        
     except ValueError :
         print("Invalid selection.")
-        exit()
-
-    selected_folder = folders[selection]
-    folder_path = os.path.join(base_dir, selected_folder)
+        return None
 
-    # 3. File Selection (JPG only)
-    image_files = [f for f in os.listdir(folder_path)
-                   if f.lower().endswith('.jpg')]
-    image_files.sort(key=natural_sort_key)
+    return items[selection]
 
-    if not image_files:
-        print("No image (.jpg) files found in directory.")
-        exit()
-
-    print("\nAvailable image files:")
-    for i, filename in enumerate(image_files):
-        print(f"{i+1}. {filename}")
-
-    try:
-        selection = int(input("\nEnter image number: ")) - 1
-        if selection < 0 or selection >= len(image_files):
-            raise ValueError
-    except ValueError:
-        print("Invalid selection.")
-        exit()
-
-    selected_file = image_files[selection]
-    image_path = os.path.join(folder_path, selected_file)
-
-    # 4. Aspect Ratio Selection
+def select_ratio() :
     print("\nSelect crop ratio:")
     print("1. Square (1:1)")
     print("2. Rectangle (4:3)")
 
-    try:
+    try :
         ratio_choice = int(input("Choice: "))
         if ratio_choice == 1 :
-            ratio = "1:1"
+            return "1:1"
         elif ratio_choice == 2 :
-            ratio = "4:3"
+            return "4:3"
         else :
             raise ValueError
-        
+
     except ValueError :
         print("Invalid ratio selected. Defaulting to 1:1.")
-        ratio = "1:1"
-
-    # 4.5 Line Color Selection
-    color_options = {
-        1: "red",
-        2: "blue",
-        3: "green",
-        4: "yellow",
-        5: "white",
-        6: "black",
-        7: "purple",
-        8: "orange"
-    }
+        return "1:1"
 
+def select_color() :
     print("\nSelect line color:")
-    for key, value in color_options.items():
+    for key, value in COLOR_OPTIONS.items() :
         print(f"{key}. {value}")
 
-    try:
+    try :
         color_choice = int(input("Choice: "))
-        color = color_options.get(color_choice, "red")
+        return COLOR_OPTIONS.get(color_choice, "red")
     except ValueError :
         print("Invalid color selected. Defaulting to red.")
-        color = "red"
+        return "red"
+
+# --- Main Entry Point --- #
+if __name__ == "__main__" :
+
+    images = ImageCache()
+    listings = ListingCache()
+
+    # 1. Directory Selection
+    existing_dirs = [d for d in IMG_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    base_dir = select_from(existing_dirs, "\nSelect base directory number: ")
+    if base_dir is None :
+        exit()
 
-    # 5. Load, Crop, Draw, and Save
-    with Image.open(image_path) as img:
-        cropped = crop_img(img, ratio)
-        final_image = draw_lines(cropped, color)
+    # session : folder -> image -> variations, 'next' picks where to go back to
+    folder_path = image_path = None
+    while True :
+
+        # 2. Folder Selection
+        if folder_path is None :
+            folders = [f for f in listings.listdir(base_dir)
+                       if os.path.isdir(os.path.join(base_dir, f))]
+            folders.sort(key=natural_sort_key)
+
+            if not folders :
+                print("No folders found in directory.")
+                exit()
+
+            print("\nAvailable folders:")
+            selected_folder = select_from(folders, "\nEnter folder number: ")
+            if selected_folder is None :
+                continue
+            folder_path = os.path.join(base_dir, selected_folder)
+
+        # 3. File Selection (JPG only)
+        if image_path is None :
+            image_files = [f for f in listings.listdir(folder_path)
+                           if f.lower().endswith('.jpg')]
+            image_files.sort(key=natural_sort_key)
+
+            if not image_files :
+                print("No image (.jpg) files found in directory.")
+                folder_path = None
+                continue
+
+            print("\nAvailable image files:")
+            selected_file = select_from(image_files, "\nEnter image number: ")
+            if selected_file is None :
+                continue
+            image_path = os.path.join(folder_path, selected_file)
+
+        # 4. Aspect Ratio + Line Color Selection
+        ratio = select_ratio()
+        color = select_color()
+
+        # 5. Crop (cached), Draw on a copy, and Save
+        try :
+            cropped = load_crop(image_path, ratio, images)
+        except OSError as e :
+            print(f"Could not open image: {e}")
+            image_path = None
+            continue
+
+        final_image = draw_lines(cropped.copy(), color)
         output_path = os.path.join(folder_path, f"xxx_{selected_file}")
         final_image.save(output_path)
-        print(f"\nImage saved as: {output_path}")
\ No newline at end of file
+        print(f"\nImage saved as: {output_path}")
+
+        # 6. Next
+        print("\n1. Same image, another ratio / color")
+        print("2. Another image in this folder")
+        print("3. Another folder")
+        print("4. Quit")
+        choice = input("Choice (enter for 1): ").strip() or "1"
+
+        if choice == "2" :
+            image_path = None
+        elif choice == "3" :
+            folder_path = image_path = None
+        elif choice != "1" :
+            break
@@ -0,0 +1,295 @@
+# --- imgTransform.py --- #
+# crop / flip / rotate / grid lines applied straight to an encrypted .txt (specific format)
+# every pixel is a fixed size token ('XY..' + ' ') in fixed stride rows : transforms are numpy views over
+# the tokens (slicing, reversing, rot90) and one copy into the output rows, nothing is decoded / re-encoded
+#   import imgTransform
+#   data = imgTransform.transform_text(data, [("crop", (0, 0, 64, 64)), ("rotate", 1), ("grid", "red")])
+#   imgTransform.transform_text_file("photo.txt", "xxx_photo.txt", [("flip", "horizontal")])
+
+# --- Imports --- #
+import hashlib
+import mmap
+import os
+import re
+import zlib
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from PIL import ImageColor
+
+from imgCodec import TOKEN_TABLE, read_layout, release_views
+from imgParallel import add_strip_crcs
+from imgTemplate import crop_box, grid_lines
+from indImgE import checksum_path, write_checksums, STRIP_ROWS
+from indImgD import VALID_DIRECTORIES, MODE_CHANNELS, read_checksums
+
+# transform names accepted by transform_text (with their argument)
+TRANSFORMS = {
+    "crop": "(left, top, right, bottom) box or a ratio '1:1' / '4:3' (centered, like imgTemplate.crop_img)",
+    "flip": "'horizontal' or 'vertical'",
+    "rotate": "quarter turns counter clockwise (1 = 90, 2 = 180, 3 = 270, like Image.rotate)",
+    "grid": "line color, draws the imgTemplate.draw_lines grid",
+}
+
+# --- Helper Functions --- #
+
+def natural_sort_key(s) :
+    # function for natural sorting
+    # Ex. ['a10.jpg', 'a2.jpg'] -> ['a2.jpg', 'a10.jpg']
+    return [int(part) if part.isdigit() else part.lower()
+            for part in re.split('([0-9]+)', s)]
+
+def token_view(data) :
+    # (header line, header fields, read only HxWx(token) view straight over data)
+    # only the layout is checked (row lengths), token contents are copied as they are
+    buf, fields, offset, (width, height), stride = read_layout(data)
+    token_width = MODE_CHANNELS[fields["mode"]] * 2 + 1
+
+    ends = as_strided(buf[offset + stride - 1:], shape=(height - 1,), strides=(stride,))
+    if height > 1 and not (ends == ord('\n')).all() :
+        raise ValueError("rows have different lengths (run find_encoding_defects for details)")
+
+    header = bytes(buf[:offset]).rstrip(b'\r\n') + b'\n' if offset else b"" # line endings -> \n
+    tokens = as_strided(buf[offset:], shape=(height, width, token_width),
+                        strides=(stride, token_width, 1), writeable=False)
+    return header, fields, tokens
+
+def color_token(color, fields) :
+    # the token of a color name / '#rrggbb' in the image's mode (P : exact palette entry)
+    mode = fields["mode"]
+    if mode == "P" :
+        rgb = ImageColor.getrgb(color)[:3]
+        palette = bytes.fromhex(fields["palette"])
+        entries = [tuple(palette[i:i + 3]) for i in range(0, len(palette), 3)]
+        if rgb not in entries :
+            raise ValueError(f"{color} is not in the image's palette")
+        values = (entries.index(rgb),)
+    else :
+        values = ImageColor.getcolor(color, mode)
+        values = values if isinstance(values, tuple) else (values,)
+
+    return np.append(TOKEN_TABLE[list(values)].ravel(), np.uint8(ord(' ')))
+
+def draw_grid(tokens, token) :
+    # writes the color token on the imgTemplate grid lines (in place)
+    height, width, _ = tokens.shape
+    rows, columns = grid_lines(width, height)
+    tokens[rows] = token
+    tokens[:, columns] = token
+
+def apply_transform(tokens, fields, name, arg) :
+    # one transform on the token array, a view whenever possible
+    if name == "crop" :
+        height, width, _ = tokens.shape
+        box = crop_box(width, height, arg) if isinstance(arg, str) else tuple(arg)
+        if box is None :
+            raise ValueError(f"unknown crop ratio {arg!r}")
+        left, top, right, bottom = box
+        if not (0 <= left < right <= width and 0 <= top < bottom <= height) :
+            raise ValueError(f"crop box {box} is outside the {width}x{height} image")
+        return tokens[top:bottom, left:right]
+
+    if name == "flip" :
+        if arg not in ("horizontal", "vertical") :
+            raise ValueError(f"flip is 'horizontal' or 'vertical', not {arg!r}")
+        return tokens[:, ::-1] if arg == "horizontal" else tokens[::-1]
+
+    if name == "rotate" :
+        return np.rot90(tokens, int(arg) % 4, axes=(0, 1))
+
+    if name == "grid" :
+        if not tokens.flags.writeable : # still a view over the input
+            tokens = tokens.copy()
+        draw_grid(tokens, color_token(arg, fields))
+        return tokens
+
+    raise ValueError(f"unknown transform {name!r}, expected one of {sorted(TRANSFORMS)}")
+
+def join_rows(tokens) :
+    # the one copy : token array -> contiguous rows with their newline
+    height, width, token_width = tokens.shape
+    rows = np.empty((height, width * token_width + 1), dtype=np.uint8)
+    np.copyto(rows[:, :-1].reshape(height, width, token_width), tokens)
+    rows[:, -1] = ord('\n')
+    return rows
+
+def transform_rows(data, transforms) :
+    # (header line, header fields, output rows array) of the transformed image
+    # 'transforms' is a list of (name, argument), see TRANSFORMS
+    header, fields, tokens = token_view(data)
+
+    # grid lines at the end are drawn on the output copy, earlier ones need a copy of their own
+    geometry = len(transforms)
+    while geometry and transforms[geometry - 1][0] == "grid" :
+        geometry -= 1
+
+    for name, arg in transforms[:geometry] :
+        tokens = apply_transform(tokens, fields, name, arg)
+
+    rows = join_rows(tokens)
+    for _, color in transforms[geometry:] :
+        draw_grid(rows[:, :-1].reshape(tokens.shape), color_token(color, fields))
+
+    return header, fields, rows
+
+def transform_text(data, transforms) :
+    # transformed copy of encoded data (bytes / mmap / any buffer) as bytes
+    # the header (mode, palette, ...) is kept, rows are written with \n
+    header, _, rows = transform_rows(data, transforms)
+    return header + rows.tobytes()
+
+def rows_checksums(header, fields, rows) :
+    # sidecar checksums of output rows : sha256 of the pixels + CRC32 per STRIP_ROWS text lines
+    # (the sha256 needs the pixel values, the only decode done here)
+    crcs = []
+    line, crc = (1, zlib.crc32(header)) if header else (0, 0)
+    line, crc = add_strip_crcs(rows, line, rows.shape[1], crc, crcs)
+    if line % STRIP_ROWS :
+        crcs.append(crc)
+
+    token_width = MODE_CHANNELS[fields["mode"]] * 2 + 1
+    tokens = rows[:, :-1].reshape(rows.shape[0], -1, token_width)
+    pixels = tokens[:, :, 0:token_width - 1:2] - ord('A') # uint8 wraparound cancels out
+    pixels *= 10
+    pixels += tokens[:, :, 1:token_width - 1:2]
+    pixels -= ord('0')
+
+    return {"sha256": hashlib.sha256(pixels.tobytes()).hexdigest(), "crcs": crcs}
+
+def transform_text_file(text_path, output_path, transforms) :
+    # writes the transformed .txt to output_path, the source is kept
+    # a source with a checksum sidecar gets one for the output too
+    with open(text_path, 'rb') as f :
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data : # no read copy of the source
+            try :
+                header, fields, rows = transform_rows(data, transforms)
+            except ValueError as e :
+                release_views(e) # token views dropped before the mmap closes, the ValueError reaches the caller
+                raise
+
+    with open(output_path, 'wb') as f :
+        f.write(header)
+        f.write(rows)
+
+    if read_checksums(text_path) :
+        write_checksums(checksum_path(output_path), rows_checksums(header, fields, rows))
+
+    print(f"Image transformed to : {output_path}")
+    return output_path
+
+# --- Main Entry Point --- #
+
+if __name__ == "__main__" :
+
+    # --- 1. Directory Selection --- #
+
+    existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
+
+    if not existing_dirs :
+        print("ERROR: No valid directories found from the hardcoded list.")
+        exit()
+
+    print("\nAvailable base directories:")
+    for i, directory in enumerate(existing_dirs) :
+        print(f"{i+1}. {directory}")
+
+    try :
+        dir_choice = int(input("\nSelect base directory number: ")) - 1
+        if dir_choice < 0 or dir_choice >= len(existing_dirs) :
+            raise ValueError
+        base_dir = existing_dirs[dir_choice]
+    except ValueError :
+        print("Invalid directory selection.")
+        exit()
+
+    # --- 2. Folder Selection --- #
+
+    folders = [f for f in os.listdir(base_dir)
+               if os.path.isdir(os.path.join(base_dir, f))
+               and not f.startswith('.')] # skip .*
+    folders.sort(key=natural_sort_key)
+
+    if not folders :
+        print("No folders found in directory.")
+        exit()
+
+    print("\nAvailable folders:")
+    for i, foldername in enumerate(folders) :
+        print(f"{i+1}. {foldername}")
+
+    try :
+        selection = int(input("\nEnter folder number: ")) - 1
+        if selection < 0 or selection >= len(folders) :
+            raise ValueError
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    folder_path = os.path.join(base_dir, folders[selection])
+
+    # --- 3. File Selection (.txt only) --- #
+
+    text_files = [f for f in os.listdir(folder_path)
+                  if f.lower().endswith('.txt') and not f.startswith('.') and f != "metadata.txt"]
+    text_files.sort(key=natural_sort_key)
+
+    if not text_files :
+        print("No .txt files found in directory.")
+        exit()
+
+    print("\nAvailable .txt files:")
+    for i, filename in enumerate(text_files) :
+        print(f"{i+1}. {filename}")
+
+    try :
+        selection = int(input("\nEnter file number to transform: ")) - 1
+        if selection < 0 or selection >= len(text_files) :
+            raise ValueError
+    except ValueError :
+        print("Invalid selection.")
+        exit()
+
+    selected_file = text_files[selection]
+    text_path = os.path.join(folder_path, selected_file)
+
+    # --- 4. Transform Selection (applied in order, enter to run) --- #
+
+    options = {
+        1: ("crop", "1:1"),
+        2: ("crop", "4:3"),
+        3: ("flip", "horizontal"),
+        4: ("flip", "vertical"),
+        5: ("rotate", 1),
+        6: ("rotate", 2),
+        7: ("rotate", 3),
+        8: ("grid", None), # color asked below
+    }
+
+    print("\nTransforms:")
+    print("1. Crop square (1:1)\n2. Crop rectangle (4:3)\n3. Flip horizontal\n4. Flip vertical")
+    print("5. Rotate 90\n6. Rotate 180\n7. Rotate 270\n8. Grid lines")
+
+    transforms = []
+    while True :
+        choice = input("Add transform number (enter to run): ").strip()
+        if not choice :
+            break
+        try :
+            name, arg = options[int(choice)]
+        except (ValueError, KeyError) :
+            print("Invalid selection.")
+            continue
+        if name == "grid" :
+            arg = input("Line color, e.g. red / #ff8800 (enter for red): ").strip() or "red"
+        transforms.append((name, arg))
+
+    if not transforms :
+        print("No transforms selected.")
+        exit()
+
+    # --- 5. Transform (source .txt is kept) --- #
+
+    try :
+        transform_text_file(text_path, os.path.join(folder_path, f"xxx_{selected_file}"), transforms)
+    except ValueError as e :
+        print(f"Nothing was transformed.\n{e}")
@@ -4,9 +4,16 @@
 # notes : I want to clean up comments + prints + format
 
 # --- Imports --- #
+import hashlib
 import os
 import re
-from PIL import Image
+import sys
+from itertools import islice
+from PIL import Image, features
+import numpy as np
+
+from imgChecksum import checksum_path, read_checksums, find_bad_strips, format_bad_strips # .sum sidecars
+from imgMemory import memory_budget, format_memory, report_peak_memory # --max-memory helpers
 
 # Hardcoded variables
 VALID_DIRECTORIES = [
@@ -16,6 +23,38 @@ VALID_DIRECTORIES = [
     "/Volumes/Macintosh HD/Users/User/Directory" # personal local custom directory
 ]
 
+# encoded format
+HEADER_PREFIX = b"#IMG " # optional 1st line : '#IMG mode=L ...' (no header -> RGB)
+MODE_CHANNELS = {"L": 1, "LA": 2, "RGB": 3, "RGBA": 4, "P": 1} # 2 chars per channel
+MAX_REPORTED_DEFECTS = 20 # cap on defects listed per file
+
+# memory budget (--max-memory on the command line), estimates are rough on purpose
+PROCESS_MEMORY = 64 << 20 # one python process with numpy + Pillow loaded
+PIXEL_MEMORY = {"L": 1, "P": 1, "LA": 4, "RGB": 4, "RGBA": 4} # bytes per pixel of a Pillow image
+STRIP_OVERHEAD = 16 # bytes held per .txt byte of a strip while it is checked / decoded
+
+# output profiles : extension + Pillow save options
+OUTPUT_PROFILES = {
+    "png" : {"ext": ".png", "options": {"compress_level": 1}, "about": "lossless, fast compression (default)"},
+    "png-small" : {"ext": ".png", "options": {"compress_level": 9}, "about": "lossless, smallest file, slow"},
+    "webp" : {"ext": ".webp", "options": {"lossless": True, "quality": 0, "method": 0, "exact": True},
+              "about": "lossless webp, fast effort"}, # exact : keeps the rgb of fully transparent pixels
+    "tiff" : {"ext": ".tiff", "options": {}, "about": "uncompressed, fast write"},
+    "bmp" : {"ext": ".bmp", "options": {}, "about": "uncompressed, fastest save"},
+    "jpg" : {"ext": ".jpg", "options": {"quality": 100}, "about": "lossy, legacy output"},
+    "original" : {"ext": None, "options": {}, "about": "extension recorded when encrypted"},
+}
+DEFAULT_PROFILE = "png"
+FASTEST_PROFILE = "bmp"
+LOSSY_FORMATS = (".jpg", ".jpeg") # saved pixels are not read back
+
+# modes each output format can hold (formats not listed take all of them)
+FORMAT_MODES = {
+    ".jpg": ("L", "RGB"),
+    ".jpeg": ("L", "RGB"),
+    ".bmp": ("L", "P", "RGB"),
+}
+
 # --- Helper Functions --- #
 
 def natural_sort_key(s) :
@@ -34,30 +73,199 @@ def encrypted_string_to_value(encrypted_str) :
 
     return value # alt : return (ord(char) - ord('A')) * 10 + int(digit)
 
-def encrypted_pixel_to_rgb(encrypted_pixel) :
-    # split the encrypted pixel into RGB components
-    red_str = encrypted_pixel[0:2]
-    green_str = encrypted_pixel[2:4]
-    blue_str = encrypted_pixel[4:6]
-
-    # convert each component back to an RGB value
-    r = encrypted_string_to_value(red_str)
-    g = encrypted_string_to_value(green_str)
-    b = encrypted_string_to_value(blue_str)
-
-    return r, g, b
-
-def decrypt_text_to_image(text_path, output_image_path) :
-    # read encrypted text file
-    with open(text_path, 'r') as f :
-        lines = f.readlines()
+def encrypted_pixel_to_values(encrypted_pixel) :
+    # split the encrypted pixel into its 2-char channels
+    # (1 channel for L / P, 2 for LA, 3 for RGB, 4 for RGBA)
+    return tuple(encrypted_string_to_value(encrypted_pixel[i:i + 2])
+                 for i in range(0, len(encrypted_pixel), 2))
+
+def parse_encoded_header(data) :
+    # reads the optional '#IMG key=value ...' 1st line
+    # returns (fields, offset of 1st pixel row) ; headerless files are plain RGB
+    if not data.startswith(HEADER_PREFIX) :
+        return {"mode": "RGB"}, 0
+
+    end = data.find(b'\n')
+    end = len(data) if end < 0 else end
+    fields = dict(field.split('=', 1)
+                  for field in bytes(data[len(HEADER_PREFIX):end]).decode('ascii').split()
+                  if '=' in field)
+    fields.setdefault("mode", "RGB")
+
+    return fields, end + 1
+
+def find_encoding_defects(data, limit=MAX_REPORTED_DEFECTS) :
+    # vectorized format check over a whole encoded buffer (no per-pixel loop)
+    # returns (defect_count, defects, (width, height))
+    # defects are (row, col, reason) with 1-based pixel row / column, capped at 'limit'
+    data = bytes(data).replace(b'\r\n', b'\n') # tolerate windows line endings
+    fields, offset = parse_encoded_header(data)
+    mode = fields["mode"]
+
+    if mode not in MODE_CHANNELS :
+        return 1, [(0, 0, f"unsupported mode {mode!r} in header")], (0, 0)
+    if mode == "P" and "palette" not in fields :
+        return 1, [(0, 0, "palette image without a palette in header")], (0, 0)
+    if not data[offset:].strip() :
+        return 1, [(1, 1, "file has no pixel rows")], (0, 0)
+    if not data.endswith(b'\n') :
+        data += b'\n'
+
+    token_width = MODE_CHANNELS[mode] * 2 + 1 # 2 chars per channel + separator
+    buf = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    newlines = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate(([0], newlines[:-1] + 1))
+    lengths = newlines - starts
+
+    # 1. row lengths (the 1st row sets the expected width)
+    row_bytes = int(lengths[0])
+    width = row_bytes // token_width
+    height = len(lengths)
+    defects = []
+    defect_count = 0
+
+    if row_bytes == 0 or row_bytes % token_width :
+        return 1, [(1, width + 1, f"row is {row_bytes} bytes, not a multiple of {token_width}")], (width, height)
+
+    bad_rows = np.flatnonzero(lengths != row_bytes)
+    defect_count += len(bad_rows)
+    for y in bad_rows[:limit] :
+        defects.append((int(y) + 1, int(min(lengths[y], row_bytes)) // token_width + 1,
+                        f"row is {lengths[y]} bytes, expected {row_bytes} ({width} pixels)"))
+
+    # 2. gather the well-formed rows into a (rows, width, token) array
+    good_rows = np.flatnonzero(lengths == row_bytes)
+    if len(bad_rows) == 0 :
+        tokens = buf.reshape(height, row_bytes + 1)[:, :row_bytes] # zero-copy view
+    else :
+        tokens = buf[starts[good_rows][:, None] + np.arange(row_bytes)]
+    tokens = tokens.reshape(len(good_rows), width, token_width)
+
+    # 3. character set + channel range checks
+    letters = tokens[:, :, 0:token_width - 1:2]
+    digits = tokens[:, :, 1:token_width - 1:2]
+    bad_letter = (letters < ord('A')) | (letters > ord('Z'))
+    bad_digit = (digits < ord('0')) | (digits > ord('9'))
+    values = (letters.astype(np.int16) - ord('A')) * 10 + (digits.astype(np.int16) - ord('0'))
+    too_large = (values > 255) & ~bad_letter & ~bad_digit
+    bad_space = tokens[:, :, -1] != ord(' ')
+
+    checks = [
+        (bad_letter, letters, "invalid character {!r} in channel {}"),
+        (bad_digit, digits, "invalid digit {!r} in channel {}"),
+        (too_large, values, "channel {1} value {0} is above 255"),
+    ]
+    for mask, source, message in checks :
+        defect_count += int(np.count_nonzero(mask))
+        for g, x, c in np.argwhere(mask)[:max(limit - len(defects), 0)] :
+            found = source[g, x, c]
+            found = chr(found) if source is not values else int(found)
+            defects.append((int(good_rows[g]) + 1, int(x) + 1, message.format(found, mode[c])))
+
+    defect_count += int(np.count_nonzero(bad_space))
+    for g, x in np.argwhere(bad_space)[:max(limit - len(defects), 0)] :
+        defects.append((int(good_rows[g]) + 1, int(x) + 1,
+                        f"missing pixel separator (found {chr(tokens[g, x, -1])!r})"))
+
+    defects.sort()
+    return defect_count, defects, (width, height)
+
+def iter_strips(text_path, rows) :
+    # yields (header line, index of the strip's 1st row, bytes of up to 'rows' pixel rows)
+    # the file is read line by line, never whole ; yields at least once (empty files are reported by the check)
+    with open(text_path, 'rb') as f :
+        header = f.readline()
+        if not header.startswith(HEADER_PREFIX) :
+            header = b""
+            f.seek(0)
+
+        top = 0
+        lines = list(islice(f, rows))
+        yield header, top, b"".join(lines)
+        while len(lines) == rows :
+            top += rows
+            lines = list(islice(f, rows))
+            if lines :
+                yield header, top, b"".join(lines)
+
+def validate_encoded_text(text_path, limit=MAX_REPORTED_DEFECTS, rows=None) :
+    # reads the whole .txt in one go and runs the format check on it
+    # with 'rows', checks 'rows' pixel rows at a time instead (bounded memory, same report)
+    if rows is None :
+        with open(text_path, 'rb') as f :
+            return find_encoding_defects(f.read(), limit)
+
+    defect_count, defects = 0, []
+    width, height = None, 0
+    for header, top, data in iter_strips(text_path, rows) :
+        count, found, (strip_width, strip_height) = find_encoding_defects(header + data, limit)
+        if found and found[0][0] == 0 : # header problem, same for every strip
+            return count, found, (0, 0)
+        if not count and width not in (None, strip_width) :
+            count, found = 1, [(1, 1, f"row is {strip_width} pixels, expected {width}")]
+
+        width = strip_width if width is None else width
+        height += strip_height
+        defect_count += count
+        defects.extend((row + top, col, reason) for row, col, reason in found)
+
+    return defect_count, sorted(defects)[:limit], (width, height)
+
+def format_defects(text_path, defect_count, defects) :
+    # builds a readable report of the (capped) defect list
+    lines = [f"{os.path.basename(text_path)} : {defect_count} defect(s)"]
+    for row, col, reason in defects :
+        lines.append(f"  row {row}, col {col} : {reason}")
+    if defect_count > len(defects) :
+        lines.append(f"  ... {defect_count - len(defects)} more")
+    return "\n".join(lines)
+
+def resolve_output_format(profile, fields) :
+    # returns (extension, save options) for a profile
+    # 'original' uses the extension from the header, webp falls back to png if unsupported
+    # and bmp to tiff for images with alpha
+    settings = OUTPUT_PROFILES[profile]
+    ext = settings["ext"]
+    options = dict(settings["options"])
+
+    if ext is None :
+        ext = fields.get("ext", OUTPUT_PROFILES[DEFAULT_PROFILE]["ext"])
+        options = {"quality": 100} if ext in (".jpg", ".jpeg") else {}
+
+    if ext == ".webp" and not features.check("webp") :
+        print("WebP not supported by this Pillow build. Saving as png.")
+        ext, options = ".png", dict(OUTPUT_PROFILES[DEFAULT_PROFILE]["options"])
+
+    if ext == ".bmp" and fields["mode"] in ("LA", "RGBA") :
+        ext = ".tiff" # bmp drops alpha, tiff is just as raw
+
+    return ext, options
+
+def fit_mode_to_format(img, ext) :
+    # convert only when the output format cannot hold the decoded mode
+    allowed = FORMAT_MODES.get(ext)
+    if allowed is None or img.mode in allowed :
+        return img
+
+    keep_alpha = ("A" in img.mode or "transparency" in img.info) and "RGBA" in allowed
+    return img.convert("RGBA" if keep_alpha else "RGB")
+
+def encrypted_lines_to_image(lines) :
+    # rebuilds the image from the lines of an (already validated) encrypted text
+    # returns (image, header fields)
+
+    # read the mode header (files without one are RGB)
+    fields, offset = parse_encoded_header(lines[0].encode('ascii'))
+    if offset :
+        lines = lines[1:]
+    mode = fields["mode"]
     
     # determine the image dimensions
     height = len(lines)
     width = len(lines[0].strip().split()) # number of pixels in the 1st row
 
-    # create new image
-    img = Image.new('RGB', (width, height))
+    # create new image in the source mode
+    img = Image.new(mode, (width, height))
     pixels = img.load()
 
     # process each line (row of pixels)
@@ -65,21 +273,134 @@ def decrypt_text_to_image(text_path, output_image_path) :
         # split the line into individual encrypted pixels
         encrypted_pixels = lines[y].strip().split()
         for x in range(width) :
-            # convert the encrypted pixel back to RGB values
-            r, g, b = encrypted_pixel_to_rgb(encrypted_pixels[x])
-
-            # set the pixel in the image
-            pixels[x, y] = (r, g, b)
-    
-    # save the reconstructed image
-    img.save(output_image_path, quality=100) # high quality output
+            # convert the encrypted pixel back to its channel values
+            values = encrypted_pixel_to_values(encrypted_pixels[x])
+
+            # set the pixel in the image (single channel modes take an int)
+            pixels[x, y] = values if len(values) > 1 else values[0]
+
+    restore_palette(img, fields)
+
+    return img, fields
+
+def restore_palette(img, fields) :
+    # palette + transparency recorded in the header
+    if img.mode == "P" :
+        img.putpalette(bytes.fromhex(fields["palette"]))
+    if "transparency" in fields :
+        img.info["transparency"] = int(fields["transparency"])
+    elif "alpha" in fields :
+        img.info["transparency"] = bytes.fromhex(fields["alpha"])
+
+def budget_strip_rows(text_path, max_memory) :
+    # pixel rows per strip keeping the output image + one strip under max_memory, None when even 1 row does not fit
+    with open(text_path, 'rb') as f :
+        first = f.readline()
+        fields, offset = parse_encoded_header(first)
+        row = f.readline() if offset else first
+
+    stride = max(len(row), 1)
+    channels = MODE_CHANNELS.get(fields["mode"], 3)
+    width = len(row.rstrip(b'\r\n')) // (channels * 2 + 1)
+    height = os.path.getsize(text_path) // stride
+    image = width * height * PIXEL_MEMORY.get(fields["mode"], 4)
+
+    rows = (max_memory - PROCESS_MEMORY - image) // (stride * STRIP_OVERHEAD)
+    return int(rows) if rows >= 1 else None
+
+def decode_text_in_strips(text_path, rows) :
+    # budget mode : validates, then decodes 'rows' pixel rows at a time into the output image
+    # returns (image, header fields, sha256 of the pixels) ; only the image is ever held whole
+    defect_count, defects, (width, height) = validate_encoded_text(text_path, rows=rows)
+    if defect_count :
+        raise ValueError(format_defects(text_path, defect_count, defects))
+
+    img = None
+    digest = hashlib.sha256()
+    for header, top, data in iter_strips(text_path, rows) :
+        strip, fields = encrypted_lines_to_image((header + data).decode('ascii').splitlines())
+        if img is None :
+            img = Image.new(strip.mode, (width, height))
+        img.paste(strip, (0, top))
+        digest.update(strip.tobytes()) # strips in order = the whole image's bytes
+
+    restore_palette(img, fields)
+    return img, fields, digest.hexdigest()
+
+def saved_image_matches(saved, img, ext) :
+    # reads a just saved image (path / file object) back and compares it with the pixels that were saved
+    # lossy formats are not compared ; a mode the format stores differently (webp keeps L as RGB) is compared as RGBA
+    if ext in LOSSY_FORMATS :
+        return True
+
+    with Image.open(saved) as out :
+        if out.mode == img.mode and out.mode != "P" :
+            return out.tobytes() == img.tobytes()
+        return out.convert("RGBA").tobytes() == img.convert("RGBA").tobytes()
+
+def prepare_output(img, fields, profile=DEFAULT_PROFILE, **save_options) :
+    # returns (image fitted to the profile's format, extension, save options)
+    ext, options = resolve_output_format(profile, fields)
+    options.update(save_options)
+
+    return fit_mode_to_format(img, ext), ext, options
+
+def decrypt_text_to_image(text_path, output_image_path, profile=DEFAULT_PROFILE, max_memory=None, **save_options) :
+    # decodes a .txt into an image saved with an output profile (see OUTPUT_PROFILES)
+    # the extension of output_image_path follows the profile, save_options override its settings
+    # max_memory (bytes) reads + decodes the file in strips sized to stay under it
+    # returns the path actually written
+
+    if max_memory :
+        rows = budget_strip_rows(text_path, max_memory)
+        if rows is None :
+            raise ValueError(f"{os.path.basename(text_path)} : decoded image alone is over the "
+                             f"{format_memory(max_memory)} memory budget, skipped")
+        img, fields, digest = decode_text_in_strips(text_path, rows)
+
+    else :
+        # validate the whole file before any decode work
+        defect_count, defects, _ = validate_encoded_text(text_path)
+        if defect_count :
+            raise ValueError(format_defects(text_path, defect_count, defects))
+
+        # read encrypted text file
+        with open(text_path, 'r') as f :
+            lines = f.readlines()
+
+        img, fields = encrypted_lines_to_image(lines)
+        digest = None
+
+    # confirm the round trip against the source pixels (when encoded with a sidecar) before removing anything
+    sums = read_checksums(text_path)
+    if sums and (digest or hashlib.sha256(img.tobytes()).hexdigest()) != sums["sha256"] :
+        with open(text_path, 'rb') as f :
+            bad = find_bad_strips(f, sums["crcs"], sums["strip"])
+        where = format_bad_strips(bad, sums["strip"]) if bad else "checksum file itself"
+        raise ValueError(f"{os.path.basename(text_path)} : decoded pixels differ from the source image ({where})")
+
+    # save the reconstructed image with the selected profile
+    img, ext, options = prepare_output(img, fields, profile, **save_options)
+    output_image_path = os.path.splitext(output_image_path)[0] + ext
+
+    img.save(output_image_path, **options)
+    if not saved_image_matches(output_image_path, img, ext) :
+        os.remove(output_image_path)
+        raise ValueError(f"{output_image_path} : saved image differs from the decoded pixels, .txt kept")
     os.remove(text_path) # remove original .txt
+    if sums :
+        os.remove(checksum_path(text_path))
     print(f"Image D&^S to : {output_image_path}")
 
+    return output_image_path
+
 # --- Main Entry Point --- #
 
 if __name__ == "__main__" :
 
+    # optional memory budget : python indImgD.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
     # --- 1. Directory Selection --- #
 
     # filter for existing directories
@@ -165,10 +486,57 @@ if __name__ == "__main__" :
         print("Invalid selection.")
         exit()
     
+
+    # --- 4. Output Format Selection --- #
+
+    profiles = list(OUTPUT_PROFILES)
+    print("\nOutput formats:")
+    for i, name in enumerate(profiles) :
+        print(f"{i+1}. {name} ({OUTPUT_PROFILES[name]['about']})")
+
+    try :
+        choice = input(f"\nSelect output format (enter for {DEFAULT_PROFILE}): ").strip()
+        profile = DEFAULT_PROFILE
+        if choice :
+            index = int(choice) - 1
+            if index < 0 or index >= len(profiles) :
+                raise ValueError
+            profile = profiles[index]
+
+    except ValueError :
+        print(f"Invalid format selection. Defaulting to {DEFAULT_PROFILE}.")
+        profile = DEFAULT_PROFILE
+
+    # png compression is tunable (0 = none / fastest, 9 = smallest)
+    save_options = {}
+    if profile == "png" :
+        try :
+            level = input("PNG compress level 0-9 (enter for 1): ").strip()
+            if level :
+                if not 0 <= int(level) <= 9 :
+                    raise ValueError
+                save_options["compress_level"] = int(level)
+
+        except ValueError :
+            print("Invalid level. Defaulting to 1.")
+
     # process selected file
     selected_file = text_files[selection]
     text_path = os.path.join(folder_path, selected_file)
-    output_filename = os.path.splitext(selected_file)[0] + ".jpg"
+    output_filename = os.path.splitext(selected_file)[0] + ".png" # extension set by profile
     output_path = os.path.join(folder_path, output_filename)
     
-    decrypt_text_to_image(text_path, output_path)
+    # very large files are decoded in row ranges on every core
+    # (imported here : imgParallel imports this script's helpers)
+    from imgParallel import worth_parallel, decrypt_text_parallel
+
+    try :
+        if worth_parallel(text_path) :
+            decrypt_text_parallel(text_path, output_path, profile, max_memory=max_memory, **save_options)
+        else :
+            decrypt_text_to_image(text_path, output_path, profile, max_memory, **save_options)
+    except ValueError as e :
+        print(f"Nothing was decrypted.\n{e}")
+
+    if max_memory :
+        report_peak_memory(max_memory)
@@ -4,10 +4,24 @@
 # notes : I want to clean up comments + prints + format
 
 # --- Imports --- #
+import hashlib
+import mmap
 import os
 import re
+import struct
+import sys
+import zlib
 from PIL import Image
 
+from imgChecksum import STRIP_ROWS, checksum_path, write_checksums, find_bad_strips, format_bad_strips # .sum sidecars
+from imgMemory import memory_budget, format_memory, report_peak_memory # --max-memory helpers
+
+try :
+    import numpy as np # mapped BMP / PPM fast path (Pillow path without it)
+    from imgCodec import encode_rows # vectorized row encoder (img/imgCodec.py)
+except ImportError :
+    np = None
+
 # Hardcoded variables
 VALID_DIRECTORIES = [
     "C:\\Users\\davis\\OneDrive\\Desktop\\everything\\photos", # Windows
@@ -16,6 +30,21 @@ VALID_DIRECTORIES = [
     "/Volumes/Macintosh HD/Users/User/Directory" # personal local custom directory
 ]
 
+# encoded format
+HEADER_PREFIX = "#IMG " # 1st line : '#IMG mode=L ...' (no header -> RGB)
+KEPT_MODES = ("L", "LA", "RGB", "RGBA", "P") # stored as-is, anything else is converted
+MODE_FALLBACK = {"1": "L", "La": "LA", "PA": "RGBA", "RGBa": "RGBA"}
+
+# memory budget (--max-memory on the command line), estimates are rough on purpose
+PROCESS_MEMORY = 64 << 20 # one python process with Pillow loaded
+PIXEL_MEMORY = {"1": 1, "L": 1, "P": 1, "LA": 4, "RGB": 4, "RGBA": 4} # bytes per pixel of a Pillow image
+
+# uncompressed inputs encoded straight from a memory map of the file (no Pillow decode / convert copy)
+MAPPED_EXTENSIONS = ('.bmp', '.ppm', '.pgm')
+MAPPED_ROWS = 256 # pixel rows encoded per chunk
+PPM_SEPARATOR = rb'(?:\s|#[^\n]*\n)+' # whitespace / comment lines between header fields
+PPM_HEADER = re.compile(rb'P([56])' + PPM_SEPARATOR + rb'(\d+)' + PPM_SEPARATOR + rb'(\d+)' + PPM_SEPARATOR + rb'(\d+)\s')
+
 # --- Helper Functions --- #
 
 def natural_sort_key(s) :
@@ -36,37 +65,184 @@ def value_to_encrypted_string(value) :
 
     return encrypted_str
 
-def rgb_to_encrypted_string(r, g, b) :
-    # convert each channel to the encrypted string format
-    red_str = value_to_encrypted_string(r)
-    green_str = value_to_encrypted_string(g)
-    blue_str = value_to_encrypted_string(b)
+def pixel_to_encrypted_string(pixel) :
+    # convert any number of channels (int for L / P, tuple otherwise)
+    if isinstance(pixel, int) :
+        pixel = (pixel,)
 
-    # combine into final encrypted string
-    encrypted_str = f"{red_str}{green_str}{blue_str}"
+    return "".join(value_to_encrypted_string(value) for value in pixel)
 
-    return encrypted_str # alt : return f"{red_str}{green_str}{blue_str}"
+def storage_mode(img) :
+    # mode the image is encoded in (source mode whenever possible)
+    if img.mode in KEPT_MODES :
+        return img.mode
 
-def encrypt_image_to_text(image_path, output_text_path) :
-    # open the image
-    img = Image.open(image_path)
-    img = img.convert('RGB')
-    width, height = img.size
+    return MODE_FALLBACK.get(img.mode, 'RGB')
+
+def encode_header(img, mode, ext) :
+    # build the '#IMG ...' header line (mode + source extension + palette / transparency if any)
+    fields = [f"mode={mode}", f"ext={ext}"]
 
-    # open the output text file
-    with open(output_text_path, 'w') as f :
-        for y in range(height) :
-            for x in range(width) :
-                # get the RGB value of the pixel
-                r, g, b = img.getpixel((x, y))
+    if mode == "P" :
+        fields.append(f"palette={bytes(img.getpalette()).hex()}")
 
-                # convert RGB to encrypted string
-                encrypted_pixel = rgb_to_encrypted_string(r, g, b)
+    transparency = img.info.get("transparency")
+    if mode in ("L", "P") and isinstance(transparency, int) :
+        fields.append(f"transparency={transparency}")
+    elif mode == "P" and isinstance(transparency, bytes) :
+        fields.append(f"alpha={transparency.hex()}")
 
-                # write the encrypted pixel to the file
-                f.write(encrypted_pixel + ' ')
+    return HEADER_PREFIX + " ".join(fields)
 
-            f.write("\n") # new line after each row of pixels
+def write_encrypted_image(img, ext, f) :
+    # writes the header + encrypted pixel rows of an opened image into text stream f
+    # (kept in its own mode, L / LA / RGB / RGBA / P)
+    # returns the checksums {"sha256": source pixel digest, "crcs": CRC32 per STRIP_ROWS lines}
+    mode = storage_mode(img)
+    header = encode_header(img, mode, ext)
+
+    if img.mode != mode :
+        img = img.convert(mode)
+    width, height = img.size
+
+    f.write(header + "\n")
+    crcs = []
+    crc = zlib.crc32((header + "\n").encode('ascii'))
+    lines = 1
+
+    for y in range(height) :
+        # convert each pixel of the row to its encrypted string
+        row = "".join(pixel_to_encrypted_string(img.getpixel((x, y))) + ' ' for x in range(width)) + "\n"
+
+        # write the row (new line after each row of pixels)
+        f.write(row)
+
+        # CRC32 of the row, a new strip every STRIP_ROWS lines
+        if lines == STRIP_ROWS :
+            crcs.append(crc)
+            crc, lines = 0, 0
+        crc = zlib.crc32(row.encode('ascii'), crc)
+        lines += 1
+
+    crcs.append(crc)
+    return {"sha256": hashlib.sha256(img.tobytes()).hexdigest(), "crcs": crcs}
+
+def image_memory(img) :
+    # rough bytes needed to encode an opened (not yet decoded) image : pixels, mode conversion, digest copy
+    mode = storage_mode(img)
+    pixels = img.width * img.height
+    converted = pixels * PIXEL_MEMORY.get(mode, 4) if img.mode != mode else 0
+    return pixels * PIXEL_MEMORY.get(img.mode, 4) + converted + pixels * len(mode) # len(mode) = channels
+
+def map_bmp(buf) :
+    # (mode, HxWxC view in RGB order) over an uncompressed 24 / 32 bit BMP, None for any other kind
+    # rows are padded to 4 bytes and stored bottom-up (unless the height is negative), pixels are BGR(X)
+    if len(buf) < 54 or buf[:2] != b'BM' :
+        return None
+    offset, = struct.unpack_from('<I', buf, 10)
+    header_size, width, height, _, bits, compression = struct.unpack_from('<IiiHHI', buf, 14)
+    if header_size < 40 or bits not in (24, 32) or compression != 0 or width <= 0 or height == 0 :
+        return None
+
+    channels = bits // 8
+    stride = (width * bits + 31) // 32 * 4
+    if offset + abs(height) * stride > len(buf) :
+        return None
+
+    rows = np.ndarray((abs(height), stride), dtype=np.uint8, buffer=buf, offset=offset)
+    pixels = rows[:, :width * channels].reshape(abs(height), width, channels)[:, :, 2::-1] # BGR(X) -> RGB, X dropped
+    return "RGB", pixels[::-1] if height > 0 else pixels
+
+def map_ppm(buf) :
+    # (mode, HxWxC view) over a binary PPM (P6 -> RGB) / PGM (P5 -> L) with 8 bit samples, None otherwise
+    match = PPM_HEADER.match(buf[:4096])
+    if not match or int(match.group(4)) != 255 :
+        return None
+
+    channels = 3 if match.group(1) == b'6' else 1
+    width, height = int(match.group(2)), int(match.group(3))
+    if width <= 0 or height <= 0 or match.end() + width * height * channels > len(buf) :
+        return None
+
+    pixels = np.ndarray((height, width, channels), dtype=np.uint8, buffer=buf, offset=match.end())
+    return ("RGB" if channels == 3 else "L"), pixels
+
+def write_mapped_image(mode, pixels, ext, f) :
+    # same bytes + checksums as write_encrypted_image, from a pixel view in MAPPED_ROWS chunks (f is binary)
+    header = f"{HEADER_PREFIX}mode={mode} ext={ext}\n".encode('ascii')
+    f.write(header)
+
+    digest = hashlib.sha256()
+    crcs = []
+    crc = zlib.crc32(header)
+    lines = 1
+    for top in range(0, pixels.shape[0], MAPPED_ROWS) :
+        chunk = pixels[top:top + MAPPED_ROWS]
+        rows = encode_rows(chunk)
+        f.write(rows)
+        digest.update(np.ascontiguousarray(chunk)) # chunk in order = the image's tobytes()
+
+        # CRC32 of the rows, a new strip every STRIP_ROWS lines
+        view = memoryview(rows).cast('B')
+        stride = rows.shape[1]
+        done = 0
+        while done < len(rows) :
+            take = min(len(rows) - done, STRIP_ROWS - lines)
+            crc = zlib.crc32(view[done * stride:(done + take) * stride], crc)
+            done += take
+            lines += take
+            if lines == STRIP_ROWS :
+                crcs.append(crc)
+                crc, lines = 0, 0
+
+    if lines :
+        crcs.append(crc)
+    return {"sha256": digest.hexdigest(), "crcs": crcs}
+
+def encrypt_mapped(image_path, output_text_path) :
+    # fast path for uncompressed BMP / PPM : returns the checksums, None when the file needs Pillow
+    ext = os.path.splitext(image_path)[1].lower()
+    with open(image_path, 'rb') as src :
+        if os.fstat(src.fileno()).st_size == 0 :
+            return None
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as buf :
+            mapped = map_bmp(buf) if ext == ".bmp" else map_ppm(buf)
+            if mapped is None :
+                return None
+
+            try :
+                with open(output_text_path, 'wb') as f :
+                    sums = write_mapped_image(*mapped, ext, f)
+            finally :
+                del mapped # views must go before the map is closed
+
+    return sums
+
+def encrypt_image_to_text(image_path, output_text_path, max_memory=None) :
+    # max_memory (bytes) : images that would not fit once decoded are refused before any decode
+    # (uncompressed BMP / PPM are mapped + encoded in chunks, they always fit)
+    sums = None
+    if np is not None and image_path.lower().endswith(MAPPED_EXTENSIONS) :
+        sums = encrypt_mapped(image_path, output_text_path)
+
+    if sums is None :
+        # open the image (lazy, only the header is read)
+        img = Image.open(image_path)
+
+        if max_memory and PROCESS_MEMORY + image_memory(img) > max_memory :
+            raise ValueError(f"{os.path.basename(image_path)} : needs ~{format_memory(PROCESS_MEMORY + image_memory(img))}, "
+                             f"over the {format_memory(max_memory)} memory budget, original kept")
+
+        # open the output text file
+        with open(output_text_path, 'w', newline='\n') as f : # '\n' rows on every OS, as checksummed
+            sums = write_encrypted_image(img, os.path.splitext(image_path)[1].lower(), f)
+    write_checksums(checksum_path(output_text_path), sums)
+
+    # read the written file back, the original is only removed when every strip matches
+    with open(output_text_path, 'rb') as f :
+        bad = find_bad_strips(f, sums["crcs"])
+    if bad :
+        raise ValueError(f"{output_text_path} : checksum mismatch after writing ({format_bad_strips(bad)}), original kept")
 
     os.remove(image_path) # remove original image after encryption
     print(f"Image E&^S to : {output_text_path}")
@@ -75,6 +251,9 @@ def encrypt_image_to_text(image_path, output_text_path) :
 
 if __name__ == "__main__" :
 
+    # optional memory budget : python indImgE.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
     # --- 1. Directory Selection --- #
 
     # filter for existing directories
@@ -136,7 +315,7 @@ if __name__ == "__main__" :
 
     # get all image files in hardcoded directory
     image_files = [f for f in os.listdir(folder_path)
-        if f.lower().endswith(('.jpg', '.png', '.bmp'))] # all varients of img
+        if f.lower().endswith(('.jpg', '.png', '.bmp', '.ppm', '.pgm'))] # all varients of img
     
     image_files.sort(key=natural_sort_key) # (natural) sort files
 
@@ -166,4 +345,17 @@ if __name__ == "__main__" :
     output_filename = os.path.splitext(selected_file)[0] + ".txt"
     output_path = os.path.join(folder_path, output_filename)
     
-    encrypt_image_to_text(image_path, output_path)
+    # very large images are encoded in row ranges on every core
+    # (imported here : imgParallel imports this script's helpers)
+    from imgParallel import worth_parallel, encrypt_image_parallel
+
+    try :
+        if worth_parallel(image_path) :
+            encrypt_image_parallel(image_path, output_path, max_memory=max_memory)
+        else :
+            encrypt_image_to_text(image_path, output_path, max_memory)
+    except ValueError as e :
+        print(f"Encryption not confirmed.\n{e}")
+
+    if max_memory :
+        report_peak_memory(max_memory)
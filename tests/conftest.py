@@ -0,0 +1,9 @@
+# --- conftest.py --- #
+# the scripts import each other by module name : put img/, folder/ and vid/ on the path like the scripts do
+
+# --- Imports --- #
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "img"), os.path.join(ROOT, "folder"), os.path.join(ROOT, "vid")]
@@ -0,0 +1,95 @@
+# --- test_folderBundle.py --- #
+# folder <-> one bundle file : round trip, damaged members, unfinished bundles
+
+# --- Imports --- #
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import folderBundle
+
+# --- Helper Functions --- #
+
+def make_images(folder) :
+    # name -> pixels, 'a.png' + 'a.bmp' share a stem
+    images = {}
+    for i, (name, mode) in enumerate([("a.png", "RGB"), ("a.bmp", "RGB"), ("b.png", "RGBA"), ("c.png", "L")]) :
+        channels = {"L": 1, "RGB": 3, "RGBA": 4}[mode]
+        array = np.random.default_rng(i).integers(0, 256, (9, 13, channels), dtype=np.uint8).squeeze()
+        Image.fromarray(array, mode).save(os.path.join(folder, name))
+        images[name] = array
+    return images
+
+@pytest.fixture
+def bundled(tmp_path) :
+    folder = tmp_path / "images"
+    folder.mkdir()
+    images = make_images(folder)
+    bundle_path = str(tmp_path / "images.bundle")
+    entries, failed = folderBundle.bundle_images(str(folder), bundle_path)
+    assert not failed and len(entries) == len(images)
+    return bundle_path, images, tmp_path
+
+# --- Tests --- #
+
+def test_round_trip(bundled) :
+    bundle_path, images, tmp_path = bundled
+    out = tmp_path / "out"
+    out.mkdir()
+
+    outputs, failed = folderBundle.unbundle_images(bundle_path, str(out))
+    assert not failed and set(outputs) == set(images)
+    assert len(set(outputs.values())) == len(images) # shared stems get distinct names
+    for name, path in outputs.items() :
+        with Image.open(path) as img :
+            assert np.array_equal(np.asarray(img), images[name])
+    assert os.path.exists(bundle_path) # only removed with remove=True
+
+def test_selected_members(bundled) :
+    bundle_path, images, tmp_path = bundled
+    outputs, _ = folderBundle.unbundle_images(bundle_path, str(tmp_path), ["b.png"])
+    assert list(outputs) == ["b.png"]
+    with pytest.raises(ValueError, match="not in the bundle") :
+        folderBundle.unbundle_images(bundle_path, str(tmp_path), ["missing.png"])
+
+def test_index_matches_members(bundled) :
+    bundle_path, images, _ = bundled
+    entries = folderBundle.read_index(bundle_path)
+    assert [entry["name"] for entry in entries] == sorted(images, key=folderBundle.natural_sort_key)
+    assert folderBundle.verify_bundle(bundle_path, entries) == set(images)
+
+def test_damaged_member_is_skipped(bundled) :
+    bundle_path, images, tmp_path = bundled
+    entry = folderBundle.read_index(bundle_path)[0]
+    with open(bundle_path, 'r+b') as f :
+        f.seek(entry["offset"] + entry["size"] - 4)
+        f.write(b"??")
+
+    outputs, failed = folderBundle.unbundle_images(bundle_path, str(tmp_path), remove=True)
+    assert set(failed) == {entry["name"]} and "crc" in failed[entry["name"]]
+    assert set(outputs) == set(images) - {entry["name"]}
+    assert os.path.exists(bundle_path) # kept while a member failed
+
+def test_unfinished_bundle(bundled) :
+    bundle_path, _, _ = bundled
+    entries = folderBundle.read_index(bundle_path)
+    with open(bundle_path, 'r+b') as f :
+        f.truncate(entries[-1]["offset"] + entries[-1]["size"]) # index lost
+    with pytest.raises(ValueError, match="index") :
+        folderBundle.read_index(bundle_path)
+    assert folderBundle.verify_bundle(bundle_path, entries) == set()
+
+def test_not_a_bundle(tmp_path) :
+    path = tmp_path / "x.bundle"
+    path.write_bytes(b"hello")
+    with pytest.raises(ValueError, match="not a bundle") :
+        folderBundle.read_index(str(path))
+
+def test_remove_originals(tmp_path) :
+    images = make_images(tmp_path)
+    bundle_path = str(tmp_path / "all.bundle")
+    entries, failed = folderBundle.bundle_images(str(tmp_path), bundle_path, remove=True)
+    assert not failed and len(entries) == len(images)
+    assert os.listdir(tmp_path) == ["all.bundle"]
@@ -0,0 +1,102 @@
+# --- test_folderLease.py --- #
+# lease claims, take over + renewal, and several workers on one folder
+
+# --- Imports --- #
+import os
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import folderLease
+from folderLease import Lease, read_lease, lease_owner
+
+# --- Helper Functions --- #
+
+def make_images(folder, count) :
+    for i in range(count) :
+        array = np.random.default_rng(i).integers(0, 256, (12, 16, 3), dtype=np.uint8)
+        Image.fromarray(array).save(os.path.join(folder, f"image{i}.png"))
+
+def age(path, seconds) :
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+@pytest.fixture
+def source(tmp_path) :
+    make_images(tmp_path, 1)
+    return str(tmp_path / "image0.png")
+
+# --- Tests --- #
+
+def test_claim_is_exclusive(source) :
+    mine = Lease(source, "a", ttl=30)
+    assert mine.acquire()
+    assert not Lease(source, "b", ttl=30).acquire()
+    assert lease_owner(read_lease(mine.path)) == "a"
+
+def test_expired_lease_is_taken_over(source) :
+    assert Lease(source, "a", ttl=30).acquire()
+    age(source + folderLease.LEASE_EXT, 60)
+    assert Lease(source, "b", ttl=30).acquire()
+    assert lease_owner(read_lease(source + folderLease.LEASE_EXT)) == "b"
+
+def test_renewed_lease_is_put_back(source) :
+    # judged expired, then renewed before the rename : the renewal wins
+    mine = Lease(source, "a", ttl=30)
+    assert mine.acquire()
+    age(mine.path, 60)
+    expired, stale = Lease(source, "b", ttl=30).expired()
+    assert expired
+    assert mine.renew()
+    assert not Lease(source, "b", ttl=30).take_over(stale)
+    assert lease_owner(read_lease(mine.path)) == "a"
+
+def test_renew_never_replaces_a_taken_lease(source) :
+    mine = Lease(source, "a", ttl=30)
+    assert mine.acquire()
+    age(mine.path, 60)
+    assert Lease(source, "b", ttl=30).acquire()
+
+    assert not mine.renew()
+    assert mine.lost
+    assert lease_owner(read_lease(mine.path)) == "b"
+
+def test_confirm_waits_for_the_heartbeat(source) :
+    mine = Lease(source, "a", ttl=30)
+    assert mine.acquire()
+    with mine :
+        assert mine.confirm()
+        assert mine.renewals == 1
+    assert not os.path.exists(mine.path) # released
+
+def test_lost_lease_keeps_the_source(source) :
+    mine = Lease(source, "a", ttl=30)
+    assert mine.acquire()
+    with mine :
+        os.remove(mine.path) # taken over meanwhile
+        assert not folderLease.process_input(source, "encrypt", None, None, mine)
+    folder = os.path.dirname(source)
+    assert sorted(os.listdir(folder)) == ["image0.png"] # no output, no temporary left
+
+def test_process_input(source) :
+    mine = Lease(source, "a", ttl=30)
+    assert mine.acquire()
+    with mine :
+        assert folderLease.process_input(source, "encrypt", None, None, mine)
+    assert sorted(os.listdir(os.path.dirname(source))) == ["image0.sum", "image0.txt"]
+
+def test_workers_share_a_folder(tmp_path, monkeypatch) :
+    monkeypatch.setattr(folderLease, "POLL_SECONDS", 0.1) # forked workers inherit it
+    make_images(tmp_path, 24)
+    results = folderLease.run_local_workers(str(tmp_path), 3, ttl=2.0)
+
+    assert sum(done for _, done, _, _ in results) == 24 # every image once
+    assert not any(failed or lost for _, _, failed, lost in results)
+    names = os.listdir(tmp_path)
+    assert len(names) == 48 and all(name.endswith((".txt", ".sum")) for name in names)
+
+    results = folderLease.run_local_workers(str(tmp_path), 3, "decrypt", ttl=2.0)
+    assert sum(done for _, done, _, _ in results) == 24
+    assert sorted(os.listdir(tmp_path)) == sorted(f"image{i}.png" for i in range(24))
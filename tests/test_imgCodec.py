@@ -0,0 +1,81 @@
+# --- test_imgCodec.py --- #
+# round trips + malformed input of the in-memory codec
+
+# --- Imports --- #
+import io
+import mmap
+
+import numpy as np
+import pytest
+
+import imgCodec
+
+# --- Helper Functions --- #
+
+def pixels(shape, seed=0) :
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+def write(tmp_path, data) :
+    path = tmp_path / "image.txt"
+    path.write_bytes(data)
+    return path
+
+# --- Tests --- #
+
+@pytest.mark.parametrize("shape", [(5, 7), (5, 7, 2), (5, 7, 3), (5, 7, 4), (1, 1, 3)])
+def test_round_trip(shape) :
+    array = pixels(shape)
+    assert np.array_equal(imgCodec.decode(imgCodec.encode(array)), array)
+
+def test_encode_to_matches_encode() :
+    array = pixels((300, 4, 3)) # more rows than one ENCODE_ROWS chunk
+    stream = io.BytesIO()
+    written = imgCodec.encode_to(stream, array, rows_per_chunk=64)
+    assert stream.getvalue() == imgCodec.encode(array)
+    assert written == len(stream.getvalue())
+
+def test_decode_into_and_header() :
+    array = pixels((6, 3, 4))
+    data = imgCodec.encode(array, ext=".png")
+    fields, size = imgCodec.read_header(data)
+    assert (fields["mode"], fields["ext"], size) == ("RGBA", ".png", (3, 6))
+
+    out = np.empty_like(array)
+    imgCodec.decode_into(data, out)
+    assert np.array_equal(out, array)
+
+def test_windows_line_endings() :
+    array = pixels((4, 5, 3))
+    data = imgCodec.encode(array).replace(b"\n", b"\r\n")
+    assert np.array_equal(imgCodec.decode(data), array)
+
+def test_mode_must_match_channels() :
+    with pytest.raises(ValueError) :
+        imgCodec.encode(pixels((2, 2, 3)), mode="RGBA")
+
+def test_short_row_reports_the_row() :
+    data = b"#IMG mode=RGB\nA0A0A0 A0A0A0 \nA0A0A0 \n"
+    with pytest.raises(ValueError, match="row 2") :
+        imgCodec.decode(data)
+
+def test_bad_token() :
+    data = bytearray(imgCodec.encode(pixels((2, 2, 3))))
+    data[data.index(b"\n") + 1] = ord("z")
+    with pytest.raises(ValueError) :
+        imgCodec.decode(bytes(data))
+
+def test_above_255() :
+    with pytest.raises(ValueError) :
+        imgCodec.decode(b"#IMG mode=L\nZ6 A0 \n")
+
+def test_mmap_error_is_not_hidden(tmp_path) :
+    # views left in the traceback would make mmap.close() raise BufferError instead
+    path = write(tmp_path, b"#IMG mode=RGB\nA0A0A0 A0A0A0 \nA0A0A0 \n")
+    with open(path, 'rb') as f :
+        with pytest.raises(ValueError) :
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data :
+                try :
+                    imgCodec.decode(data)
+                except ValueError as e :
+                    imgCodec.release_views(e)
+                    raise
@@ -0,0 +1,67 @@
+# --- test_imgParallel.py --- #
+# row range encode / decode on worker processes : same result as the single process scripts
+
+# --- Imports --- #
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import imgCodec
+import imgParallel
+
+# --- Helper Functions --- #
+
+def save_image(tmp_path, mode="RGB", size=(40, 300)) :
+    channels = {"L": 1, "RGB": 3, "RGBA": 4}[mode]
+    array = np.random.default_rng(1).integers(0, 256, (size[1], size[0], channels), dtype=np.uint8)
+    path = str(tmp_path / "image.png")
+    Image.fromarray(array.squeeze(), mode).save(path)
+    return path, array
+
+# --- Tests --- #
+
+def test_split_rows_covers_every_row() :
+    ranges = imgParallel.split_rows(1000, 3)
+    assert ranges[0][0] == 0 and ranges[-1][1] == 1000
+    assert all(bottom == top for (_, bottom), (top, _) in zip(ranges, ranges[1:]))
+
+def test_budget_workers() :
+    assert imgParallel.budget_workers(8, None, 0, 1) == 8
+    with pytest.raises(ValueError) :
+        imgParallel.budget_workers(8, 1 << 20, 0, 1)
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA"])
+def test_round_trip(tmp_path, mode) :
+    image_path, array = save_image(tmp_path, mode)
+    text_path = str(tmp_path / "image.txt")
+
+    imgParallel.encrypt_image_parallel(image_path, text_path, workers=2)
+    assert not os.path.exists(image_path) # original removed once read back
+    assert np.array_equal(imgCodec.decode(open(text_path, 'rb').read()).reshape(array.shape), array)
+
+    output = imgParallel.decrypt_text_parallel(text_path, str(tmp_path / "out.png"), workers=2)
+    assert not os.path.exists(text_path)
+    with Image.open(output) as img :
+        assert np.array_equal(np.asarray(img).reshape(array.shape), array)
+
+def test_malformed_text_keeps_the_source(tmp_path) :
+    text_path = tmp_path / "image.txt"
+    text_path.write_bytes(b"#IMG mode=RGB\nA0A0A0 A0A0A0 \nA0A0A0 \n")
+    with pytest.raises(ValueError, match="row 2") : # not a BufferError from closing the mmap
+        imgParallel.decrypt_text_parallel(str(text_path), str(tmp_path / "out.png"), workers=2)
+    assert text_path.exists()
+    assert not (tmp_path / "out.png").exists()
+
+def test_bad_token_keeps_the_source(tmp_path) :
+    image_path, _ = save_image(tmp_path)
+    text_path = str(tmp_path / "image.txt")
+    imgParallel.encrypt_image_parallel(image_path, text_path, workers=2)
+
+    with open(text_path, 'r+b') as f :
+        f.seek(-10, os.SEEK_END)
+        f.write(b"??")
+    with pytest.raises(ValueError) :
+        imgParallel.decrypt_text_parallel(text_path, str(tmp_path / "out.png"), workers=2)
+    assert os.path.exists(text_path)
@@ -0,0 +1,84 @@
+# --- test_imgTransform.py --- #
+# transforms on the encoded tokens match the same transform on the pixels
+
+# --- Imports --- #
+import hashlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import imgCodec
+import imgTransform
+from imgChecksum import checksum_path, read_checksums, find_bad_strips
+from indImgE import encrypt_image_to_text
+
+# --- Helper Functions --- #
+
+def pixels(shape=(6, 9, 3)) :
+    return np.random.default_rng(2).integers(0, 256, shape, dtype=np.uint8)
+
+def transformed(array, transforms) :
+    return imgCodec.decode(imgTransform.transform_text(imgCodec.encode(array), transforms))
+
+# --- Tests --- #
+
+@pytest.mark.parametrize("turns", [0, 1, 2, 3])
+def test_rotate(turns) :
+    array = pixels()
+    assert np.array_equal(transformed(array, [("rotate", turns)]), np.rot90(array, turns))
+
+def test_rotate_matches_pillow() :
+    array = pixels()
+    rotated = Image.fromarray(array).rotate(90, expand=True)
+    assert np.array_equal(transformed(array, [("rotate", 1)]), np.asarray(rotated))
+
+def test_flip_and_crop() :
+    array = pixels()
+    assert np.array_equal(transformed(array, [("flip", "horizontal")]), array[:, ::-1])
+    assert np.array_equal(transformed(array, [("flip", "vertical")]), array[::-1])
+    assert np.array_equal(transformed(array, [("crop", (1, 2, 7, 5))]), array[2:5, 1:7])
+    assert np.array_equal(transformed(array, [("crop", "1:1")]), array[:, 1:7])
+
+def test_chain_keeps_the_header() :
+    array = pixels((4, 5, 4))
+    data = imgTransform.transform_text(imgCodec.encode(array, ext=".png"), [("rotate", 1), ("flip", "vertical")])
+    fields, size = imgCodec.read_header(data)
+    assert (fields["mode"], fields["ext"], size) == ("RGBA", ".png", (4, 5))
+    assert np.array_equal(imgCodec.decode(data), np.rot90(array, 1)[::-1])
+
+def test_grid_draws_the_color() :
+    out = transformed(np.zeros((30, 30, 3), dtype=np.uint8), [("grid", "#ff0000")])
+    assert (out == (255, 0, 0)).all(axis=2).any()
+
+@pytest.mark.parametrize("transform", [("crop", (0, 0, 99, 99)), ("flip", "sideways"), ("crop", "2:1"), ("blur", 1)])
+def test_bad_transform(transform) :
+    with pytest.raises(ValueError) :
+        transformed(pixels(), [transform])
+
+def test_file_with_checksums(tmp_path) :
+    array = pixels()
+    image_path = str(tmp_path / "image.png")
+    Image.fromarray(array).save(image_path)
+    text_path = str(tmp_path / "image.txt")
+    encrypt_image_to_text(image_path, text_path)
+
+    output = str(tmp_path / "rotated.txt")
+    imgTransform.transform_text_file(text_path, output, [("rotate", 1)])
+    assert np.array_equal(imgCodec.decode(open(output, 'rb').read()), np.rot90(array, 1))
+    assert (tmp_path / "image.txt").exists() # source kept
+
+    # the output's sidecar describes the output : every strip CRC matches, sha256 of the rotated pixels
+    sums = read_checksums(output)
+    with open(output, 'rb') as f :
+        assert find_bad_strips(f, sums["crcs"], sums["strip"]) == []
+    assert sums["sha256"] == hashlib.sha256(np.ascontiguousarray(np.rot90(array, 1)).tobytes()).hexdigest()
+    assert checksum_path(output).endswith("rotated.sum")
+
+def test_malformed_file_raises_value_error(tmp_path) :
+    # the token views must not keep the source mmap open (BufferError would hide the ValueError)
+    source = tmp_path / "image.txt"
+    source.write_bytes(b"#IMG mode=RGB\nA0A0A0 A0A0A0 \nA0A0A0 \n")
+    with pytest.raises(ValueError) :
+        imgTransform.transform_text_file(str(source), str(tmp_path / "out.txt"), [("rotate", 1)])
+    assert not (tmp_path / "out.txt").exists()
@@ -4,13 +4,27 @@
 # notes : I want to clean up comments + prints + format
 
 # --- Imports --- #
+import argparse
+import hashlib
+import json
 import os
 import re
-from PIL import Image # not needed ?
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fractions import Fraction
+from functools import lru_cache
+from itertools import islice
 
 import cv2
 import numpy as np
 
+# the decoded array cache is shared with the img scripts (img/imgCache.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "img"))
+from imgCache import BGR_LAYOUT, cache_options
+from imgMemory import memory_budget, format_memory, report_peak_memory # --max-memory helpers
+
 # Hardcoded variables
 VALID_DIRECTORIES = [
     "D:\\", # Windows
@@ -19,6 +33,30 @@ VALID_DIRECTORIES = [
     "/Volumes/Macintosh HD/Users/User/Directory" # personal local custom directory
 ]
 
+# encoded format
+HEADER_PREFIX = b"#IMG " # optional 1st line : '#IMG mode=L ...' (no header -> RGB)
+MODE_CHANNELS = {"L": 1, "LA": 2, "RGB": 3, "RGBA": 4, "P": 1} # 2 chars per channel
+MAX_REPORTED_DEFECTS = 20 # cap on defects listed per file
+
+# memory budget (--max-memory on the command line), estimates are rough on purpose
+PROCESS_MEMORY = 96 << 20 # one python process with numpy + OpenCV loaded
+STRIP_OVERHEAD = 16 # bytes held per .txt byte of a strip while it is checked
+
+# video writer backends (fourcc None -> pure python writer, always available)
+WRITER_BACKENDS = {
+    "ffv1": {"fourcc": "FFV1", "ext": ".mkv", "about": "lossless FFV1, multi-slice + threaded"},
+    "avc1": {"fourcc": "avc1", "ext": ".mov", "about": "H.264, lossy"},
+    "y4m": {"fourcc": None, "ext": ".y4m", "about": "uncompressed YUV 4:4:4 (near lossless), always available"},
+    "raw": {"fourcc": None, "ext": ".bgr", "about": "uncompressed bgr24, lossless, always available"},
+}
+AUTO_BACKENDS = ("ffv1", "raw") # order tried for 'auto' (lossless only, lossy backends must be asked for)
+PROBE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "imgProcessing", "writer_probes.json") # probe results
+
+# framed stream written by videoToTxt.py --stream (see video_to_frames)
+STREAM_PREFIX = b"#FRAMES "
+FRAME_PREFIX = b"#FRAME "
+FFV1_SLICES = (4, 6, 9, 12, 16, 24) # slice counts FFV1 (level 3) accepts
+
 # --- Helper Functions --- #
 
 def natural_sort_key(s) :
@@ -32,37 +70,388 @@ def encrypted_string_to_value(encrypted_str):
     digit = encrypted_str[1]
     return (ord(char) - ord('A')) * 10 + int(digit)
 
-def encrypted_pixel_to_rgb(encrypted_pixel) :
-    # Converts 6-character encrypted string to RGB tuple
-    red_str = encrypted_pixel[0:2]
-    green_str = encrypted_pixel[2:4]
-    blue_str = encrypted_pixel[4:6]
-    r = encrypted_string_to_value(red_str)
-    g = encrypted_string_to_value(green_str)
-    b = encrypted_string_to_value(blue_str)
-    return r, g, b
+def encrypted_pixel_to_values(encrypted_pixel) :
+    # Converts an encrypted pixel to its channel values (1 for L / P ... 4 for RGBA)
+    return tuple(encrypted_string_to_value(encrypted_pixel[i:i + 2])
+                 for i in range(0, len(encrypted_pixel), 2))
+
+def parse_encoded_header(data) :
+    # reads the optional '#IMG key=value ...' 1st line
+    # returns (fields, offset of 1st pixel row) ; headerless files are plain RGB
+    if not data.startswith(HEADER_PREFIX) :
+        return {"mode": "RGB"}, 0
+
+    end = data.find(b'\n')
+    end = len(data) if end < 0 else end
+    fields = dict(field.split('=', 1)
+                  for field in bytes(data[len(HEADER_PREFIX):end]).decode('ascii').split()
+                  if '=' in field)
+    fields.setdefault("mode", "RGB")
+
+    return fields, end + 1
+
+def find_encoding_defects(data, limit=MAX_REPORTED_DEFECTS) :
+    # vectorized format check over a whole encoded buffer (no per-pixel loop)
+    # returns (defect_count, defects, (width, height))
+    # defects are (row, col, reason) with 1-based pixel row / column, capped at 'limit'
+    data = bytes(data).replace(b'\r\n', b'\n') # tolerate windows line endings
+    fields, offset = parse_encoded_header(data)
+    mode = fields["mode"]
+
+    if mode not in MODE_CHANNELS :
+        return 1, [(0, 0, f"unsupported mode {mode!r} in header")], (0, 0)
+    if mode == "P" and "palette" not in fields :
+        return 1, [(0, 0, "palette image without a palette in header")], (0, 0)
+    if not data[offset:].strip() :
+        return 1, [(1, 1, "file has no pixel rows")], (0, 0)
+    if not data.endswith(b'\n') :
+        data += b'\n'
+
+    token_width = MODE_CHANNELS[mode] * 2 + 1 # 2 chars per channel + separator
+    buf = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    newlines = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate(([0], newlines[:-1] + 1))
+    lengths = newlines - starts
+
+    # 1. row lengths (the 1st row sets the expected width)
+    row_bytes = int(lengths[0])
+    width = row_bytes // token_width
+    height = len(lengths)
+    defects = []
+    defect_count = 0
+
+    if row_bytes == 0 or row_bytes % token_width :
+        return 1, [(1, width + 1, f"row is {row_bytes} bytes, not a multiple of {token_width}")], (width, height)
+
+    bad_rows = np.flatnonzero(lengths != row_bytes)
+    defect_count += len(bad_rows)
+    for y in bad_rows[:limit] :
+        defects.append((int(y) + 1, int(min(lengths[y], row_bytes)) // token_width + 1,
+                        f"row is {lengths[y]} bytes, expected {row_bytes} ({width} pixels)"))
+
+    # 2. gather the well-formed rows into a (rows, width, token) array
+    good_rows = np.flatnonzero(lengths == row_bytes)
+    if len(bad_rows) == 0 :
+        tokens = buf.reshape(height, row_bytes + 1)[:, :row_bytes] # zero-copy view
+    else :
+        tokens = buf[starts[good_rows][:, None] + np.arange(row_bytes)]
+    tokens = tokens.reshape(len(good_rows), width, token_width)
+
+    # 3. character set + channel range checks
+    letters = tokens[:, :, 0:token_width - 1:2]
+    digits = tokens[:, :, 1:token_width - 1:2]
+    bad_letter = (letters < ord('A')) | (letters > ord('Z'))
+    bad_digit = (digits < ord('0')) | (digits > ord('9'))
+    values = (letters.astype(np.int16) - ord('A')) * 10 + (digits.astype(np.int16) - ord('0'))
+    too_large = (values > 255) & ~bad_letter & ~bad_digit
+    bad_space = tokens[:, :, -1] != ord(' ')
+
+    checks = [
+        (bad_letter, letters, "invalid character {!r} in channel {}"),
+        (bad_digit, digits, "invalid digit {!r} in channel {}"),
+        (too_large, values, "channel {1} value {0} is above 255"),
+    ]
+    for mask, source, message in checks :
+        defect_count += int(np.count_nonzero(mask))
+        for g, x, c in np.argwhere(mask)[:max(limit - len(defects), 0)] :
+            found = source[g, x, c]
+            found = chr(found) if source is not values else int(found)
+            defects.append((int(good_rows[g]) + 1, int(x) + 1, message.format(found, mode[c])))
+
+    defect_count += int(np.count_nonzero(bad_space))
+    for g, x in np.argwhere(bad_space)[:max(limit - len(defects), 0)] :
+        defects.append((int(good_rows[g]) + 1, int(x) + 1,
+                        f"missing pixel separator (found {chr(tokens[g, x, -1])!r})"))
+
+    defects.sort()
+    return defect_count, defects, (width, height)
+
+def iter_strips(text_path, rows) :
+    # yields (header line, index of the strip's 1st row, bytes of up to 'rows' pixel rows)
+    # the file is read line by line, never whole ; yields at least once (empty files are reported by the check)
+    with open(text_path, 'rb') as f :
+        header = f.readline()
+        if not header.startswith(HEADER_PREFIX) :
+            header = b""
+            f.seek(0)
+
+        top = 0
+        lines = list(islice(f, rows))
+        yield header, top, b"".join(lines)
+        while len(lines) == rows :
+            top += rows
+            lines = list(islice(f, rows))
+            if lines :
+                yield header, top, b"".join(lines)
+
+def validate_encoded_text(text_path, limit=MAX_REPORTED_DEFECTS, rows=None) :
+    # reads the whole .txt in one go and runs the format check on it
+    # with 'rows', checks 'rows' pixel rows at a time instead (bounded memory, same report)
+    if rows is None :
+        with open(text_path, 'rb') as f :
+            return find_encoding_defects(f.read(), limit)
+
+    defect_count, defects = 0, []
+    width, height = None, 0
+    for header, top, data in iter_strips(text_path, rows) :
+        count, found, (strip_width, strip_height) = find_encoding_defects(header + data, limit)
+        if found and found[0][0] == 0 : # header problem, same for every strip
+            return count, found, (0, 0)
+        if not count and width not in (None, strip_width) :
+            count, found = 1, [(1, 1, f"row is {strip_width} pixels, expected {width}")]
+
+        width = strip_width if width is None else width
+        height += strip_height
+        defect_count += count
+        defects.extend((row + top, col, reason) for row, col, reason in found)
+
+    return defect_count, sorted(defects)[:limit], (width, height)
+
+def format_defects(text_path, defect_count, defects) :
+    # builds a readable report of the (capped) defect list
+    lines = [f"{os.path.basename(text_path)} : {defect_count} defect(s)"]
+    for row, col, reason in defects :
+        lines.append(f"  row {row}, col {col} : {reason}")
+    if defect_count > len(defects) :
+        lines.append(f"  ... {defect_count - len(defects)} more")
+    return "\n".join(lines)
 
 def text_to_frame(text_path) :
-    # Converts a single text frame file to a numpy image array (RGB)
+    # Converts a single text frame file to a numpy image array (BGR)
     with open(text_path, 'r') as f:
         lines = f.readlines()
     
+    # Mode header (frames from videoToTxt have none -> RGB)
+    fields, offset = parse_encoded_header(lines[0].encode('ascii'))
+    if offset :
+        lines = lines[1:]
+    mode = fields["mode"]
+    
     height = len(lines)
     width = len(lines[0].strip().split())
     
-    # Create empty RGB image array
-    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    # Decode in the source mode
+    values = np.zeros((height, width, MODE_CHANNELS[mode]), dtype=np.uint8)
     
     for y, line in enumerate(lines) :
         encrypted_pixels = line.strip().split()
         for x, encrypted_pixel in enumerate(encrypted_pixels):
-            r, g, b = encrypted_pixel_to_rgb(encrypted_pixel)
-            frame[y, x] = [b, g, r]  # Stored as BGR for OpenCV compatibility
+            values[y, x] = encrypted_pixel_to_values(encrypted_pixel)
+    
+    # Restore colour from the source mode, stored as BGR for OpenCV compatibility
+    if mode == "P" :
+        entries = np.frombuffer(bytes.fromhex(fields["palette"]), dtype=np.uint8).reshape(-1, 3)
+        palette = np.zeros((256, 3), dtype=np.uint8) # short palettes pad with black
+        palette[:len(entries)] = entries
+        values = palette[values[:, :, 0]]
+    elif mode in ("L", "LA") :
+        values = np.repeat(values[:, :, :1], 3, axis=2)
+    
+    return np.ascontiguousarray(values[:, :, 2::-1]) # RGB(A) -> BGR, alpha dropped
+
+class FrameCodec :
+    # per video frame decoder : every frame has the same size, so all buffers are made once
+    # .txt is read into a preallocated buffer, decoded with in place uint8 arithmetic over
+    # strided views, and RGB -> BGR is folded into the channel indexing (no copies / cvtColor)
+    # headerless RGB frames (videoToTxt output, LF or CRLF) take this path, others use text_to_frame
+    # strip_rows bounds the read buffer (a memory budget), frames are then read + decoded strip by strip
+
+    def __init__(self, width, height, strip_rows=None) :
+        self.width, self.height = width, height
+        self.strip_rows = min(strip_rows or height, height)
+        row_bytes = width * 7
+        self.raw = bytearray(self.strip_rows * (row_bytes + 2)) # one strip of CRLF rows
+        self.view = memoryview(self.raw)
+        buf = np.frombuffer(self.raw, dtype=np.uint8)
+        self.tokens = {} # row stride (LF / CRLF) -> (strip_rows, width, 7) view of the buffer
+        for stride in (row_bytes + 1, row_bytes + 2) :
+            self.tokens[stride] = np.lib.stride_tricks.as_strided(buf, shape=(self.strip_rows, width, 7),
+                                                                  strides=(stride, 7, 1))
+        self.frame = np.empty((height, width, 3), dtype=np.uint8) # BGR output, reused every frame
+
+    def decode(self, text_path) :
+        # returns the frame as BGR ; the array is overwritten by the next decode
+        with open(text_path, 'rb') as f :
+            size = os.fstat(f.fileno()).st_size
+            
+            # 1. layout from the file size (last newline optional), no mode header
+            stride = None
+            if f.read(1) != b'#' :
+                for candidate in self.tokens :
+                    if size in (self.height * candidate, self.height * candidate - (candidate - self.width * 7)) :
+                        stride = candidate
+            if stride is None :
+                return text_to_frame(text_path)
+            f.seek(0)
+            
+            return self.read(f, stride)
     
-    return frame
+    def read(self, f, stride, check=None) :
+        # decodes the next frame from any binary stream (file / pipe) with rows of 'stride' bytes
+        # check(strip bytes, 1st row) is called on every strip before it is decoded
+        # 2. value = (letter - 'A') * 10 + (digit - '0'), wraps mod 256 like the uint8 result
+        for top in range(0, self.height, self.strip_rows) :
+            count = min(self.strip_rows, self.height - top)
+            view = self.view[:count * stride]
+            filled = 0
+            while filled < len(view) : # pipes return short reads
+                got = f.readinto(view[filled:])
+                if not got :
+                    break
+                filled += got
+            if filled < len(view) :
+                raise ValueError(f"input ended inside the frame (row {top + filled // stride + 1})")
+            if check :
+                check(view, top)
+            
+            tokens = self.tokens[stride][:count]
+            letters = tokens[:, :, 4::-2] # B G R channel order of the output
+            digits = tokens[:, :, 5::-2]
+            out = self.frame[top:top + count]
+            np.subtract(letters, ord('A'), out=out)
+            np.multiply(out, 10, out=out)
+            np.add(out, digits, out=out)
+            np.subtract(out, ord('0'), out=out)
+        
+        return self.frame
+
+class Y4MWriter :
+    # uncompressed YUV 4:4:4 (yuv4mpegpipe) writer, same interface as cv2.VideoWriter
+    # BT.601 full range conversion -> rounding makes it near (not bit exact) lossless
+
+    def __init__(self, path, fps, size) :
+        self.file = open(path, 'wb')
+        rate = Fraction(fps).limit_denominator(1001)
+        width, height = size
+        self.file.write(f"YUV4MPEG2 W{width} H{height} F{rate.numerator}:{rate.denominator} "
+                        f"Ip A1:1 C444 XCOLORRANGE=FULL\n".encode('ascii'))
+
+    def isOpened(self) :
+        return not self.file.closed
+
+    def write(self, frame) :
+        ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
+        self.file.write(b"FRAME\n")
+        for plane in (0, 2, 1) : # Y, Cb, Cr planes
+            self.file.write(np.ascontiguousarray(ycrcb[:, :, plane]))
+
+    def release(self) :
+        self.file.close()
+
+class RawWriter :
+    # headerless bgr24 frame stream, same interface as cv2.VideoWriter (bit exact)
+    # play / convert with : ffmpeg -f rawvideo -pix_fmt bgr24 -s WxH -r FPS -i file.bgr ...
+
+    def __init__(self, path, fps, size) :
+        self.file = open(path, 'wb')
+        self.hint = f"ffmpeg -f rawvideo -pix_fmt bgr24 -s {size[0]}x{size[1]} -r {fps} -i {os.path.basename(path)}"
+
+    def isOpened(self) :
+        return not self.file.closed
+
+    def write(self, frame) :
+        self.file.write(np.ascontiguousarray(frame))
+
+    def release(self) :
+        if not self.file.closed :
+            self.file.close()
+            print(f"Raw stream, read back with : {self.hint}")
+
+def ffv1_options(threads) :
+    # OpenCV ffmpeg writer options for multi-slice / threaded FFV1
+    threads = threads or os.cpu_count() or 1
+    slices = next((n for n in FFV1_SLICES if n >= threads), FFV1_SLICES[-1])
+    return f"level;3|slices;{slices}|threads;{threads}"
+
+def open_writer(backend, path, fps, size, threads=None) :
+    # opens a writer for a backend (see WRITER_BACKENDS)
+    if backend == "y4m" :
+        return Y4MWriter(path, fps, size)
+    if backend == "raw" :
+        return RawWriter(path, fps, size)
+
+    fourcc = cv2.VideoWriter_fourcc(*WRITER_BACKENDS[backend]["fourcc"])
+    previous = os.environ.get("OPENCV_FFMPEG_WRITER_OPTIONS")
+    if backend == "ffv1" :
+        os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"] = ffv1_options(threads)
+
+    try :
+        writer = cv2.VideoWriter(path, fourcc, fps, size)
+    finally : # don't leak the options into other writers
+        if previous is None :
+            os.environ.pop("OPENCV_FFMPEG_WRITER_OPTIONS", None)
+        else :
+            os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"] = previous
 
-def frames_to_video(input_folder, output_video_path) :
-    # Assembles frames into a lossless video
+    if not writer.isOpened() :
+        raise RuntimeError(f"Could not open {backend} video writer")
+    return writer
+
+def probe_key() :
+    # OpenCV version + build (the codecs come from the ffmpeg it was built with)
+    build = hashlib.sha1(cv2.getBuildInformation().encode('utf-8')).hexdigest()
+    return f"{cv2.__version__}-{build}"
+
+def read_probes() :
+    # {backend: available} recorded for this OpenCV build, {} when none / another build wrote the file
+    try :
+        with open(PROBE_PATH, 'r') as f :
+            probes = json.load(f)
+    except (OSError, ValueError) :
+        return {}
+    return probes.get("backends", {}) if probes.get("key") == probe_key() else {}
+
+def write_probes(probes) :
+    # merged with what other processes recorded meanwhile, replaced in one rename
+    try :
+        os.makedirs(os.path.dirname(PROBE_PATH), exist_ok=True)
+        tmp = f"{PROBE_PATH}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f :
+            json.dump({"key": probe_key(), "backends": {**read_probes(), **probes}}, f)
+        os.replace(tmp, PROBE_PATH)
+    except OSError : # read only home, the probe just runs again next time
+        pass
+
+def probe_backend(backend) :
+    # writes a tiny clip to a temp folder, True when the writer opened and wrote it
+    with tempfile.TemporaryDirectory() as tmp :
+        path = os.path.join(tmp, "probe" + WRITER_BACKENDS[backend]["ext"])
+        try :
+            writer = open_writer(backend, path, 1, (64, 64), threads=1)
+        except (RuntimeError, cv2.error) :
+            return False
+        writer.write(np.zeros((64, 64, 3), dtype=np.uint8))
+        writer.release()
+        return os.path.getsize(path) > 0
+
+@lru_cache(maxsize=None)
+def backend_available(backend) :
+    # probes a backend once per OpenCV build, the result is kept on disk (PROBE_PATH) for later runs / workers
+    if WRITER_BACKENDS[backend]["fourcc"] is None :
+        return True
+
+    probes = read_probes()
+    if backend not in probes :
+        probes[backend] = probe_backend(backend)
+        write_probes({backend: probes[backend]})
+    return probes[backend]
+
+def resolve_writer_backend(backend="auto") :
+    # picks the backend to use ('auto' -> 1st available from AUTO_BACKENDS)
+    if backend == "auto" :
+        return next(name for name in AUTO_BACKENDS if backend_available(name))
+
+    if backend not in WRITER_BACKENDS :
+        raise ValueError(f"Unknown writer backend: {backend}")
+    if not backend_available(backend) :
+        raise RuntimeError(f"{backend} writer is not available on this machine")
+    return backend
+
+def frames_to_video(input_folder, output_video_path, backend="auto", threads=None, max_memory=None, cache=None) :
+    # Assembles frames into a video with a writer backend (see WRITER_BACKENDS)
+    # the extension of output_video_path follows the backend, threads is for ffv1 (default all cores)
+    # max_memory (bytes) checks + decodes each frame in strips sized to stay under it
+    # cache (imgCache.ArrayCache) : frames decoded by an earlier run are mapped from it instead of parsed
 
     # Read metadata
     metadata_path = os.path.join(input_folder, "metadata.txt")
@@ -75,6 +464,10 @@ def frames_to_video(input_folder, output_video_path) :
         height = int(metadata[1])
         fps = float(metadata[2])
     
+    # Pick the writer up front (probed once, cached) so codec discovery never fails late
+    backend = resolve_writer_backend(backend)
+    output_video_path = os.path.splitext(output_video_path)[0] + WRITER_BACKENDS[backend]["ext"]
+    
     # Get sorted frame files
     frame_files = [f for f in os.listdir(input_folder) 
                   if f.endswith('.txt') and f != 'metadata.txt']
@@ -83,21 +476,42 @@ def frames_to_video(input_folder, output_video_path) :
     if not frame_files :
         raise ValueError("No frame files found in input folder")
     
-    # Configure lossless video writer
-    fourcc = cv2.VideoWriter_fourcc(*'FFV1')  # Lossless FFV1 codec
-    out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+    # Memory budget : the output frame is whole, frame text is checked / decoded in strips that fit
+    strip_rows = None
+    if max_memory :
+        strip_rows = (max_memory - PROCESS_MEMORY - width * height * 3) // ((width * 7 + 2) * STRIP_OVERHEAD)
+        if strip_rows < 1 :
+            raise ValueError(f"frames alone need ~{format_memory(PROCESS_MEMORY + width * height * 3)}, "
+                             f"over the {format_memory(max_memory)} memory budget")
+        print(f"Memory budget {format_memory(max_memory)} : {min(strip_rows, height)} row(s) per strip") # optional
     
-    if not out.isOpened() :
-        # Fallback to H.264 with lossless preset
-        fourcc = cv2.VideoWriter_fourcc(*'avc1')
-        out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
-        if not out.isOpened() :
-            raise RuntimeError("Could not create video writer with lossless settings")
+    # Validate every frame before any decode work / writer setup (cached frames passed already)
+    reports = []
+    for frame_file in frame_files :
+        frame_path = os.path.join(input_folder, frame_file)
+        if cache and cache.contains(frame_path, BGR_LAYOUT) :
+            continue
+        defect_count, defects, size = validate_encoded_text(frame_path, rows=strip_rows)
+        if not defect_count and size != (width, height) :
+            defect_count, defects = 1, [(1, 1, f"frame is {size[0]}x{size[1]}, metadata says {width}x{height}")]
+        if defect_count :
+            reports.append(format_defects(frame_path, defect_count, defects))
+    
+    if reports :
+        raise ValueError(f"{len(reports)} corrupt frame(s):\n" + "\n".join(reports))
+    
+    # Open the video writer
+    out = open_writer(backend, output_video_path, fps, (width, height), threads)
     
-    # Process frames
+    # Process frames (one decoder, buffers reused for every frame)
+    codec = FrameCodec(width, height, strip_rows)
     for i, frame_file in enumerate(frame_files) :
         frame_path = os.path.join(input_folder, frame_file)
-        frame = text_to_frame(frame_path)
+        frame = cache.load(frame_path, BGR_LAYOUT) if cache else None
+        if frame is None :
+            frame = codec.decode(frame_path)
+            if cache :
+                cache.store(frame_path, frame, BGR_LAYOUT)
         out.write(frame)
         
         # UPDATE THIS TO PRINT LIVE STATUS
@@ -106,12 +520,145 @@ def frames_to_video(input_folder, output_video_path) :
             print(f"Processed frame {i+1}/{len(frame_files)}")
     
     out.release()
+    print(f"Written with {backend} writer : {output_video_path}")
     return len(frame_files)
 
+def parse_stream_line(line, prefix) :
+    # '#FRAMES width=.. height=.. fps=..' / '#FRAME index=.. size=..' -> {key: value}
+    if not line.startswith(prefix) :
+        raise ValueError(f"not a frame stream (expected {prefix.decode().strip()!r}, got {line[:20]!r})")
+    return dict(field.split('=', 1) for field in line[len(prefix):].decode('ascii').split())
+
+def stream_to_video(stream, output_video_path, backend="auto", threads=None, max_memory=None) :
+    # builds a video from a framed stream (videoToTxt.py --stream) as it arrives, nothing lands on disk
+    # every strip is format checked before it is decoded, a bad frame stops the stream ; returns frame count
+    fields = parse_stream_line(stream.readline(), STREAM_PREFIX)
+    width, height, fps = int(fields["width"]), int(fields["height"]), float(fields["fps"])
+    stride = width * 7 + 1
+    
+    backend = resolve_writer_backend(backend)
+    output_video_path = os.path.splitext(output_video_path)[0] + WRITER_BACKENDS[backend]["ext"]
+    
+    strip_rows = None
+    if max_memory :
+        strip_rows = (max_memory - PROCESS_MEMORY - width * height * 3) // (stride * STRIP_OVERHEAD)
+        if strip_rows < 1 :
+            raise ValueError(f"frames alone need ~{format_memory(PROCESS_MEMORY + width * height * 3)}, "
+                             f"over the {format_memory(max_memory)} memory budget")
+    codec = FrameCodec(width, height, strip_rows)
+    
+    out = open_writer(backend, output_video_path, fps, (width, height), threads)
+    frame_count = 0
+    try :
+        while True :
+            line = stream.readline()
+            if not line :
+                break
+            record = parse_stream_line(line, FRAME_PREFIX)
+            if int(record["size"]) != height * stride :
+                raise ValueError(f"frame {record['index']} is {record['size']} bytes, expected {height * stride}")
+            
+            def check(data, top) :
+                defect_count, defects, (strip_width, strip_height) = find_encoding_defects(data)
+                if not defect_count and strip_width != width :
+                    defect_count, defects = 1, [(1, 1, f"row is {strip_width} pixels, expected {width}")]
+                if defect_count :
+                    shifted = [(row + top, col, reason) for row, col, reason in defects]
+                    raise ValueError(format_defects(f"frame {record['index']}", defect_count, shifted))
+            
+            out.write(codec.read(stream, stride, check))
+            frame_count += 1
+            if frame_count % 10 == 0 :
+                print(f"Processed frame {frame_count}")
+    finally :
+        out.release()
+    
+    print(f"Written with {backend} writer : {output_video_path}")
+    return frame_count
+
+def folder_work(frame_folder) :
+    # rough cost of rebuilding a video : total size of its frame .txt files
+    with os.scandir(frame_folder) as entries :
+        return sum(e.stat().st_size for e in entries if e.name.endswith('.txt') and e.name != "metadata.txt")
+
+def batch_worker_init() :
+    cv2.setNumThreads(1) # one core per video, the pool spreads the videos over the cores
+
+def reconstruct_quietly(frame_folder, output_video_path, backend, max_memory, cache=None) :
+    # pool task : frames_to_video (1 writer thread) without its prints, returns (frame count, seconds)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull :
+        stdout, sys.stdout = sys.stdout, devnull
+        try :
+            frame_count = frames_to_video(frame_folder, output_video_path, backend, 1, max_memory, cache)
+        finally :
+            sys.stdout = stdout
+    return frame_count, time.perf_counter() - start
+
+def batch_frames_to_video(folder_path, frame_folders, backend, workers=None, max_memory=None, cache=None) :
+    # rebuilds every <name>_frames folder into <name>_reconstructed on one pool of 'workers' processes
+    # biggest folders start first, small ones fill the cores that free up while those run
+    # max_memory (bytes) is split between the workers (fewer workers when it is tight)
+    workers = workers or os.cpu_count() or 1
+    share = None
+    if max_memory :
+        available = max_memory - PROCESS_MEMORY # this process
+        workers = max(1, min(workers, available // (2 * PROCESS_MEMORY)))
+        share = available // workers
+        print(f"Memory budget {format_memory(max_memory)} : {workers} worker(s), {format_memory(share)} each") # optional
+    
+    frame_paths = sorted((os.path.join(folder_path, f) for f in frame_folders), key=folder_work, reverse=True)
+    done, failed = 0, []
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(frame_paths)), initializer=batch_worker_init) as pool :
+        futures = {}
+        for frame_path in frame_paths :
+            video_name = os.path.basename(frame_path).replace('_frames', '')
+            output_video_path = os.path.join(folder_path, f"{video_name}_reconstructed{WRITER_BACKENDS[backend]['ext']}")
+            futures[pool.submit(reconstruct_quietly, frame_path, output_video_path, backend, share, cache)] = frame_path
+        
+        for future in as_completed(futures) :
+            name = os.path.basename(futures[future])
+            try :
+                frame_count, seconds = future.result()
+                done += 1
+                print(f"[{done + len(failed)}/{len(frame_paths)}] {name} : {frame_count} frames in {seconds:.1f}s")
+            except Exception as e :
+                failed.append(name)
+                print(f"[{done + len(failed)}/{len(frame_paths)}] {name} : failed ({e})")
+    
+    return done, failed
+
+def stream_arguments(argv) :
+    # pipe mode options : --stream <output video> [--backend name]
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--stream")
+    parser.add_argument("--backend", default="auto", choices=["auto"] + list(WRITER_BACKENDS))
+    return parser.parse_known_args(argv)[0]
+
 # --- Main Entry Point --- #
 
 if __name__ == "__main__" :
 
+    # optional memory budget : python txtToVideo.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
+    # optional decoded frame cache (repeat runs on the same _frames) : python txtToVideo.py --cache [DIR] --cache-size 2G
+    cache = cache_options(sys.argv[1:])
+
+    # pipe mode (no menus) : gunzip -c clip.frames.gz | python txtToVideo.py --stream clip_reconstructed.mkv
+    options = stream_arguments(sys.argv[1:])
+    if options.stream :
+        try :
+            frame_count = stream_to_video(sys.stdin.buffer, options.stream, options.backend, max_memory=max_memory)
+            print(f"\nSuccess! Reconstructed {frame_count} frames into video")
+        except (ValueError, RuntimeError) as e :
+            print(f"\nError reconstructing video: {str(e)}")
+            exit(1)
+        if max_memory :
+            report_peak_memory(max_memory)
+        exit()
+
     # --- 1. Directory Selection --- #
 
     existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
@@ -168,22 +715,64 @@ if __name__ == "__main__" :
         exit(1)
     
     print("\nAvailable frame folders:")
+    print(f"0. All {len(frame_folders)} frame folders (batch)")
     for i, foldername in enumerate(frame_folders):
         print(f"{i+1}. {foldername}")
     
     try :
         selection = int(input("\nEnter frame folder number: ")) - 1
-        if selection < 0 or selection >= len(frame_folders):
+        if selection < -1 or selection >= len(frame_folders):
             raise ValueError
-        selected_frame_folder = frame_folders[selection]
-        frame_folder_path = os.path.join(folder_path, selected_frame_folder)
+        batch = selection == -1
+        selected_frame_folder = None if batch else frame_folders[selection]
+        frame_folder_path = None if batch else os.path.join(folder_path, selected_frame_folder)
     except ValueError :
         print("Invalid selection.")
         exit(1)
 
-    # --- 4. Output Video Setup --- #
+    # --- 4. Writer Backend Selection --- #
+    backends = ["auto"] + list(WRITER_BACKENDS)
+    print("\nVideo writer backends:")
+    for i, name in enumerate(backends) :
+        about = WRITER_BACKENDS[name]["about"] if name in WRITER_BACKENDS else "best available (" + ", ".join(AUTO_BACKENDS) + ")"
+        print(f"{i+1}. {name} ({about})")
+    
+    try :
+        choice = input("\nSelect writer backend (enter for auto): ").strip()
+        selection = int(choice) - 1 if choice else 0
+        if selection < 0 or selection >= len(backends):
+            raise ValueError
+        backend = resolve_writer_backend(backends[selection])
+    except ValueError :
+        print("Invalid selection.")
+        exit(1)
+    except RuntimeError as e :
+        print(f"{e}. Pick another backend.")
+        exit(1)
+    
+    # --- 5. Batch (every frame folder, shared worker pool) --- #
+    if batch :
+        default_workers = os.cpu_count() or 1
+        try :
+            workers = int(input(f"\nMax concurrent videos (enter for {default_workers}): ").strip() or default_workers)
+            if workers < 1 :
+                raise ValueError
+        except ValueError :
+            print(f"Invalid number. Using {default_workers}.")
+            workers = default_workers
+        
+        print(f"\nReconstructing {len(frame_folders)} videos in {folder_path}...")
+        start = time.perf_counter()
+        done, failed = batch_frames_to_video(folder_path, frame_folders, backend, workers, max_memory, cache)
+        print(f"\n{done} video(s) reconstructed in {time.perf_counter() - start:.1f}s, {len(failed)} failed")
+        
+        if max_memory :
+            report_peak_memory(max_memory)
+        exit(1 if failed else 0)
+    
+    # --- 6. Output Video Setup --- #
     video_name = selected_frame_folder.replace('_frames', '')
-    output_video_path = os.path.join(folder_path, f"{video_name}_reconstructed.mov")
+    output_video_path = os.path.join(folder_path, f"{video_name}_reconstructed{WRITER_BACKENDS[backend]['ext']}")
     
     print(f"\nStarting video reconstruction...")
     print(f"Input frames: {frame_folder_path}")
@@ -191,9 +780,12 @@ if __name__ == "__main__" :
     
     # Reconstruct video
     try :
-        frame_count = frames_to_video(frame_folder_path, output_video_path)
+        frame_count = frames_to_video(frame_folder_path, output_video_path, backend, max_memory=max_memory, cache=cache)
         print(f"\nSuccess! Reconstructed {frame_count} frames into video")
         print(f"Output saved to: {output_video_path}")
     except Exception as e:
         print(f"\nError reconstructing video: {str(e)}")
-        exit(1)
\ No newline at end of file
+        exit(1)
+
+    if max_memory :
+        report_peak_memory(max_memory)
\ No newline at end of file
@@ -7,13 +7,21 @@
 # - update corresponding txtToVideo.py
 
 # --- Imports --- #
+import argparse
+import contextlib
 import os
 import re
-from PIL import Image # not needed ?
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import cv2
 import numpy as np
 
+# shared helpers live in img/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "img"))
+from imgMemory import memory_budget, format_memory, report_peak_memory # --max-memory helpers
+
 # Hardcoded variables
 VALID_DIRECTORIES = [
     "D:\\", # Windows
@@ -22,6 +30,19 @@ VALID_DIRECTORIES = [
     "/Volumes/Macintosh HD/Users/User/Directory" # personal local custom directory
 ]
 
+# strides at / above this seek (CAP_PROP_POS_FRAMES) instead of grabbing every skipped frame
+SEEK_STRIDE = 48
+SEEK_PROBE_FRAMES = 120 # segmented runs compare a seeked frame this far in with the same frame read sequentially
+
+# framed stream (video_to_frames with stream=...) : 1 stream header line, then per frame a record line + its .txt bytes
+#   #FRAMES width=640 height=360 fps=30.0
+#   #FRAME index=0 size=<bytes>
+STREAM_PREFIX = b"#FRAMES "
+FRAME_PREFIX = b"#FRAME "
+
+# memory budget (--max-memory on the command line), estimates are rough on purpose
+PROCESS_MEMORY = 96 << 20 # one python process with numpy + OpenCV loaded
+
 # --- Helper Functions --- #
 
 def natural_sort_key(s) :
@@ -48,35 +69,98 @@ def rgb_to_encrypted_string(r, g, b) :
     
     return f"{red_str}{green_str}{blue_str}"
 
-def process_frame(frame, frame_index, output_folder) :
+# token lookup tables : channel value -> letter / digit byte of its 2 char token
+LETTER_LUT = (np.arange(256) // 10 + ord('A')).astype(np.uint8)
+DIGIT_LUT = (np.arange(256) % 10 + ord('0')).astype(np.uint8)
+
+class FrameCodec :
+    # per video frame encoder : every frame has the same size, so all buffers are made once
+    # frame -> .txt bytes through cv2.LUT into preallocated arrays, BGR -> RGB is folded into
+    # a reversed channel view (no cvtColor), output rows keep their separators + newlines
+    # strip_rows bounds the buffers (a memory budget), frames are then encoded + written strip by strip
+
+    def __init__(self, width, height, strip_rows=None) :
+        self.width, self.height = width, height
+        self.strip_rows = min(strip_rows or height, height)
+        self.rows = np.empty((self.strip_rows, width * 7 + 1), dtype=np.uint8) # headerless RGB text
+        tokens = self.rows[:, :width * 7].reshape(self.strip_rows, width, 7) # view : 6 chars + space per pixel
+        tokens[:, :, 6] = ord(' ')
+        self.rows[:, -1] = ord('\n')
+        self.letters = tokens[:, :, 4::-2] # R G B letters, in B G R order to match the frame
+        self.digits = tokens[:, :, 5::-2]
+        self.lookup = np.empty((self.strip_rows, width, 3), dtype=np.uint8) # cv2.LUT output
+
+    def encode(self, frame, output_path) :
+        # writes one BGR frame as an encrypted .txt (same bytes as the per pixel loop)
+        with open(output_path, 'wb') as f :
+            self.write(frame, f)
+
+    def frame_size(self) :
+        # bytes of one encoded frame
+        return self.height * (self.width * 7 + 1)
+
+    def write(self, frame, f) :
+        # writes one BGR frame as encrypted text into any binary stream (file / pipe)
+        for top in range(0, self.height, self.strip_rows) :
+            count = min(self.strip_rows, self.height - top)
+            strip = frame[top:top + count]
+            lookup = self.lookup[:count]
+
+            cv2.LUT(strip, LETTER_LUT, dst=lookup)
+            np.copyto(self.letters[:count], lookup)
+            cv2.LUT(strip, DIGIT_LUT, dst=lookup)
+            np.copyto(self.digits[:count], lookup)
+
+            f.write(self.rows[:count])
+
+def process_frame(frame, frame_index, output_folder, codec=None) :
     # process a single frame and save as encrypted text file
     # returns path to generated .txt file
+    # pass the video's FrameCodec to reuse its buffers (one is made otherwise)
 
-    # 1. convert from BGR to RGB
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    height, width, _ = frame_rgb.shape
+    height, width, _ = frame.shape
+    if codec is None :
+        codec = FrameCodec(width, height)
     
-    # 2. create output filename
+    # 1. create output filename
     output_filename = f"frame_{frame_index:04d}.txt"
     output_path = os.path.join(output_folder, output_filename)
     
-    # 3. write encrypted pixel data
-    with open(output_path, 'w') as f :
-        for y in range(height) :
-            for x in range(width) :
-                r, g, b = frame_rgb[y, x]
-                encrypted_pixel = rgb_to_encrypted_string(r, g, b)
-                f.write(encrypted_pixel + ' ')
-                
-            f.write("\n")
+    # 2. write encrypted pixel data (BGR -> RGB handled by the codec)
+    codec.encode(frame, output_path)
     
     return output_path
 
-def video_to_frames(video_path, output_folder) :
+def scaled_size(width, height, target_height) :
+    # output size for a target height (aspect kept, never upscaled, even width)
+    if not target_height or target_height >= height :
+        return width, height
+    
+    scale = target_height / height
+    return max(2, int(round(width * scale / 2)) * 2), int(target_height)
+
+def frame_range(fps, frame_count, stride=1, start_time=None, end_time=None) :
+    # (stride, start frame, end frame, frames kept) of a run ; end is inf + kept None when the count is unknown
+    stride = max(1, int(stride))
+    start_frame = int(round(start_time * fps)) if start_time else 0
+    end_frame = frame_count if frame_count > 0 else float('inf') # count can be unknown
+    if end_time :
+        end_frame = min(end_frame, int(round(end_time * fps)))
+    kept = max(0, -(-(end_frame - start_frame) // stride)) if end_frame != float('inf') else None
+    return stride, start_frame, end_frame, kept
+
+def video_to_frames(video_path, output_folder, stride=1, start_time=None, end_time=None, target_height=None,
+                    max_memory=None, stream=None) :
     # extract frames from a video and save as encrypted text files
+    # stride : keep 1 frame in 'stride' | start_time / end_time : seconds | target_height : proxy height
+    # stream : binary stream (e.g. sys.stdout.buffer) to write a framed stream to instead of output_folder,
+    #          every frame is flushed as soon as it is encoded, messages go to stderr
+
+    log = print if stream is None else lambda *args : print(*args, file=sys.stderr)
 
     # 0.1 create output directory if needed
-    os.makedirs(output_folder, exist_ok=True)
+    if stream is None :
+        os.makedirs(output_folder, exist_ok=True)
 
     # 0.2 declare variable for video capture
     cap = cv2.VideoCapture(video_path)
@@ -89,36 +173,315 @@ def video_to_frames(video_path, output_folder) :
     fps = cap.get(cv2.CAP_PROP_FPS)
     frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     
-    print(f"Processing video: {os.path.basename(video_path)}") # optional
-    print(f"Resolution: {width}x{height}, FPS: {fps:.2f}, Frames: {frame_count}") # optional
+    log(f"Processing video: {os.path.basename(video_path)}") # optional
+    log(f"Resolution: {width}x{height}, FPS: {fps:.2f}, Frames: {frame_count}") # optional
+    
+    # 1.1 frame range + output size
+    stride, start_frame, end_frame, expected = frame_range(fps, frame_count, stride, start_time, end_time)
+    if expected is None :
+        expected = "?"
+    
+    out_width, out_height = scaled_size(width, height, target_height)
+    out_fps = fps / stride
+    
+    if (stride, start_frame, (out_width, out_height)) != (1, 0, (width, height)) or end_time :
+        log(f"Subsampling: every {stride} frame(s) from frame {start_frame}, {out_width}x{out_height} @ {out_fps:.2f} FPS") # optional
+    
+    # 2. save metadata (effective size + fps so txtToVideo.py rebuilds the proxy correctly)
+    if stream is None :
+        metadata_path = os.path.join(output_folder, "metadata.txt")
+        with open(metadata_path, 'w') as f :
+            f.write(f"{out_width},{out_height},{out_fps}")
+    else :
+        stream.write(STREAM_PREFIX + f"width={out_width} height={out_height} fps={out_fps}\n".encode('ascii'))
     
-    # 2. save metadata
-    metadata_path = os.path.join(output_folder, "metadata.txt")
-    with open(metadata_path, 'w') as f :
-        f.write(f"{width},{height},{fps}")
+    # 3. process every 'stride' frame in range, skipped frames are grabbed (no decode to BGR / copy) or seeked past
+    if start_frame :
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
     
-    # 3. process each frame for all frames in 'cap'
-    success, frame = cap.read()
+    position = start_frame
     frame_index = 0
     
-    while success :
-        output_path = process_frame(frame, frame_index, output_folder)
-        print(f"Processed frame {frame_index+1}/{frame_count} -> {os.path.basename(output_path)}") # optional
+    # memory budget : captured + downscaled frames are whole, the text is encoded in strips that fit
+    strip_rows = None
+    if max_memory :
+        frames = (width * height + out_width * out_height) * 3
+        strip_rows = (max_memory - PROCESS_MEMORY - frames) // (out_width * 10 + 1) # text + LUT row
+        if strip_rows < 1 :
+            raise ValueError(f"frames alone need ~{format_memory(PROCESS_MEMORY + frames)}, "
+                             f"over the {format_memory(max_memory)} memory budget")
+        log(f"Memory budget {format_memory(max_memory)} : encoding {min(strip_rows, out_height)} row(s) per write") # optional
+    
+    # buffers reused for every frame : decoded frame, downscaled frame, encoded text
+    codec = FrameCodec(out_width, out_height, strip_rows)
+    captured = None
+    resized = np.empty((out_height, out_width, 3), dtype=np.uint8)
+    
+    while position < end_frame :
+        success, captured = cap.read(captured)
+        if not success :
+            break
+        
+        frame = captured
+        if (out_width, out_height) != (width, height) : # downscale before encoding
+            frame = cv2.resize(captured, (out_width, out_height), dst=resized, interpolation=cv2.INTER_AREA)
         
-        # read next frame
-        success, frame = cap.read()
+        if stream is None :
+            output_path = process_frame(frame, frame_index, output_folder, codec)
+        else :
+            stream.write(FRAME_PREFIX + f"index={frame_index} size={codec.frame_size()}\n".encode('ascii'))
+            codec.write(frame, stream)
+            stream.flush() # the frame is on its way before the next one is read
+            output_path = f"frame {frame_index} (stream)"
+        log(f"Processed frame {frame_index+1}/{expected} -> {os.path.basename(output_path)}") # optional
         frame_index += 1
+        
+        # skip to the next kept frame
+        position += stride
+        if stride >= SEEK_STRIDE :
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+        else :
+            for _ in range(stride - 1) :
+                if not cap.grab() :
+                    position = end_frame
+                    break
     
     cap.release() # resource cleanup
     
-    print(f"\nVideo processing complete! {frame_index} frames saved to {output_folder}") # optional
+    log(f"\nVideo processing complete! {frame_index} frames saved to {output_folder or 'stream'}") # optional
+    
+    return frame_index
+
+def encode_segment(video_path, output_folder, first, count, start_frame, stride, size, strip_rows=None) :
+    # pool task : output frames first .. first + count - 1 of a run, decoded by this segment's own capture
+    # the capture seeks to the segment's 1st kept frame (checked frame accurate up front), the rest is the
+    # video_to_frames loop
+    # returns how many frames were written (fewer when the video ends early)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened() :
+        raise ValueError("error opening video file")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    
+    position = start_frame + first * stride
+    if position :
+        cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+    
+    codec = FrameCodec(size[0], size[1], strip_rows)
+    captured = None
+    resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    written = 0
+    
+    while written < count :
+        success, captured = cap.read(captured)
+        if not success :
+            break
+        
+        frame = captured
+        if size != (width, height) :
+            frame = cv2.resize(captured, size, dst=resized, interpolation=cv2.INTER_AREA)
+        process_frame(frame, first + written, output_folder, codec)
+        written += 1
+        
+        # skip to the next kept frame (same as video_to_frames)
+        position += stride
+        if written == count :
+            break
+        if stride >= SEEK_STRIDE :
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+        else :
+            for _ in range(stride - 1) :
+                if not cap.grab() :
+                    count = written
+                    break
+    
+    cap.release()
+    return written
+
+def seek_is_exact(video_path, start_frame, offset) :
+    # True when seeking to start_frame + offset decodes the same frame as reading on from start_frame
+    # (a reported CAP_PROP_POS_FRAMES can be right while the decoder lands on the previous keyframe)
+    frames = []
+    for seek, skip in ((start_frame, offset), (start_frame + offset, 0)) :
+        cap = cv2.VideoCapture(video_path)
+        if seek :
+            cap.set(cv2.CAP_PROP_POS_FRAMES, seek)
+        for _ in range(skip) :
+            cap.grab()
+        frames.append(cap.read()[1])
+        cap.release()
+    return frames[0] is not None and frames[1] is not None and np.array_equal(frames[0], frames[1])
+
+def segmented_video_to_frames(video_path, output_folder, segments=None, stride=1, start_time=None, end_time=None,
+                              target_height=None, max_memory=None) :
+    # video_to_frames with the frame range split into 'segments' parts, each decoded by its own process + capture
+    # output indexes are global : the frame_XXXX.txt files + metadata.txt match a sequential run exactly
+    # videos with an unknown frame count (or 1 segment) are processed sequentially
+    segments = segments or os.cpu_count() or 1
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened() :
+        raise ValueError("error opening video file")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    
+    # frame range + output size (same rules as video_to_frames)
+    stride, start_frame, _, kept = frame_range(fps, frame_count, stride, start_time, end_time)
+    
+    # memory budget : every segment holds its own frames + strip
+    out_width, out_height = scaled_size(width, height, target_height)
+    strip_rows = None
+    if max_memory :
+        available = max_memory - PROCESS_MEMORY # this process
+        segments = max(1, min(segments, available // (2 * PROCESS_MEMORY)))
+        frames = (width * height + out_width * out_height) * 3
+        strip_rows = (available // segments - PROCESS_MEMORY - frames) // (out_width * 10 + 1)
+        if strip_rows < 1 :
+            segments = 1
+    
+    segments = min(segments, kept or 0)
+    if segments > 1 :
+        # segments seek to their 1st frame : probe one seek (at most SEEK_PROBE_FRAMES in) before relying on it
+        offset = min(kept // segments * stride, SEEK_PROBE_FRAMES)
+        if not seek_is_exact(video_path, start_frame, offset) :
+            print(f"Seeking is not frame accurate for {os.path.basename(video_path)}, processing it sequentially") # optional
+            segments = 1
+    if segments <= 1 :
+        return video_to_frames(video_path, output_folder, stride, start_time, end_time, target_height, max_memory)
+    
+    print(f"Processing video: {os.path.basename(video_path)}") # optional
+    print(f"Resolution: {width}x{height}, FPS: {fps:.2f}, Frames: {frame_count}") # optional
+    
+    os.makedirs(output_folder, exist_ok=True)
+    with open(os.path.join(output_folder, "metadata.txt"), 'w') as f :
+        f.write(f"{out_width},{out_height},{fps / stride}")
+    
+    # contiguous runs of output indexes, one per segment
+    bounds = [kept * i // segments for i in range(segments + 1)]
+    parts = list(zip(bounds[:-1], bounds[1:]))
+    
+    try :
+        with ProcessPoolExecutor(max_workers=segments, initializer=batch_worker_init) as pool :
+            futures = [pool.submit(encode_segment, video_path, output_folder, first, last - first, start_frame, stride,
+                                   (out_width, out_height), strip_rows)
+                       for first, last in parts]
+            for (first, last), future in zip(parts, futures) :
+                print(f"Segment frames {first}-{last - 1} : {future.result()} written") # optional
+            written = [future.result() for future in futures]
+    except BaseException :
+        # a failed segment leaves no partial run behind (frames + metadata written here are removed)
+        for index in range(kept) :
+            path = os.path.join(output_folder, f"frame_{index:04d}.txt")
+            if os.path.exists(path) :
+                os.remove(path)
+        os.remove(os.path.join(output_folder, "metadata.txt"))
+        raise
+    
+    # a short segment (video ended early) ends the run there, like the sequential loop : later frames are removed
+    frame_index = 0
+    for (first, last), count in zip(parts, written) :
+        frame_index = first + count
+        if count < last - first :
+            break
+    for index in range(frame_index, kept) :
+        path = os.path.join(output_folder, f"frame_{index:04d}.txt")
+        if os.path.exists(path) :
+            os.remove(path)
+    
+    print(f"\nVideo processing complete! {frame_index} frames saved to {output_folder} ({segments} segments)") # optional
     
     return frame_index
 
+def video_work(video_path) :
+    # rough cost of deconstructing a video (frames x pixels), file size when the count is unknown
+    cap = cv2.VideoCapture(video_path)
+    work = cap.get(cv2.CAP_PROP_FRAME_COUNT) * cap.get(cv2.CAP_PROP_FRAME_WIDTH) * cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    cap.release()
+    return work if work > 0 else os.path.getsize(video_path)
+
+def batch_worker_init() :
+    cv2.setNumThreads(1) # one core per video, the pool spreads the videos over the cores
+
+def deconstruct_quietly(video_path, output_folder, options, max_memory) :
+    # pool task : video_to_frames without its per frame prints, returns (frame count, seconds)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull :
+        stdout, sys.stdout = sys.stdout, devnull
+        try :
+            frame_count = video_to_frames(video_path, output_folder, *options, max_memory)
+        finally :
+            sys.stdout = stdout
+    return frame_count, time.perf_counter() - start
+
+def batch_videos_to_frames(folder_path, video_files, workers=None, stride=1, start_time=None, end_time=None,
+                           target_height=None, max_memory=None) :
+    # deconstructs every video into its own <name>_frames folder on one pool of 'workers' processes
+    # longest videos start first, short ones fill the cores that free up while those run
+    # max_memory (bytes) is split between the workers (fewer workers when it is tight)
+    workers = workers or os.cpu_count() or 1
+    share = None
+    if max_memory :
+        available = max_memory - PROCESS_MEMORY # this process
+        workers = max(1, min(workers, available // (2 * PROCESS_MEMORY)))
+        share = available // workers
+        print(f"Memory budget {format_memory(max_memory)} : {workers} worker(s), {format_memory(share)} each") # optional
+    
+    video_paths = sorted((os.path.join(folder_path, f) for f in video_files), key=video_work, reverse=True)
+    options = (stride, start_time, end_time, target_height)
+    done, failed = 0, []
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(video_paths)), initializer=batch_worker_init) as pool :
+        futures = {}
+        for video_path in video_paths :
+            output_folder = os.path.join(folder_path, f"{os.path.splitext(os.path.basename(video_path))[0]}_frames")
+            futures[pool.submit(deconstruct_quietly, video_path, output_folder, options, share)] = video_path
+        
+        for future in as_completed(futures) :
+            name = os.path.basename(futures[future])
+            try :
+                frame_count, seconds = future.result()
+                done += 1
+                print(f"[{done + len(failed)}/{len(video_paths)}] {name} : {frame_count} frames in {seconds:.1f}s")
+            except Exception as e :
+                failed.append(name)
+                print(f"[{done + len(failed)}/{len(video_paths)}] {name} : failed ({e})")
+    
+    return done, failed
+
+def stream_arguments(argv) :
+    # pipe mode options : --stream <video> [--stride N] [--start S] [--end S] [--height H]
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--stream")
+    parser.add_argument("--stride", type=int, default=1)
+    parser.add_argument("--start", type=float, default=0)
+    parser.add_argument("--end", type=float, default=0)
+    parser.add_argument("--height", type=int, default=0)
+    return parser.parse_known_args(argv)[0]
+
 # --- Main Entry Point --- #
 
 if __name__ == "__main__" :
 
+    # optional memory budget : python videoToTxt.py --max-memory 512M
+    max_memory = memory_budget(sys.argv[1:])
+
+    # pipe mode (no menus) : python videoToTxt.py --stream clip.mp4 [--stride 2] [--height 480] | gzip > clip.frames.gz
+    options = stream_arguments(sys.argv[1:])
+    if options.stream :
+        try :
+            video_to_frames(options.stream, None, options.stride, options.start, options.end, options.height,
+                            max_memory, stream=sys.stdout.buffer)
+        except (ValueError, BrokenPipeError) as e :
+            print(f"Error processing video: {str(e)}", file=sys.stderr)
+            exit(1)
+        if max_memory :
+            with contextlib.redirect_stdout(sys.stderr) : # stdout carries the frames
+                report_peak_memory(max_memory)
+        exit()
+
     # --- 1. Directory Selection --- #
 
     existing_dirs = [d for d in VALID_DIRECTORIES if os.path.exists(d)]
@@ -179,20 +542,68 @@ if __name__ == "__main__" :
         exit()
     
     print("\nAvailable video files:")
+    print(f"0. All {len(video_files)} videos (batch)")
     for i, filename in enumerate(video_files):
         print(f"{i+1}. {filename}")
     
     try :
         selection = int(input("\nEnter file number to deconstruct: ")) - 1
-        if selection < 0 or selection >= len(video_files):
+        if selection < -1 or selection >= len(video_files):
             raise ValueError
-        selected_file = video_files[selection]
-        video_path = os.path.join(folder_path, selected_file)
+        batch = selection == -1
+        selected_file = None if batch else video_files[selection]
+        video_path = None if batch else os.path.join(folder_path, selected_file)
     except ValueError :
         print("Invalid selection.")
         exit()
 
-    # --- 4. Output Folder Setup --- #
+    # --- 4. Subsampling Options (enter keeps every frame at full size) --- #
+    
+    try :
+        stride = int(input("\nKeep 1 frame every N frames (enter for 1): ").strip() or 1)
+        start_time = float(input("Start time in seconds (enter for start): ").strip() or 0)
+        end_time = float(input("End time in seconds (enter for end): ").strip() or 0)
+        target_height = int(input("Proxy height, e.g. 480 (enter for full size): ").strip() or 0)
+        if stride < 1 or start_time < 0 or end_time < 0 or target_height < 0 :
+            raise ValueError
+    except ValueError :
+        print("Invalid option. Processing every frame at full size.")
+        stride, start_time, end_time, target_height = 1, 0, 0, 0
+    
+    # --- 5. Batch (every video, shared worker pool) --- #
+    
+    if batch :
+        default_workers = os.cpu_count() or 1
+        try :
+            workers = int(input(f"\nMax concurrent videos (enter for {default_workers}): ").strip() or default_workers)
+            if workers < 1 :
+                raise ValueError
+        except ValueError :
+            print(f"Invalid number. Using {default_workers}.")
+            workers = default_workers
+        
+        print(f"\nDeconstructing {len(video_files)} videos in {folder_path}...")
+        start = time.perf_counter()
+        done, failed = batch_videos_to_frames(folder_path, video_files, workers, stride, start_time, end_time,
+                                              target_height, max_memory)
+        print(f"\n{done} video(s) deconstructed in {time.perf_counter() - start:.1f}s, {len(failed)} failed")
+        
+        if max_memory :
+            report_peak_memory(max_memory)
+        exit()
+    
+    # --- 6. Parallel Segments (one capture + process each) --- #
+    
+    default_segments = os.cpu_count() or 1
+    try :
+        segments = int(input(f"\nParallel segments (enter for {default_segments}): ").strip() or default_segments)
+        if segments < 1 :
+            raise ValueError
+    except ValueError :
+        print(f"Invalid number. Using {default_segments}.")
+        segments = default_segments
+    
+    # --- 7. Output Folder Setup --- #
     
     video_name = os.path.splitext(selected_file)[0]
     output_folder = os.path.join(folder_path, f"{video_name}_frames")
@@ -203,7 +614,11 @@ if __name__ == "__main__" :
     
     # process video
     try :
-        frame_count = video_to_frames(video_path, output_folder)
+        frame_count = segmented_video_to_frames(video_path, output_folder, segments, stride, start_time, end_time,
+                                                target_height, max_memory)
         print(f"Successfully deconstructed {frame_count} frames!")
     except Exception as e :
         print(f"Error processing video: {str(e)}")
+
+    if max_memory :
+        report_peak_memory(max_memory)